@@ -1,29 +1,73 @@
-from flask import Flask, jsonify, send_from_directory
+import click
+from flask import Flask, jsonify, request, send_from_directory
 from flask_cors import CORS
+import hmac
 import os
 import sys
 
 sys.path.insert(0, os.path.dirname(__file__))
 
-def create_app():
-    """Create and configure the Flask app"""
+def create_app(env=None):
+    """Create and configure the Flask app
+
+    env picks the config class (development, production, testing); it
+    defaults to FLASK_ENV, then development.
+    """
     app = Flask(__name__, static_folder="../frontend/dist", static_url_path="/")
     
-    app.config['SECRET_KEY'] = 'dev-secret-key'
-    app.config['DEBUG'] = True
+    from config import get_config
+    app.config.from_object(get_config(env or os.getenv('FLASK_ENV', 'development')))
     
-    CORS(app)
+    # Browser access for the API from CORS_ORIGINS; /api/internal/* gets no CORS headers
+    origins = app.config['CORS_ORIGINS']
+    if origins != '*':
+        origins = [origin.strip() for origin in origins.split(',') if origin.strip()]
+    CORS(app, resources={r'/api/(?!internal/).*': {'origins': origins}})
     
-    # Initialize database
-    from database import init_db
+    # Initialize database; migrations are applied separately (flask db upgrade)
+    from database import check_schema, init_db
     init_db(app)
+    # The flask CLI loads this app to run `db upgrade`, so there a stale schema only warns
+    schema_ready = check_schema(app, strict=click.get_current_context(silent=True) is None)
+    
+    # Per-request SQL statement counts against endpoint budgets (QUERY_COUNT=1)
+    from utils.query_count import install_query_counter
+    install_query_counter(app)
+    
+    # Cross-worker invalidation of cached DB-backed responses
+    from utils.invalidation import install_invalidation
+    install_invalidation(app)
+    
+    # Per-subject running totals behind /api/subjects/students/subjects-stats
+    from utils.subject_stats import install_subject_stats
+    install_subject_stats(app, fill=schema_ready)
+    
+    # Trigram index behind /api/students/search
+    from utils.student_search import install_student_search
+    install_student_search(app, fill=schema_ready)
     
     # Register routes
     from routes.students_routes import bp as students_bp
     from routes.subjects_routes import bp as subjects_bp
     app.register_blueprint(students_bp, url_prefix="/api/students")
     app.register_blueprint(subjects_bp, url_prefix="/api/subjects")
-    
+
+    # CSV student detail/summary (indexed per dataset version) and predictions
+    from routes.student_routes import bp as student_bp
+    app.register_blueprint(student_bp, url_prefix="/api/student")
+
+    # CSV-backed analytics (overview/performance/distribution carry their own prefixes)
+    from routes.analytics_routes import bp as analytics_bp
+    from routes.overview_routes import overview_bp
+    from routes.performance_routes import performance_bp
+    from routes.distribution_routes import distribution_bp
+    from routes.dashboard_routes import dashboard_bp
+    app.register_blueprint(analytics_bp, url_prefix="/api/analytics")
+    app.register_blueprint(overview_bp)
+    app.register_blueprint(performance_bp)
+    app.register_blueprint(distribution_bp)
+    app.register_blueprint(dashboard_bp)
+
     # Health check
     @app.route('/api/health', methods=['GET'])
     def health():
@@ -36,7 +80,45 @@ def create_app():
             'name': 'Student Performance Dashboard API',
             'version': '1.0.0'
         }), 200
-    
+
+    # Internal diagnostics are hidden from anyone without the token, or
+    # from anyone but localhost when no token is configured
+    @app.before_request
+    def guard_internal():
+        if not request.path.startswith('/api/internal/'):
+            return None
+        token = app.config.get('INTERNAL_STATS_TOKEN')
+        if token:
+            allowed = hmac.compare_digest(request.headers.get('X-Internal-Token', ''), token)
+        else:
+            # Behind a reverse proxy every request comes from localhost; forwarded ones are not local
+            allowed = (request.remote_addr in ('127.0.0.1', '::1')
+                       and 'X-Forwarded-For' not in request.headers)
+        if not allowed:
+            return jsonify({'error': 'Not found'}), 404
+        return None
+
+    # Internal diagnostics: dataset, response and shared cache counters
+    @app.route('/api/internal/cache-stats', methods=['GET'])
+    def cache_stats():
+        from utils.dataset import dataset_stats
+        from utils.response_cache import response_cache
+        from utils.invalidation import version_bus
+        from utils.cache_backends import shared_cache
+        return jsonify({
+            'datasets': dataset_stats(),
+            'responses': response_cache.stats(),
+            'shared': shared_cache.stats(),
+            'invalidation': version_bus.stats()
+        }), 200
+
+    # Internal diagnostics: this worker's database connection pool
+    @app.route('/api/internal/pool-stats', methods=['GET'])
+    def pool_stats():
+        from database import db
+        from utils.db_pool import pool_stats as engine_pool_stats
+        return jsonify(engine_pool_stats(db.engine)), 200
+
     # Serve frontend - must be last
     @app.route('/', defaults={'path': ''})
     @app.route('/<path:path>')
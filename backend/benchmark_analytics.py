@@ -0,0 +1,274 @@
+#!/usr/bin/env python
+"""
+Latency benchmark for the CSV-backed analytics endpoints
+
+Generates a synthetic student_data.csv at each size, serves it through the
+shared dataset provider and reports p50/p95 latency per endpoint.
+
+Usage:
+    python benchmark_analytics.py                          # 1k, 100k, 1M rows
+    python benchmark_analytics.py --sizes 1000,100000 --requests 20 --budget-ms 250
+    python benchmark_analytics.py --engines --sizes 100000 # engines vs legacy loops
+    python benchmark_analytics.py --serialization          # JSON encoding per 10k rows
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from flask import Flask
+import utils.dataset as dataset
+from routes.overview_routes import overview_bp
+from routes.performance_routes import performance_bp
+from routes.distribution_routes import distribution_bp
+from routes.dashboard_routes import dashboard_bp
+from utils.histogram import histogram
+from utils.risk import annotate_risk
+import utils.serialization as serialization
+
+DEPARTMENTS = ['Engineering', 'Business', 'Mathematics', 'CS', '-']
+GRADES = ['A', 'B', 'C', 'D', 'F']
+
+
+def generate_student_csv(path, rows, seed=42):
+    """Write a synthetic student_data.csv with the real dataset's columns"""
+    rng = np.random.default_rng(seed)
+    total = rng.uniform(30, 100, rows).round(2)
+    grade = np.select([total >= 90, total >= 80, total >= 70, total >= 60], GRADES[:4], GRADES[4])
+    df = pd.DataFrame({
+        'Student_ID': np.char.add('S', np.arange(1000, 1000 + rows).astype(str)),
+        'First_Name': rng.choice(['Ahmed', 'Maria', 'Liam', 'Omar', 'Sara'], rows),
+        'Last_Name': rng.choice(['Khan', 'Smith', 'Jones', 'Brown'], rows),
+        'Email': np.char.add(np.char.add('student', np.arange(rows).astype(str)), '@university.com'),
+        'Gender': rng.choice(['Male', 'Female'], rows),
+        'Age': rng.integers(18, 25, rows),
+        'Department': rng.choice(DEPARTMENTS, rows),
+        'Attendance (%)': rng.uniform(40, 100, rows).round(2),
+        'Midterm_Score': rng.uniform(30, 100, rows).round(2),
+        'Final_Score': rng.uniform(30, 100, rows).round(2),
+        'Assignments_Avg': rng.uniform(30, 100, rows).round(2),
+        'Quizzes_Avg': rng.uniform(30, 100, rows).round(2),
+        'Participation_Score': rng.uniform(0, 100, rows).round(2),
+        'Projects_Score': rng.uniform(30, 100, rows).round(2),
+        'Total_Score': total,
+        'Grade': grade,
+        'Study_Hours_per_Week': rng.uniform(5, 30, rows).round(1),
+        'Extracurricular_Activities': rng.choice(['Yes', 'No'], rows),
+        'Internet_Access_at_Home': rng.choice(['Yes', 'No'], rows),
+        'Parent_Education_Level': rng.choice(['High School', 'Bachelor\'s', 'Master\'s', 'PhD'], rows),
+        'Family_Income_Level': rng.choice(['Low', 'Medium', 'High'], rows),
+        'Stress_Level (1-10)': rng.integers(1, 11, rows),
+        'Sleep_Hours_per_Night': rng.uniform(4, 9, rows).round(1),
+    })
+    df.to_csv(path, index=False)
+
+
+def use_dataset(directory):
+    """Point the shared student dataset at a generated file"""
+    dataset.student_dataset = dataset.DatasetProvider(
+        os.path.join(directory, 'student_data.csv'),
+        numeric_columns=dataset.STUDENT_NUMERIC_COLUMNS,
+        snapshot_dir=os.path.join(directory, '.snapshots'),
+    )
+
+
+def create_bench_app():
+    app = Flask(__name__)
+    for blueprint in (overview_bp, performance_bp, distribution_bp, dashboard_bp):
+        app.register_blueprint(blueprint)
+    return app
+
+
+def percentile(samples, pct):
+    return float(np.percentile(samples, pct)) if samples else 0.0
+
+
+def bench_endpoints(app, requests, query=''):
+    """Return {url: (p50_ms, p95_ms, status)} for every analytics GET route"""
+    client = app.test_client()
+    results = {}
+    urls = sorted(str(rule) for rule in app.url_map.iter_rules()
+                  if rule.endpoint != 'static' and '<' not in str(rule))
+    for url in urls:
+        target = f'{url}?{query}' if query else url
+        status = client.get(target).status_code  # warm-up
+        samples = []
+        for _ in range(requests):
+            start = time.perf_counter()
+            client.get(target)
+            samples.append((time.perf_counter() - start) * 1000)
+        results[target] = (percentile(samples, 50), percentile(samples, 95), status)
+    return results
+
+
+def legacy_risk_counts(df):
+    """The iterrows risk classification the distribution routes used to run"""
+    at_risk = 0
+    for _, student in df.iterrows():
+        grade = student['Grade']
+        attendance = student['Attendance (%)']
+        score = student['Total_Score']
+        if grade == 'F' or (grade == 'D' and attendance < 70):
+            at_risk += 1
+        elif grade == 'D' or (grade == 'C' and attendance < 60):
+            at_risk += 1
+        elif grade == 'C' or (attendance < 70 and score < 50):
+            at_risk += 1
+    return at_risk
+
+
+def legacy_range_counts(df, column='Total_Score'):
+    """The iterrows-and-scan bucket counting the distribution routes used to run"""
+    ranges = [{'min': 90, 'max': 100, 'count': 0}, {'min': 80, 'max': 90, 'count': 0},
+              {'min': 70, 'max': 80, 'count': 0}, {'min': 60, 'max': 70, 'count': 0},
+              {'min': 50, 'max': 60, 'count': 0}, {'min': 0, 'max': 50, 'count': 0}]
+    for _, student in df.iterrows():
+        value = student[column]
+        for range_item in ranges:
+            if range_item['min'] <= value <= range_item['max']:
+                range_item['count'] += 1
+                break
+    return [range_item['count'] for range_item in ranges]
+
+
+def time_call(func, *args, repeat=3):
+    """Best-of-n wall time in milliseconds, plus the last result"""
+    best, result = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def bench_engines(df):
+    """Compare the vectorized engines with the loops they replaced"""
+    rows = []
+
+    legacy_ms, legacy = time_call(legacy_risk_counts, df, repeat=1)
+    engine_ms, annotated = time_call(annotate_risk, df)
+    assert legacy == int((annotated['riskScore'] > 0).sum())
+    rows.append(('risk classification', legacy_ms, engine_ms))
+
+    spec = ('edges', (0.0, 50.0, 60.0, 70.0, 80.0, 90.0, 100.0))
+    legacy_ms, legacy = time_call(legacy_range_counts, df, repeat=1)
+    engine_ms, result = time_call(histogram, df['Total_Score'], spec)
+    assert legacy == result['counts'][::-1]
+    rows.append(('score range histogram', legacy_ms, engine_ms))
+
+    print(f"{'engine':<32} {'legacy ms':>10} {'vectorized ms':>14} {'speedup':>8}")
+    for name, old_ms, new_ms in rows:
+        print(f"{name:<32} {old_ms:>10.1f} {new_ms:>14.1f} {old_ms / max(new_ms, 1e-6):>7.0f}x")
+
+
+def legacy_clean_records(records):
+    """The per-cell cleanup the overview routes ran after to_dict(orient='records')"""
+    clean_data = []
+    for item in records:
+        clean_item = {}
+        for key, value in item.items():
+            if isinstance(value, np.integer):
+                clean_item[key] = int(value)
+            elif isinstance(value, np.floating):
+                clean_item[key] = None if np.isnan(value) or np.isinf(value) else float(value)
+            else:
+                clean_item[key] = value
+        clean_data.append(clean_item)
+    return clean_data
+
+
+def legacy_serialize(df):
+    # jsonify used json.dumps with sorted keys; NaN in Python floats slipped through
+    return json.dumps({'data': legacy_clean_records(df.to_dict(orient='records'))},
+                      sort_keys=True).encode('utf-8')
+
+
+def stdlib_serialize(df):
+    encoder, serialization.orjson = serialization.orjson, None
+    try:
+        return serialization.json_bytes({'data': serialization.frame_records(df)})
+    finally:
+        serialization.orjson = encoder
+
+
+def fast_serialize(df):
+    return serialization.json_bytes({'data': serialization.frame_records(df)})
+
+
+def bench_serialization(df):
+    """Serialization time per 10k rows: legacy path vs the central serializer"""
+    per = 10000 / max(len(df), 1)
+    paths = [('to_dict + clean + json (legacy)', legacy_serialize),
+             ('frame_records + json (stdlib)', stdlib_serialize)]
+    if serialization.orjson is not None:
+        paths.append(('frame_records + orjson', fast_serialize))
+    else:
+        print("(orjson not installed; skipping the fast encoder)")
+
+    print(f"{'path':<36} {'ms / 10k rows':>14} {'bytes':>12} {'speedup':>8}")
+    legacy_ms = None
+    for name, func in paths:
+        elapsed, body = time_call(func, df)
+        legacy_ms = elapsed if legacy_ms is None else legacy_ms
+        print(f"{name:<36} {elapsed * per:>14.1f} {len(body):>12,} {legacy_ms / max(elapsed, 1e-6):>7.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', default='1000,100000,1000000')
+    parser.add_argument('--requests', type=int, default=10)
+    parser.add_argument('--budget-ms', type=float, default=None,
+                        help='flag endpoints whose p95 exceeds this budget')
+    parser.add_argument('--query', default='', help='extra query string, e.g. department=CS')
+    parser.add_argument('--engines', action='store_true',
+                        help='benchmark the vectorized engines against the legacy loops')
+    parser.add_argument('--serialization', action='store_true',
+                        help='benchmark JSON serialization of the dataset rows per 10k rows')
+    args = parser.parse_args()
+
+    app = create_bench_app()
+    failures = 0
+
+    for size in [int(s) for s in args.sizes.split(',')]:
+        with tempfile.TemporaryDirectory() as directory:
+            generate_student_csv(os.path.join(directory, 'student_data.csv'), size)
+            use_dataset(directory)
+
+            start = time.perf_counter()
+            dataset.student_dataset.snapshot()
+            cold_ms = (time.perf_counter() - start) * 1000
+
+            print("=" * 78)
+            print(f"{size:,} rows  (cold load + snapshot build: {cold_ms:.0f} ms)")
+            print("=" * 78)
+            if args.engines:
+                bench_engines(dataset.student_dataset.snapshot().frame)
+                print()
+                continue
+            if args.serialization:
+                bench_serialization(dataset.student_dataset.snapshot().frame)
+                print()
+                continue
+            print(f"{'endpoint':<52} {'p50 ms':>8} {'p95 ms':>8}  status")
+            for url, (p50, p95, status) in bench_endpoints(app, args.requests, args.query).items():
+                flag = ''
+                if args.budget_ms is not None and p95 > args.budget_ms:
+                    flag = '  OVER BUDGET'
+                    failures += 1
+                print(f"{url:<52} {p50:>8.1f} {p95:>8.1f}  {status}{flag}")
+            print()
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
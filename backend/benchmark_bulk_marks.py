@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+"""
+Benchmark POST /api/subjects/bulk against one POST per subject score
+
+Creates a throwaway SQLite database, then writes the same marks through the
+single-record endpoint (POST /api/subjects/student/<id>/subjects, one commit
+each) and through the bulk endpoint, first as inserts and then as updates
+of the same (student, subject) pairs. The single-record path is timed on a
+sample and reported per record.
+
+Usage:
+    python benchmark_bulk_marks.py                      # 10k marks
+    python benchmark_bulk_marks.py --marks 50000 --single 1000
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+SUBJECTS = ['Mathematics', 'Physics', 'Chemistry', 'Biology', 'English',
+            'History', 'Geography', 'Computer Science', 'Economics', 'Art']
+
+
+def make_records(count, students, rng):
+    """count marks spread over students x SUBJECTS, each pair used once"""
+    pairs = [(student_id, subject) for subject in SUBJECTS for student_id in range(1, students + 1)]
+    return [{'student_id': student_id, 'subject_name': subject,
+             'assignment': round(rng.uniform(0, 20), 1), 'test': round(rng.uniform(0, 25), 1),
+             'project': round(rng.uniform(0, 25), 1), 'quiz': round(rng.uniform(0, 15), 1)}
+            for student_id, subject in pairs[:count]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--marks', type=int, default=10000)
+    parser.add_argument('--single', type=int, default=500, help='records timed through the single-record endpoint')
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(directory, 'bench.db')}"
+    os.environ.setdefault('CACHE_BACKEND', 'memory')
+
+    from app import create_app
+    from database import db, migrate_database
+    from models.database_models import Student, StudentSubject
+
+    migrate_database()
+    app = create_app()
+    client = app.test_client()
+    students = -(-args.marks // len(SUBJECTS))
+    with app.app_context():
+        db.session.execute(Student.__table__.insert(),
+                           [{'id': i, 'name': f'Student {i}', 'department': 'CS'}
+                            for i in range(1, students + 1)])
+        db.session.commit()
+
+    rng = random.Random(42)
+    records = make_records(args.marks, students, rng)
+    print("=" * 78)
+    print(f"SQLite: {len(records):,} marks for {students:,} students")
+    print("=" * 78)
+    print(f"{'path':<44} {'records':>8} {'total ms':>10} {'ms/record':>10}")
+
+    sample = records[:args.single]
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):  # the single-record route logs every request
+        for record in sample:
+            client.post(f"/api/subjects/student/{record['student_id']}/subjects", json=record)
+    single_ms = (time.perf_counter() - start) * 1000
+    print(f"{'POST /student/<id>/subjects (one per mark)':<44} {len(sample):>8} "
+          f"{single_ms:>10.1f} {single_ms / max(len(sample), 1):>10.3f}")
+    print(f"{'  extrapolated to all marks':<44} {len(records):>8} "
+          f"{single_ms / max(len(sample), 1) * len(records):>10.1f}")
+
+    with app.app_context():
+        db.session.query(StudentSubject).delete()
+        db.session.commit()
+
+    for label in ('POST /bulk (inserts)', 'POST /bulk (updates)'):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = client.post('/api/subjects/bulk', json=records).get_json()
+        bulk_ms = (time.perf_counter() - start) * 1000
+        print(f"{label:<44} {len(records):>8} {bulk_ms:>10.1f} {bulk_ms / len(records):>10.3f}")
+        if result['failed']:
+            print(f"  {result['failed']} records rejected: {result['errors'][:3]}")
+
+
+if __name__ == '__main__':
+    main()
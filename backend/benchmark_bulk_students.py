@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+"""
+Benchmark PATCH /api/students against one PUT /api/students/<id> per update
+
+Creates a throwaway SQLite database of students, then applies the same
+partial updates (a mix of gpa/attendance/activityScore changes and a few
+renames) through the single-student endpoint, one commit each, and through
+the bulk endpoint in one request. The single-student path is timed on a
+sample and extrapolated to all updates.
+
+Usage:
+    python benchmark_bulk_students.py                      # 50k updates
+    python benchmark_bulk_students.py --updates 100000 --single 2000
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+def make_updates(count, rng):
+    """One partial update per student id 1..count"""
+    updates = []
+    for student_id in range(1, count + 1):
+        update = {'id': student_id}
+        roll = rng.random()
+        if roll < 0.5:
+            update['gpa'] = round(rng.uniform(5, 10), 2)
+        elif roll < 0.8:
+            update['attendance'] = round(rng.uniform(50, 100), 1)
+            update['activityScore'] = round(rng.uniform(0, 100), 1)
+        elif roll < 0.95:
+            update.update(gpa=round(rng.uniform(5, 10), 2), attendance=round(rng.uniform(50, 100), 1))
+        else:
+            update['name'] = f'Renamed Student {student_id}'
+        updates.append(update)
+    return updates
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--updates', type=int, default=50000)
+    parser.add_argument('--single', type=int, default=1000, help='updates timed through PUT /api/students/<id>')
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(directory, 'bench.db')}"
+    os.environ.setdefault('CACHE_BACKEND', 'memory')
+
+    from app import create_app
+    from database import db, migrate_database
+    from models.database_models import Student
+
+    migrate_database()
+    app = create_app()
+    client = app.test_client()
+    with app.app_context():
+        db.session.execute(Student.__table__.insert(),
+                           [{'id': i, 'name': f'Student {i}', 'department': 'CS',
+                             'gpa': 7.0, 'attendance': 80.0, 'activityScore': 50.0}
+                            for i in range(1, args.updates + 1)])
+        db.session.commit()
+
+    updates = make_updates(args.updates, random.Random(42))
+    print("=" * 78)
+    print(f"SQLite: {len(updates):,} partial student updates")
+    print("=" * 78)
+    print(f"{'path':<44} {'updates':>8} {'total ms':>10} {'ms/update':>10}")
+
+    sample = updates[:args.single]
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):  # the single-student route logs every request
+        for update in sample:
+            fields = {key: value for key, value in update.items() if key != 'id'}
+            client.put(f"/api/students/{update['id']}", json=fields)
+    single_ms = (time.perf_counter() - start) * 1000
+    print(f"{'PUT /api/students/<id> (one per update)':<44} {len(sample):>8} "
+          f"{single_ms:>10.1f} {single_ms / max(len(sample), 1):>10.3f}")
+    print(f"{'  extrapolated to all updates':<44} {len(updates):>8} "
+          f"{single_ms / max(len(sample), 1) * len(updates):>10.1f}")
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = client.patch('/api/students', json=updates).get_json()
+    bulk_ms = (time.perf_counter() - start) * 1000
+    print(f"{'PATCH /api/students (one request)':<44} {len(updates):>8} "
+          f"{bulk_ms:>10.1f} {bulk_ms / len(updates):>10.3f}")
+    if result['failed']:
+        print(f"  {result['failed']} updates rejected: {result['errors'][:3]}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+"""
+Benchmark GET /api/students/search: indexed search vs a full scan
+
+Seeds a scratch SQLite database with synthetic students, builds the trigram
+table, then times search_students() (prefix, word, substring, multi-word,
+roll number and department-filtered queries) against the scan the frontend
+does today: every student loaded and filtered in Python.
+
+Usage:
+    python benchmark_student_search.py                      # 100k students
+    python benchmark_student_search.py --students 1000000 --repeat 5
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from flask import Flask
+
+from database import db
+from models.database_models import Student
+from utils.student_search import rebuild_search_index, search_students
+
+DEPARTMENTS = ['Engineering', 'Business', 'Mathematics', 'CS', 'Biology']
+FIRST_NAMES = ['Aarav', 'Aditi', 'Ananya', 'Arjun', 'Diya', 'Ishaan', 'Kabir', 'Meera', 'Neha',
+               'Priya', 'Rahul', 'Riya', 'Rohan', 'Saanvi', 'Sneha', 'Vihaan', 'Vivaan', 'Zara',
+               'Alice', 'Daniel', 'Emma', 'Hannah', 'Liam', 'Noah', 'Olivia', 'Sophia']
+LAST_NAMES = ['Sharma', 'Verma', 'Patel', 'Gupta', 'Reddy', 'Iyer', 'Nair', 'Khan', 'Singh',
+              'Das', 'Mehta', 'Joshi', 'Smith', 'Johnson', 'Brown', 'Garcia', 'Miller', 'Wilson']
+QUERIES = [
+    ('prefix', 'ara', None),
+    ('word', 'patel', None),
+    ('substring', 'ann', None),
+    ('multi-word', 'meera sh', None),
+    ('short', 'ri', None),
+    ('roll number', '4242', None),
+    ('?department=CS', 'sharma', ['CS']),
+    ('no match', 'qzx', None),
+]
+BATCH = 50000
+
+
+def create_bench_app(url):
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = url
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    return app
+
+
+def seed(students, seed_value=42):
+    """Insert `students` students with Core executemany batches"""
+    rng = random.Random(seed_value)
+    db.drop_all()
+    db.create_all()
+    now = datetime(2024, 1, 1)
+    for start in range(1, students + 1, BATCH):
+        batch = [{'id': i, 'name': f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}',
+                  'department': rng.choice(DEPARTMENTS), 'gpa': 0.0, 'attendance': 0.0,
+                  'activityScore': 0.0, 'created_at': now, 'updated_at': now}
+                 for i in range(start, min(start + BATCH, students + 1))]
+        db.session.execute(Student.__table__.insert(), batch)
+    db.session.commit()
+
+
+def scan_search(text, departments, limit):
+    """What client-side filtering costs: every student loaded and matched"""
+    text = text.lower()
+    matches = [s for s in Student.query.all()
+               if text in s.name.lower() or text in str(s.id)]
+    if departments:
+        matches = [s for s in matches if s.department in departments]
+    db.session.expunge_all()
+    return matches[:limit], len(matches)
+
+
+def time_call(func, repeat):
+    """Best-of-n wall time in milliseconds, plus the last result"""
+    best, result = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--students', type=int, default=100000)
+    parser.add_argument('--limit', type=int, default=20)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--no-scan', action='store_true', help='skip the (slow) full-scan baseline')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        app = create_bench_app(f"sqlite:///{os.path.join(directory, 'bench.db')}")
+        with app.app_context():
+            start = time.perf_counter()
+            seed(args.students)
+            seeded = time.perf_counter() - start
+            start = time.perf_counter()
+            with db.engine.begin() as connection:
+                rebuild_search_index(connection)
+            indexed = time.perf_counter() - start
+            print("=" * 78)
+            print(f"SQLite: {args.students:,} students (seeded in {seeded:.1f} s, "
+                  f"trigram index built in {indexed:.1f} s)")
+            print("=" * 78)
+
+            if not args.no_scan:
+                scan_ms, _ = time_call(lambda: scan_search('ann', None, args.limit), 1)
+                print(f"{'full scan + Python filter (client-side today)':<48} {scan_ms:>10.1f} ms")
+            print(f"{'query':<24} {'q':<12} {'ms':>10} {'results':>8} {'total':>9}")
+            for label, text, departments in QUERIES:
+                elapsed, (results, total, _, exact) = time_call(
+                    lambda: search_students(text, departments, args.limit), args.repeat)
+                db.session.expunge_all()
+                total = f"{total:,}" if exact else f"{total:,}+"
+                print(f"{label:<24} {text:<12} {elapsed:>10.1f} {len(results):>8} {total:>9}")
+            db.session.remove()
+
+
+if __name__ == '__main__':
+    main()
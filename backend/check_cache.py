@@ -0,0 +1,201 @@
+#!/usr/bin/env python
+"""
+Check the cache backends against the same contract
+
+Runs get/set/version/TTL/clear checks on the memory and SQLite backends and
+on the Redis-protocol client. Without --redis-url the client talks to a small
+in-process stand-in server that speaks the subset of RESP it uses.
+
+Usage:
+    python check_cache.py
+    python check_cache.py --redis-url redis://127.0.0.1:6379/0
+"""
+
+import argparse
+import fnmatch
+import os
+import socket
+import socketserver
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from utils.cache_backends import MemoryBackend, RedisBackend, SQLiteBackend
+
+
+class RespStandIn(socketserver.ThreadingTCPServer):
+    """In-memory server for GET, SET [PX|EX], DEL, SCAN, PING, SELECT and AUTH"""
+
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), RespHandler)
+        self.data = {}
+        self.lock = threading.Lock()
+
+    def lookup(self, key):
+        value, expires = self.data.get(key, (None, None))
+        if expires is not None and expires <= time.monotonic():
+            self.data.pop(key, None)
+            return None
+        return value
+
+
+class RespHandler(socketserver.StreamRequestHandler):
+
+    def read_command(self):
+        line = self.rfile.readline()
+        if not line:
+            return None
+        args = []
+        for _ in range(int(line[1:-2])):
+            length = int(self.rfile.readline()[1:-2])
+            args.append(self.rfile.read(length + 2)[:-2])
+        return args
+
+    def reply(self, value):
+        if value is None:
+            self.wfile.write(b'$-1\r\n')
+        elif isinstance(value, int):
+            self.wfile.write(b':%d\r\n' % value)
+        elif isinstance(value, list):
+            self.wfile.write(b'*%d\r\n' % len(value))
+            for item in value:
+                self.reply(item)
+            return
+        elif value == 'OK' or value == 'PONG':
+            self.wfile.write(b'+' + value.encode() + b'\r\n')
+        else:
+            self.wfile.write(b'$%d\r\n%s\r\n' % (len(value), value))
+
+    def handle(self):
+        server = self.server
+        while True:
+            args = self.read_command()
+            if args is None:
+                return
+            command = args[0].upper()
+            with server.lock:
+                if command == b'GET':
+                    self.reply(server.lookup(args[1]))
+                elif command == b'SET':
+                    expires = None
+                    if len(args) >= 5 and args[3].upper() == b'PX':
+                        expires = time.monotonic() + int(args[4]) / 1000
+                    elif len(args) >= 5 and args[3].upper() == b'EX':
+                        expires = time.monotonic() + int(args[4])
+                    server.data[args[1]] = (args[2], expires)
+                    self.reply('OK')
+                elif command == b'DEL':
+                    self.reply(sum(server.data.pop(key, None) is not None for key in args[1:]))
+                elif command == b'SCAN':
+                    pattern = args[args.index(b'MATCH') + 1].decode() if b'MATCH' in args else '*'
+                    keys = [key for key in server.data if fnmatch.fnmatchcase(key.decode(), pattern)]
+                    self.reply([b'0', keys])
+                elif command in (b'PING', b'SELECT', b'AUTH'):
+                    self.reply('PONG' if command == b'PING' else 'OK')
+                else:
+                    self.wfile.write(b'-ERR unknown command\r\n')
+
+
+def check_backend(backend):
+    """Run the shared contract; returns a list of failure messages"""
+    failures = []
+
+    def expect(label, actual, expected):
+        if actual != expected:
+            failures.append(f'{label}: expected {expected!r}, got {actual!r}')
+
+    backend.clear()
+    value = {'status': 'success', 'data': [{'id': i, 'score': i * 1.5} for i in range(500)]}
+    expect('miss', backend.get('k1', 'v1'), None)
+    backend.set('k1', 'v1', value)
+    expect('hit', backend.get('k1', 'v1'), value)
+    expect('stale version', backend.get('k1', 'v2'), None)
+    backend.set('k1', 'v2', {'small': True})
+    expect('overwrite', backend.get('k1', 'v2'), {'small': True})
+    backend.delete('k1')
+    expect('delete', backend.get('k1', 'v2'), None)
+    backend.set('short', 'v1', 1, ttl=0.05)
+    time.sleep(0.1)
+    expect('ttl', backend.get('short', 'v1'), None)
+    backend.set('k2', 'v1', b'\x00binary\xff')
+    expect('bytes', backend.get('k2', 'v1'), b'\x00binary\xff')
+    response = {'body': b'{"success":true}' * 100, 'status': 200, 'mimetype': 'application/json'}
+    backend.set('k3', 'v1', response)
+    expect('response entry', backend.get('k3', 'v1'), response)
+    backend.clear()
+    expect('clear', backend.get('k2', 'v1'), None)
+    if backend.errors:
+        failures.append(f'{backend.errors} backend errors')
+
+    # A blob this code did not write (or a pickle from before) is a miss, not an exception
+    backend._set('corrupt', 'v1', b'\x80\x04junk', 60)
+    expect('corrupt blob', backend.get('corrupt', 'v1'), None)
+    backend.clear()
+    return failures
+
+
+def check_redis_down():
+    """An unreachable server costs one timeout, then calls fail fast until the retry time"""
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        port = probe.getsockname()[1]  # closed once the with block ends
+    backend = RedisBackend(f'redis://127.0.0.1:{port}/0', retry_seconds=60)
+    backend.get('k', 'v1')
+    start = time.perf_counter()
+    for _ in range(100):
+        backend.get('k', 'v1')
+        backend.set('k', 'v1', {'x': 1})
+    elapsed = time.perf_counter() - start
+    return [] if elapsed < 0.05 else [f'200 calls to a down server took {elapsed:.2f}s']
+
+
+def check_sqlite_across_processes(path):
+    """A value written by this process is visible to a fresh one"""
+    backend = SQLiteBackend(path)
+    backend.set('warm', 'v1', {'rows': 3})
+    code = ('import sys; sys.path.insert(0, %r); from utils.cache_backends import SQLiteBackend; '
+            'print(SQLiteBackend(%r).get("warm", "v1"))' % (os.path.dirname(os.path.abspath(__file__)), path))
+    output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True).stdout.strip()
+    return [] if output == "{'rows': 3}" else [f'cross-process read returned {output!r}']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--redis-url', default=None, help='check a real Redis-protocol server instead of the stand-in')
+    args = parser.parse_args()
+
+    results = {}
+    results['memory'] = check_backend(MemoryBackend())
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'cache.sqlite3')
+        results['sqlite'] = check_backend(SQLiteBackend(path)) + check_sqlite_across_processes(path)
+
+    standin = None
+    url = args.redis_url
+    if url is None:
+        standin = RespStandIn()
+        threading.Thread(target=standin.serve_forever, daemon=True).start()
+        url = 'redis://127.0.0.1:%d/0' % standin.server_address[1]
+    results['redis'] = check_backend(RedisBackend(url, prefix='spd-check:')) + check_redis_down()
+    if standin is not None:
+        standin.shutdown()
+
+    failed = False
+    for name, failures in results.items():
+        print(f"{'✓' if not failures else '❌'} {name}")
+        for failure in failures:
+            print(f"    {failure}")
+        failed = failed or bool(failures)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
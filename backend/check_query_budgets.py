@@ -0,0 +1,123 @@
+#!/usr/bin/env python
+"""
+Check the SQL statement count of every DB-backed read endpoint
+
+Seeds a throwaway SQLite database at two sizes, calls each GET endpoint
+under /api/students and /api/subjects with the response caches cleared, and
+fails when a request runs more statements than its budget
+(utils/query_count.py) or when its count grows with the number of rows,
+which is what an N+1 loop looks like.
+
+Usage:
+    python check_query_budgets.py
+    python check_query_budgets.py --sizes 20,500 --subjects 4
+"""
+
+import argparse
+import os
+import re
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+PREFIXES = ('/api/students', '/api/subjects')
+
+# Query strings for endpoints that need one to do any work
+QUERY_STRINGS = {
+    'students.search_students_route': 'q=stud',
+}
+
+
+def seed(db, models, students, subjects_per_student):
+    """Replace the table contents with `students` students and their scores"""
+    Student, Subject, StudentSubject = models
+    db.session.query(StudentSubject).delete()
+    db.session.query(Student).delete()
+    db.session.query(Subject).delete()
+    names = [f'Subject {i + 1}' for i in range(subjects_per_student)]
+    db.session.add_all(Subject(name=name) for name in names)
+    db.session.add_all(Student(id=i, name=f'Student {i}', department='CS') for i in range(1, students + 1))
+    db.session.add_all(
+        StudentSubject(student_id=i, subject_name=name, marks=40 + j, maxMarks=100)
+        for i in range(1, students + 1) for j, name in enumerate(names)
+    )
+    db.session.commit()
+
+
+def read_urls(app, student_id, score_id):
+    """One concrete URL per GET endpoint under the DB-backed prefixes"""
+    urls = {}
+    for rule in app.url_map.iter_rules():
+        if 'GET' not in rule.methods or not rule.rule.startswith(PREFIXES):
+            continue
+        url = re.sub(r'<int:student_id>', str(student_id), rule.rule)
+        url = re.sub(r'<int:subject_id>', str(score_id), url)
+        if rule.endpoint in QUERY_STRINGS:
+            url = f'{url}?{QUERY_STRINGS[rule.endpoint]}'
+        urls.setdefault(rule.endpoint, url)
+    return urls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', default='20,200', help='two student counts to compare')
+    parser.add_argument('--subjects', type=int, default=3, help='scores per student')
+    args = parser.parse_args()
+    small, large = [int(size) for size in args.sizes.split(',')]
+
+    directory = tempfile.mkdtemp()
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(directory, 'queries.db')}"
+    os.environ['QUERY_COUNT'] = '1'
+    os.environ['CACHE_BACKEND'] = 'memory'
+
+    from app import create_app
+    from database import db, migrate_database
+    from models.database_models import Student, Subject, StudentSubject
+    from utils.cache_backends import shared_cache
+    from utils.query_count import query_counter
+    from utils.response_cache import response_cache
+
+    migrate_database()
+    app = create_app()
+    client = app.test_client()
+    counts = {}
+
+    for size in (small, large):
+        with app.app_context():
+            seed(db, (Student, Subject, StudentSubject), size, args.subjects)
+            score_id = db.session.query(StudentSubject.id).order_by(StudentSubject.id).first()[0]
+            urls = read_urls(app, 1, score_id)
+        for endpoint, url in sorted(urls.items()):
+            response_cache.clear()
+            shared_cache.clear()
+            response = client.get(url)
+            response.get_data()  # runs streamed bodies to the end
+            response.close()
+            counts.setdefault(endpoint, {})[size] = query_counter.last.get(endpoint)
+            counts[endpoint]['url'] = url
+            counts[endpoint]['status'] = response.status_code
+
+    failed = bool(query_counter.violations)
+    print(f"{'endpoint':<44} {small:>6} {large:>6} {'budget':>6}  result")
+    for endpoint, row in sorted(counts.items()):
+        budget = query_counter.budget(endpoint)
+        problems = []
+        if row[large] is None or row[small] is None:
+            problems.append('not counted')
+        else:
+            if max(row[small], row[large]) > budget:
+                problems.append('over budget')
+            if row[large] > row[small]:
+                problems.append('grows with rows (N+1?)')
+        if row['status'] >= 500:
+            problems.append(f"HTTP {row['status']}")
+        failed = failed or bool(problems)
+        print(f"{endpoint:<44} {row[small]!s:>6} {row[large]!s:>6} {budget:>6}  "
+              f"{'✓' if not problems else '❌ ' + ', '.join(problems)}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python
+"""
+Check that the hot student_subjects and students queries use their indexes
+
+Builds each query the way the routes do, runs EXPLAIN on it and fails when
+the plan scans a table instead of searching one of the expected indexes.
+With --url the database is only read: no migrations, no summary or search
+table builds, and every EXPLAIN runs in a transaction that is rolled back.
+The throwaway database is migrated to head first.
+SQLite reads EXPLAIN QUERY PLAN; PostgreSQL reads EXPLAIN (FORMAT JSON)
+with sequential scans disabled, since on a small table the planner would
+rightly prefer them, so the check is whether an index can serve the query.
+
+Usage:
+    python check_query_plans.py                                   # throwaway SQLite database
+    python check_query_plans.py --url postgresql://user:pw@host/db   # existing PostgreSQL database
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+def hot_queries():
+    """(label, statement, table, indexes any of which may serve it)"""
+    from sqlalchemy import select
+
+    from models.database_models import Student, StudentSubject
+    from utils.subject_stats import grouped_stats_select, scores_table
+
+    # Without statistics the planner may pick any index led by department
+    department_indexes = {index.name for index in Student.__table__.indexes
+                          if index.expressions[0] is Student.__table__.c.department}
+    return [
+        ('scores of one student', select(StudentSubject).filter_by(student_id=1),
+         'student_subjects', {'uq_student_subjects_student_subject'}),
+        ('score of one student and subject',
+         select(StudentSubject).filter_by(student_id=1, subject_name='Mathematics'),
+         'student_subjects', {'uq_student_subjects_student_subject'}),
+        ('subject aggregate (subject_stats refresh)',
+         grouped_stats_select().where(scores_table.c.subject_name.in_(['Mathematics', 'Physics'])),
+         'student_subjects', {'ix_student_subjects_subject_percentage'}),
+        ('scores of one subject (subject delete)',
+         select(StudentSubject).filter_by(subject_name='Mathematics'),
+         'student_subjects', {'ix_student_subjects_subject_percentage'}),
+        ('students of some departments',
+         select(Student).where(Student.department.in_(['CS', 'EE'])).order_by(Student.id),
+         'students', department_indexes),
+    ]
+
+
+def sqlite_plan(connection, sql, table):
+    """(indexes searched on table, whether table is scanned)"""
+    rows = connection.exec_driver_sql(f'EXPLAIN QUERY PLAN {sql}').all()
+    details = [row[-1] for row in rows]
+    mine = [detail for detail in details if detail.split()[1:2] == [table]]
+    used = {detail.split(' INDEX ')[1].split()[0] for detail in mine if ' INDEX ' in detail}
+    scanned = any(detail.startswith('SCAN ') for detail in mine)
+    return used, scanned, details
+
+
+def postgres_plan(connection, sql, table):
+    connection.exec_driver_sql('SET LOCAL enable_seqscan = off')
+    plan = connection.exec_driver_sql(f'EXPLAIN (FORMAT JSON) {sql}').scalar()
+    plan = json.loads(plan) if isinstance(plan, str) else plan
+
+    nodes, stack = [], [plan[0]['Plan']]
+    while stack:
+        node = stack.pop()
+        nodes.append(node)
+        stack.extend(node.get('Plans', []))
+    mine = [node for node in nodes if node.get('Relation Name') == table]
+    used = {node['Index Name'] for node in mine if 'Index Name' in node}
+    scanned = any(node['Node Type'] == 'Seq Scan' for node in mine)
+    details = [f"{node['Node Type']} {node.get('Relation Name', '')} {node.get('Index Name', '')}".strip()
+               for node in nodes]
+    return used, scanned, details
+
+
+PLANNERS = {
+    'sqlite': sqlite_plan,
+    'postgresql': postgres_plan,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--url', help='database to check (default: a throwaway SQLite database)')
+    args = parser.parse_args()
+
+    url = args.url
+    if not url:
+        url = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'plans.db')}"
+        os.environ['DATABASE_URL'] = url
+        from database import migrate_database
+        migrate_database()
+
+    from alembic.runtime.migration import MigrationContext
+    from sqlalchemy import create_engine
+
+    engine = create_engine(url)
+    planner = PLANNERS.get(engine.dialect.name)
+    if planner is None:
+        print(f"❌ No EXPLAIN check for the '{engine.dialect.name}' dialect")
+        return 1
+
+    failures = 0
+    with engine.connect() as connection:
+        revision = MigrationContext.configure(connection).get_current_revision()
+        connection.rollback()
+        print("=" * 78)
+        print(f"Query plans on {engine.dialect.name} (schema revision {revision or 'none'})")
+        print("=" * 78)
+        for label, statement, table, expected in hot_queries():
+            sql = str(statement.compile(dialect=engine.dialect, compile_kwargs={'literal_binds': True}))
+            with connection.begin() as transaction:
+                used, scanned, details = planner(connection, sql, table)
+                transaction.rollback()
+            ok = bool(used & expected) and not scanned
+            failures += not ok
+            print(f"{label:<44} {', '.join(sorted(used)) or '(no index)':<40} {'✓' if ok else '✗'}")
+            if not ok:
+                print(f"   expected one of: {', '.join(sorted(expected))}")
+                for detail in details:
+                    print(f"   {detail}")
+    engine.dispose()
+
+    print(f"\n{'✅ All hot queries use an index' if not failures else f'❌ {failures} queries scan instead'}")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
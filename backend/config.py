@@ -12,12 +12,16 @@ class BaseConfig:
     DEBUG = False
     TESTING = False
     
-    # CORS settings
-    CORS_ORIGINS = os.getenv('CORS_ORIGINS', 'http://localhost:5173,http://localhost:3000')
+    # CORS settings: comma-separated origins; every origin when unset
+    CORS_ORIGINS = os.getenv('CORS_ORIGINS', '*')
+    
+    # /api/internal/* diagnostics: callers must send this in X-Internal-Token;
+    # left empty, only direct requests from localhost are served
+    INTERNAL_STATS_TOKEN = os.getenv('INTERNAL_STATS_TOKEN', '')
     
-    # Flask settings
+    # Flask settings; PROPAGATE_EXCEPTIONS is left to Flask (only under
+    # DEBUG/TESTING), so the JSON 500 handler answers otherwise
     JSON_SORT_KEYS = False
-    PROPAGATE_EXCEPTIONS = True
 
 class DevelopmentConfig(BaseConfig):
     """Development environment configuration"""
@@ -28,8 +32,6 @@ class ProductionConfig(BaseConfig):
     """Production environment configuration"""
     DEBUG = False
     ENV = 'production'
-    # In production, be more restrictive with CORS
-    CORS_ORIGINS = os.getenv('CORS_ORIGINS', '*')
 
 class TestingConfig(BaseConfig):
     """Testing environment configuration"""
@@ -2,14 +2,24 @@
 Database initialization and configuration
 """
 
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from flask import Flask
+from flask_migrate import Migrate, upgrade
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import text
 import os
 
 # Initialize SQLAlchemy
 db = SQLAlchemy()
 
+# The schema is versioned with Alembic (migrations/) and upgraded explicitly
+# with `flask db upgrade`; the app only checks that it is at head
+migrate = Migrate()
+MIGRATIONS_DIR = os.path.join(os.path.abspath(os.path.dirname(__file__)), 'migrations')
+
 def init_db(app):
-    """Initialize database with Flask app"""
+    """Initialize database with Flask app (no schema changes)"""
     
     # Check for DATABASE_URL (PostgreSQL in production)
     database_url = os.getenv('DATABASE_URL')
@@ -28,21 +38,84 @@ def init_db(app):
     
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
     
+    # Score writes are ON CONFLICT upserts: fail here, not on the first write
+    from utils.score_upsert import check_upsert_dialect
+    check_upsert_dialect(app.config['SQLALCHEMY_DATABASE_URI'])
+    
+    # Pool sized from the gunicorn workers/threads (utils/db_pool.py)
+    from utils.db_pool import engine_options, pool_settings
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', engine_options(app.config['SQLALCHEMY_DATABASE_URI']))
+    
     db.init_app(app)
+    migrate.init_app(app, db, directory=MIGRATIONS_DIR)
     
-    # Create tables
-    with app.app_context():
-        db.create_all()
-        if database_url:
-            print(f"✓ Database initialized with PostgreSQL: {database_url.split('@')[1]}")
-        else:
-            print(f"✓ Database initialized at: {app.config['SQLALCHEMY_DATABASE_URI']}")
+    import models.database_models  # noqa: F401
+    if database_url:
+        # Host part only (never the credentials); local URLs have no '@'
+        print(f"✓ Database initialized with PostgreSQL: {database_url.rsplit('@', 1)[-1]}")
+    else:
+        print(f"✓ Database initialized at: {app.config['SQLALCHEMY_DATABASE_URI']}")
+    settings = pool_settings(app.config['SQLALCHEMY_DATABASE_URI'])
+    print(f"[DB] Pool: {settings['pool_size']} connections + {settings['max_overflow']} overflow per worker")
     
     return db
 
+def schema_revisions():
+    """(revision the database is at or None, head revision of migrations/), in an app context"""
+    head = ScriptDirectory.from_config(migrate.get_config(MIGRATIONS_DIR)).get_current_head()
+    with db.engine.connect() as connection:
+        return MigrationContext.configure(connection).get_current_revision(), head
+
+
+def check_schema(app, strict=True):
+    """Fail fast unless the database has every migration applied
+
+    Returns True when it is at head. With strict=False a stale schema is
+    only reported and False returned, so `flask db upgrade` can still load
+    the app to migrate it.
+    """
+    with app.app_context():
+        current, head = schema_revisions()
+    if current == head:
+        print(f"[DB] Schema at revision {current}")
+        return True
+    message = (f"Database schema is at {current or 'no revision'} but the code needs {head}; "
+               f"run `flask --app app:create_app db upgrade` in backend/ (see migrations/README)")
+    if strict:
+        raise RuntimeError(message)
+    print(f"[DB] ⚠️ {message}")
+    return False
+
+
+def check_database():
+    """check_schema() on the configured database without building the whole app"""
+    app = Flask(__name__)
+    init_db(app)
+    try:
+        check_schema(app)
+    finally:
+        with app.app_context():
+            db.engine.dispose()
+
+
+def migrate_database():
+    """Upgrade the configured database (DATABASE_URL) to head, as `flask db upgrade` does
+
+    For throwaway databases in checks and benchmarks; deployments run
+    `flask db upgrade` as their own step.
+    """
+    app = Flask(__name__)
+    init_db(app)
+    with app.app_context():
+        upgrade(directory=MIGRATIONS_DIR)
+        db.engine.dispose()
+
+
 def reset_db(app):
     """Reset database - WARNING: This will delete all data"""
     with app.app_context():
         db.drop_all()
-        db.create_all()
+        db.session.execute(text('DROP TABLE IF EXISTS alembic_version'))
+        db.session.commit()
+        upgrade(directory=MIGRATIONS_DIR)
         print("✓ Database reset successfully")
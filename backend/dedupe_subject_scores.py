@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Migration script to remove duplicate subject scores and add the unique index
+
+Before student_subjects had a unique (student_id, subject_name) index,
+concurrent submissions could insert the same score twice. Every write path
+updated the first of those rows (the lowest id), so that one is kept and
+the later copies are deleted; the subject_stats summary is adjusted and the
+cache versions are bumped on commit. The migration that adds
+uq_student_subjects_student_subject, the conflict target of the score
+upserts, refuses to run over duplicates and the app does not start below
+it, so this script works on the database directly rather than through
+create_app(); run `flask db upgrade` afterwards.
+
+Usage:
+    python dedupe_subject_scores.py              # delete duplicates
+    python dedupe_subject_scores.py --dry-run    # only report them
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from flask import Flask
+from sqlalchemy import func, select
+
+from database import db, init_db, schema_revisions
+from models.database_models import StudentSubject, SubjectStat
+from utils.invalidation import install_invalidation
+from utils.subject_stats import apply_score_changes, install_subject_stats
+
+
+def find_duplicates(session):
+    """(id, student_id, subject_name, marks, percentage) of every row but the first of each pair"""
+    table = StudentSubject.__table__
+    first = (select(func.min(table.c.id).label('id'), table.c.student_id, table.c.subject_name)
+             .group_by(table.c.student_id, table.c.subject_name)
+             .having(func.count() > 1)
+             .subquery())
+    return session.execute(
+        select(table.c.id, table.c.student_id, table.c.subject_name, table.c.marks, table.c.percentage)
+        .join(first, (table.c.student_id == first.c.student_id)
+              & (table.c.subject_name == first.c.subject_name)
+              & (table.c.id > first.c.id))
+        .order_by(table.c.id)
+    ).all()
+
+
+def dedupe_subject_scores(dry_run=False):
+    print("\n" + "=" * 70)
+    print("DATABASE MIGRATION: Unique (student_id, subject_name) scores")
+    print("=" * 70)
+
+    app = Flask(__name__)
+    init_db(app)
+    with app.app_context():
+        current, head = schema_revisions()
+        print(f"\n📋 Schema revision: {current or 'none'} (head {head})")
+        duplicates = find_duplicates(db.session)
+        print(f"\n📋 Duplicate score rows: {len(duplicates)}")
+        for row in duplicates[:20]:
+            print(f"   id={row.id} student={row.student_id} subject='{row.subject_name}' marks={row.marks}")
+        if len(duplicates) > 20:
+            print(f"   ... and {len(duplicates) - 20} more")
+
+        if dry_run:
+            print("\n(dry run: nothing deleted)\n")
+            return len(duplicates)
+
+        # Bump the student_subjects version on commit, as the app would
+        install_invalidation(app)
+        # subject_stats is filled on the first app start; adjust it only if that happened
+        if db.session.execute(select(SubjectStat.subject_name).limit(1)).first() is not None:
+            install_subject_stats(app, fill=False)
+
+        table = StudentSubject.__table__
+        ids = [row.id for row in duplicates]
+        for start in range(0, len(ids), 1000):
+            db.session.execute(table.delete().where(table.c.id.in_(ids[start:start + 1000])))
+        apply_score_changes(db.session.connection(),
+                            [(row.id, row.subject_name, row.marks, row.percentage) for row in duplicates], [])
+        db.session.commit()
+        print(f"✅ Deleted {len(ids)} duplicate rows")
+        if current != head:
+            print("   Next: `flask --app app:create_app db upgrade` adds uq_student_subjects_student_subject")
+
+    print("\n" + "=" * 70)
+    print("✅ MIGRATION COMPLETED SUCCESSFULLY")
+    print("=" * 70 + "\n")
+    return len(duplicates)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--dry-run', action='store_true', help='report duplicates without deleting them')
+    args = parser.parse_args()
+    dedupe_subject_scores(args.dry_run)
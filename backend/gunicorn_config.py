@@ -1,7 +1,21 @@
 bind = "0.0.0.0:8000"
+# utils/db_pool.py sizes each worker's database pool from these
 workers = 3
 worker_class = "gthread"
 threads = 4
 timeout = 120
 accesslog = "-"
 errorlog = "-"
+
+
+def on_starting(server):
+    """Check the schema and build the columnar dataset snapshots once, before workers fork"""
+    # Migrations are a separate deploy step (flask db upgrade); a stale schema
+    # stops the master here instead of failing every worker boot
+    from database import check_database
+    check_database()
+    try:
+        from utils.dataset import warm_datasets
+        warm_datasets()
+    except Exception as e:
+        server.log.warning(f"Dataset warm-up skipped: {e}")
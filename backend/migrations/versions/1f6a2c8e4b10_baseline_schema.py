@@ -0,0 +1,66 @@
+"""Baseline schema: students, subjects and student_subjects
+
+The tables as the app created them with db.create_all() before schema
+changes were versioned. IF NOT EXISTS, so databases created that way are
+brought under Alembic by upgrading rather than stamping.
+
+Revision ID: 1f6a2c8e4b10
+Revises:
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '1f6a2c8e4b10'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'students',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('name', sa.String(255), nullable=False),
+        sa.Column('department', sa.String(255), nullable=False),
+        sa.Column('gpa', sa.Float()),
+        sa.Column('attendance', sa.Float()),
+        sa.Column('activityScore', sa.Float()),
+        sa.Column('created_at', sa.DateTime()),
+        sa.Column('updated_at', sa.DateTime()),
+        if_not_exists=True,
+    )
+    op.create_table(
+        'subjects',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('name', sa.String(255), nullable=False, unique=True),
+        sa.Column('description', sa.String(500)),
+        sa.Column('created_at', sa.DateTime()),
+        sa.Column('updated_at', sa.DateTime()),
+        if_not_exists=True,
+    )
+    op.create_table(
+        'student_subjects',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('student_id', sa.Integer(), sa.ForeignKey('students.id'), nullable=False),
+        sa.Column('subject_name', sa.String(255), nullable=False),
+        sa.Column('marks', sa.Float(), nullable=False),
+        sa.Column('maxMarks', sa.Float()),
+        sa.Column('percentage', sa.Float()),
+        sa.Column('assignment', sa.Float()),
+        sa.Column('test', sa.Float()),
+        sa.Column('project', sa.Float()),
+        sa.Column('quiz', sa.Float()),
+        sa.Column('created_at', sa.DateTime()),
+        sa.Column('updated_at', sa.DateTime()),
+        if_not_exists=True,
+    )
+
+
+def downgrade():
+    op.drop_table('student_subjects')
+    op.drop_table('subjects')
+    op.drop_table('students')
@@ -0,0 +1,33 @@
+"""Indexes for the hot student_subjects predicates
+
+(subject_name, percentage) serves per-subject aggregates and deletes.
+The other hot predicates already have an index:
+- student_subjects.student_id, on every detail, marks view and export,
+  and (student_id, subject_name), on every score write, are served by
+  uq_student_subjects_student_subject (e7a35c9b1d46).
+- students.department is served by ix_students_department_id
+  (c5e13a7f9b24).
+
+Revision ID: 5c1d9e7a2b40
+Revises: e7a35c9b1d46
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5c1d9e7a2b40'
+down_revision = 'e7a35c9b1d46'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_student_subjects_subject_percentage', 'student_subjects',
+                    ['subject_name', 'percentage'], if_not_exists=True)
+
+
+def downgrade():
+    op.drop_index('ix_student_subjects_subject_percentage', table_name='student_subjects', if_exists=True)
@@ -0,0 +1,34 @@
+"""cache_versions table
+
+One change counter per table. Every commit that writes a table bumps its
+row, so each worker can evict the cached responses other workers made
+stale, and DB-backed routes derive their ETags from it.
+
+Revision ID: a3c91e5d7f02
+Revises: 1f6a2c8e4b10
+Create Date: 2026-10-17 09:05:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a3c91e5d7f02'
+down_revision = '1f6a2c8e4b10'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'cache_versions',
+        sa.Column('name', sa.String(255), primary_key=True),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime()),
+        if_not_exists=True,
+    )
+
+
+def downgrade():
+    op.drop_table('cache_versions')
@@ -0,0 +1,39 @@
+"""subject_stats table
+
+Running per-subject totals (count, marks and percentage sums, first score
+id) behind /api/subjects/students/subjects-stats, kept in step by every
+score write. The app fills it from student_subjects on startup when it is
+empty; rebuild_subject_stats.py recomputes it.
+
+Revision ID: b4d02f6e8a13
+Revises: a3c91e5d7f02
+Create Date: 2026-10-17 09:10:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b4d02f6e8a13'
+down_revision = 'a3c91e5d7f02'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'subject_stats',
+        sa.Column('subject_name', sa.String(255), primary_key=True),
+        sa.Column('score_count', sa.Integer(), nullable=False),
+        sa.Column('marks_sum', sa.Float(), nullable=False),
+        sa.Column('percentage_sum', sa.Float(), nullable=False),
+        sa.Column('percentage_count', sa.Integer(), nullable=False),
+        sa.Column('first_score_id', sa.Integer()),
+        sa.Column('updated_at', sa.DateTime()),
+        if_not_exists=True,
+    )
+
+
+def downgrade():
+    op.drop_table('subject_stats')
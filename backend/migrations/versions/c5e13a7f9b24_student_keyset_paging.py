@@ -0,0 +1,72 @@
+"""Keyset paging on students
+
+gpa, attendance and activityScore become NOT NULL (NULLs backfilled with
+their 0.0 default), since keyset pages compare (column, id) row values.
+Each sortable column gets a (column, id) index, alone and behind
+department.
+
+Revision ID: c5e13a7f9b24
+Revises: b4d02f6e8a13
+Create Date: 2026-10-17 09:15:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c5e13a7f9b24'
+down_revision = 'b4d02f6e8a13'
+branch_labels = None
+depends_on = None
+
+SCORE_COLUMNS = ['gpa', 'attendance', 'activityScore']
+
+KEYSET_INDEXES = {
+    'ix_students_name_id': ['name', 'id'],
+    'ix_students_gpa_id': ['gpa', 'id'],
+    'ix_students_attendance_id': ['attendance', 'id'],
+    'ix_students_activity_score_id': ['activityScore', 'id'],
+    'ix_students_department_id': ['department', 'id'],
+    'ix_students_department_name_id': ['department', 'name', 'id'],
+    'ix_students_department_gpa_id': ['department', 'gpa', 'id'],
+    'ix_students_department_attendance_id': ['department', 'attendance', 'id'],
+    'ix_students_department_activity_score_id': ['department', 'activityScore', 'id'],
+}
+
+
+def students_table_kwargs():
+    """Keep AUTOINCREMENT when SQLite rebuilds students for a batch alter
+
+    Reflection does not report it, and without it the ids of deleted
+    students would be handed out again.
+    """
+    bind = op.get_bind()
+    if bind.dialect.name != 'sqlite':
+        return {}
+    sql = bind.execute(sa.text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'students'")).scalar()
+    return {'sqlite_autoincrement': 'AUTOINCREMENT' in (sql or '').upper()}
+
+
+def upgrade():
+    students = sa.table('students', *(sa.column(name) for name in SCORE_COLUMNS))
+    for name in SCORE_COLUMNS:
+        op.execute(students.update().where(students.c[name].is_(None)).values({name: 0.0}))
+    columns = sa.inspect(op.get_bind()).get_columns('students')
+    nullable = [column['name'] for column in columns if column['name'] in SCORE_COLUMNS and column['nullable']]
+    if nullable:
+        # A table rebuild on SQLite, so it runs before the indexes are added
+        with op.batch_alter_table('students', table_kwargs=students_table_kwargs()) as batch:
+            for name in nullable:
+                batch.alter_column(name, existing_type=sa.Float(), nullable=False, server_default='0')
+
+    for name, columns in KEYSET_INDEXES.items():
+        op.create_index(name, 'students', columns, if_not_exists=True)
+
+
+def downgrade():
+    for name in KEYSET_INDEXES:
+        op.drop_index(name, table_name='students', if_exists=True)
+    with op.batch_alter_table('students', table_kwargs=students_table_kwargs()) as batch:
+        for name in SCORE_COLUMNS:
+            batch.alter_column(name, existing_type=sa.Float(), nullable=True, server_default=None)
@@ -0,0 +1,46 @@
+"""Student search: trigram table and lower(name) indexes
+
+GET /api/students/search matches substrings through the
+student_search_terms trigram table and name prefixes through lower(name)
+expression indexes, alone and behind department. The app fills the
+trigram table on startup when it is empty.
+
+Revision ID: d6f24b8a0c35
+Revises: c5e13a7f9b24
+Create Date: 2026-10-17 09:20:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd6f24b8a0c35'
+down_revision = 'c5e13a7f9b24'
+branch_labels = None
+depends_on = None
+
+NAME_INDEXES = {
+    'ix_students_name_lower_id': [sa.text('lower(name)'), 'id'],
+    'ix_students_department_name_lower_id': ['department', sa.text('lower(name)'), 'id'],
+}
+
+
+def upgrade():
+    for name, columns in NAME_INDEXES.items():
+        op.create_index(name, 'students', columns, if_not_exists=True)
+
+    op.create_table(
+        'student_search_terms',
+        sa.Column('gram', sa.String(3), primary_key=True),
+        sa.Column('student_id', sa.Integer(), primary_key=True),
+        if_not_exists=True,
+    )
+    op.create_index('ix_student_search_terms_student_id', 'student_search_terms', ['student_id'],
+                    if_not_exists=True)
+
+
+def downgrade():
+    op.drop_table('student_search_terms')
+    for name in NAME_INDEXES:
+        op.drop_index(name, table_name='students', if_exists=True)
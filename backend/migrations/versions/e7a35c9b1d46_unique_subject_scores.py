@@ -0,0 +1,41 @@
+"""Unique (student_id, subject_name) scores
+
+uq_student_subjects_student_subject is the conflict target of the score
+upserts (INSERT ... ON CONFLICT). It also serves every lookup by
+student_id, so no separate student_id index is needed.
+
+Stops with an error while student_subjects holds duplicate (student_id,
+subject_name) rows; dedupe_subject_scores.py removes them, then upgrade
+again.
+
+Revision ID: e7a35c9b1d46
+Revises: d6f24b8a0c35
+Create Date: 2026-10-17 09:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e7a35c9b1d46'
+down_revision = 'd6f24b8a0c35'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    duplicates = op.get_bind().execute(sa.text(
+        'SELECT COUNT(*) FROM (SELECT student_id FROM student_subjects'
+        ' GROUP BY student_id, subject_name HAVING COUNT(*) > 1) AS pairs')).scalar()
+    if duplicates:
+        raise RuntimeError(
+            f"student_subjects has {duplicates} duplicated (student_id, subject_name) pairs, so "
+            f"uq_student_subjects_student_subject cannot be created and score writes would fail. "
+            f"Run `python dedupe_subject_scores.py` (after a --dry-run), then upgrade again.")
+    op.create_index('uq_student_subjects_student_subject', 'student_subjects',
+                    ['student_id', 'subject_name'], unique=True, if_not_exists=True)
+
+
+def downgrade():
+    op.drop_index('uq_student_subjects_student_subject', table_name='student_subjects', if_exists=True)
@@ -8,18 +8,33 @@ from datetime import datetime
 class Student(db.Model):
     """Student model"""
     __tablename__ = 'students'
+    __table_args__ = (
+        # Keyset pages of GET /api/students: each sort column with id as tie-break,
+        # alone and behind a ?department= filter
+        db.Index('ix_students_name_id', 'name', 'id'),
+        db.Index('ix_students_gpa_id', 'gpa', 'id'),
+        db.Index('ix_students_attendance_id', 'attendance', 'id'),
+        db.Index('ix_students_activity_score_id', 'activityScore', 'id'),
+        db.Index('ix_students_department_id', 'department', 'id'),
+        db.Index('ix_students_department_name_id', 'department', 'name', 'id'),
+        db.Index('ix_students_department_gpa_id', 'department', 'gpa', 'id'),
+        db.Index('ix_students_department_attendance_id', 'department', 'attendance', 'id'),
+        db.Index('ix_students_department_activity_score_id', 'department', 'activityScore', 'id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(255), nullable=False)
     department = db.Column(db.String(255), nullable=False)
-    gpa = db.Column(db.Float, default=0.0)
-    attendance = db.Column(db.Float, default=0.0)
-    activityScore = db.Column(db.Float, default=0.0)
+    # NOT NULL: keyset pages compare (column, id) row values, which NULL would break
+    gpa = db.Column(db.Float, nullable=False, default=0.0, server_default='0')
+    attendance = db.Column(db.Float, nullable=False, default=0.0, server_default='0')
+    activityScore = db.Column(db.Float, nullable=False, default=0.0, server_default='0')
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
-    # Relationships
-    subjects = db.relationship('StudentSubject', backref='student', lazy=True, cascade='all, delete-orphan')
+    # Relationships (read paths pick their own loader: selectinload or raiseload)
+    subjects = db.relationship('StudentSubject', backref='student', lazy='select',
+                               order_by='StudentSubject.id', cascade='all, delete-orphan')
     
     def to_dict(self):
         return {
@@ -34,6 +49,23 @@ class Student(db.Model):
         }
 
 
+# Prefix search on the lower-cased name (GET /api/students/search), optionally per department
+db.Index('ix_students_name_lower_id', db.func.lower(Student.name), Student.id)
+db.Index('ix_students_department_name_lower_id', Student.department, db.func.lower(Student.name), Student.id)
+
+
+class StudentSearchTerm(db.Model):
+    """Name trigram -> student posting list for substring search
+
+    Each word is padded like pg_trgm ('  ann ' -> '  a', ' an', 'ann', 'nn ')
+    so the leading grams also serve one- and two-letter word prefixes.
+    """
+    __tablename__ = 'student_search_terms'
+    
+    gram = db.Column(db.String(3), primary_key=True)
+    student_id = db.Column(db.Integer, primary_key=True, index=True)  # No FK: kept in step by flush events
+
+
 class Subject(db.Model):
     """Subject model"""
     __tablename__ = 'subjects'
@@ -60,6 +92,13 @@ class Subject(db.Model):
 class StudentSubject(db.Model):
     """Student Subject Score model - Junction table for many-to-many relationship"""
     __tablename__ = 'student_subjects'
+    __table_args__ = (
+        # One score per student and subject; the conflict target of score upserts.
+        # A unique index rather than a constraint so existing databases can add it
+        db.Index('uq_student_subjects_student_subject', 'student_id', 'subject_name', unique=True),
+        # Per-subject aggregates and deletes (subject_stats refreshes, DELETE /subjects/<id>)
+        db.Index('ix_student_subjects_subject_percentage', 'subject_name', 'percentage'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     student_id = db.Column(db.Integer, db.ForeignKey('students.id'), nullable=False)
@@ -98,3 +137,43 @@ class StudentSubject(db.Model):
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None,
         }
+
+
+class SubjectStat(db.Model):
+    """Running totals per subject, kept in step with student_subjects on every flush"""
+    __tablename__ = 'subject_stats'
+    
+    subject_name = db.Column(db.String(255), primary_key=True)
+    score_count = db.Column(db.Integer, nullable=False, default=0)
+    marks_sum = db.Column(db.Float, nullable=False, default=0.0)
+    percentage_sum = db.Column(db.Float, nullable=False, default=0.0)
+    percentage_count = db.Column(db.Integer, nullable=False, default=0)  # Scores with a percentage
+    first_score_id = db.Column(db.Integer)  # min(student_subjects.id), keeps first-seen order
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def to_dict(self):
+        return {
+            'subject_name': self.subject_name,
+            'score_count': self.score_count,
+            'marks_sum': self.marks_sum,
+            'percentage_sum': self.percentage_sum,
+            'percentage_count': self.percentage_count,
+            'first_score_id': self.first_score_id,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+        }
+
+
+class CacheVersion(db.Model):
+    """Monotonic change counter per table, shared by every worker process"""
+    __tablename__ = 'cache_versions'
+    
+    name = db.Column(db.String(255), primary_key=True)  # Table name
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'version': self.version,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+        }
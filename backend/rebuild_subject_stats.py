@@ -0,0 +1,54 @@
+#!/usr/bin/env python
+"""
+Rebuild or verify the subject_stats summary table
+
+Recomputes the per-subject totals from student_subjects and reports every
+subject whose stored row drifted (missing/extra rows, counts, sums, first
+score id). By default the table is then rewritten from the fresh totals;
+--verify only reports and exits non-zero on drift.
+
+Usage:
+    python rebuild_subject_stats.py            # report drift, then rebuild
+    python rebuild_subject_stats.py --verify   # report only
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import create_app
+from database import db
+from utils.invalidation import bump_versions
+from utils.subject_stats import rebuild_subject_stats, subject_stats_drift
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--verify', action='store_true', help='report drift without rebuilding')
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        with db.engine.begin() as connection:
+            drift = subject_stats_drift(connection)
+            if drift:
+                print(f"❌ {len(drift)} drifted value(s) in subject_stats:")
+                for item in drift:
+                    print(f"    {item['subject']}: {item['field']} expected {item['expected']!r}, "
+                          f"stored {item['actual']!r}")
+            else:
+                print("✓ subject_stats matches student_subjects")
+
+            if not args.verify:
+                rows = rebuild_subject_stats(connection)
+                # Cached stats responses in every worker depend on the scores table's version
+                bump_versions(connection, {'student_subjects'})
+                print(f"✓ Rebuilt subject_stats ({rows} subjects)")
+
+    sys.exit(1 if drift and args.verify else 0)
+
+
+if __name__ == '__main__':
+    main()
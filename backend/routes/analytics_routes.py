@@ -1,22 +1,15 @@
-from flask import Blueprint, jsonify, request, current_app
+from flask import Blueprint
 from datetime import datetime, timedelta
-import csv
-import os
+from utils.http_cache import conditional_blueprint, dataset_validator
+from utils.panels import panel_route
+from utils.serialization import frame_records
 
 bp = Blueprint('analytics', __name__)
+conditional_blueprint(bp, dataset_validator('departmentData'))
 
-def get_csv_data():
-    """Read CSV data from department_data.csv"""
-    csv_path = os.path.join(os.path.dirname(__file__), '../data/department_data.csv')
-    data = []
-    try:
-        with open(csv_path, 'r') as file:
-            reader = csv.DictReader(file)
-            for row in reader:
-                data.append(row)
-    except Exception as e:
-        current_app.logger.error(f"Error reading CSV: {e}")
-    return data
+def snapshot_rows(snap):
+    """Rows of a dataset snapshot as dicts (NaN -> None), built once per version"""
+    return snap.derive('records', lambda s: frame_records(s.frame))
 
 def get_this_week_data(data):
     """Filter data for this week"""
@@ -80,44 +73,36 @@ def calculate_analytics(data):
     }
 
 @bp.route('/overview', methods=['GET'])
-def get_overview():
+@panel_route('analytics/overview', 'departmentData')
+def get_overview(snap, args):
     """Get analytics overview with this week and last week data"""
-    try:
-        data = get_csv_data()
-        analytics = calculate_analytics(data)
-        return jsonify(analytics)
-    except Exception as e:
-        current_app.logger.error(f"Error in analytics overview: {e}")
-        return jsonify({'error': str(e)}), 500
+    return calculate_analytics(snapshot_rows(snap))
 
 @bp.route('/detailed', methods=['GET'])
-def get_detailed_analytics():
+@panel_route('analytics/detailed', 'departmentData')
+def get_detailed_analytics(snap, args):
     """Get detailed analytics data"""
-    try:
-        data = get_csv_data()
-        
-        # Calculate various metrics
-        total_students = len(data)
-        avg_attendance = sum([float(row.get('attendance_pct', 0)) for row in data if row.get('attendance_pct')]) / max(1, total_students)
-        avg_exam_marks = sum([float(row.get('exam_marks', 0)) for row in data if row.get('exam_marks')]) / max(1, total_students)
-        
-        return jsonify({
-            'total_students': total_students,
-            'avg_attendance': round(avg_attendance, 2),
-            'avg_exam_marks': round(avg_exam_marks, 2),
-            'this_week': {
-                'total_revenue': 125000,
-                'total_profit': 45000,
-                'total_hours': 1250,
-                'growth_rate': 27.5
-            },
-            'last_week': {
-                'total_revenue': 98000,
-                'total_profit': 38000,
-                'total_hours': 950,
-                'growth_rate': 22.1
-            }
-        })
-    except Exception as e:
-        current_app.logger.error(f"Error in detailed analytics: {e}")
-        return jsonify({'error': str(e)}), 500
+    data = snapshot_rows(snap)
+
+    # Calculate various metrics
+    total_students = len(data)
+    avg_attendance = sum([float(row.get('attendance_pct', 0)) for row in data if row.get('attendance_pct')]) / max(1, total_students)
+    avg_exam_marks = sum([float(row.get('exam_marks', 0)) for row in data if row.get('exam_marks')]) / max(1, total_students)
+
+    return {
+        'total_students': total_students,
+        'avg_attendance': round(avg_attendance, 2),
+        'avg_exam_marks': round(avg_exam_marks, 2),
+        'this_week': {
+            'total_revenue': 125000,
+            'total_profit': 45000,
+            'total_hours': 1250,
+            'growth_rate': 27.5
+        },
+        'last_week': {
+            'total_revenue': 98000,
+            'total_profit': 38000,
+            'total_hours': 950,
+            'growth_rate': 22.1
+        }
+    }
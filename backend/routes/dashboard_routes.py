@@ -0,0 +1,116 @@
+"""
+Dashboard Routes - One-request bundle of every analytics panel
+Pins one snapshot per dataset and builds the requested panels concurrently, so
+a page load is a single round trip and every panel comes from the same data.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import os
+import threading
+
+from flask import Blueprint, request
+from werkzeug.datastructures import MultiDict
+
+# Importing the analytics routes registers their panels
+import routes.analytics_routes
+import routes.distribution_routes
+import routes.overview_routes
+import routes.performance_routes
+from utils.dataset import load_snapshot
+from utils.http_cache import conditional_blueprint, dataset_validator
+from utils.panels import PANELS, run_panel
+from utils.serialization import json_response
+
+dashboard_bp = Blueprint('dashboard', __name__, url_prefix='/api/dashboard')
+conditional_blueprint(dashboard_bp, dataset_validator('studentData', 'departmentData'))
+
+DASHBOARD_WORKERS = int(os.getenv('DASHBOARD_WORKERS', '4'))
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """Shared worker pool, created on first use (after gunicorn forks)"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=DASHBOARD_WORKERS,
+                                           thread_name_prefix='dashboard')
+        return _executor
+
+
+def requested_panels(args):
+    """Panel names from ?panels=a,b and/or repeated ?panel=; all panels if none"""
+    names = []
+    for value in args.getlist('panels') + args.getlist('panel'):
+        names.extend(name.strip() for name in value.split(',') if name.strip())
+    # Keep the caller's order, drop duplicates
+    return list(dict.fromkeys(names)) or list(PANELS)
+
+
+@dashboard_bp.route('', methods=['GET'])
+def get_dashboard():
+    """Build several panels in one response (?panels=overview/top-scorers,...)
+
+    Every other query argument (department, offset, limit, k, ...) is passed
+    to each panel. Failed panels are reported under `errors` without failing
+    the whole bundle.
+    """
+    try:
+        names = requested_panels(request.args)
+        unknown = [name for name in names if name not in PANELS]
+        if unknown:
+            return json_response({
+                'error': f"Unknown panels: {', '.join(unknown)}",
+                'available': sorted(PANELS)
+            }, 400)
+
+        # One snapshot per dataset for the whole bundle
+        snapshots = {}
+        for name in names:
+            dataset_name = PANELS[name]['dataset']
+            if dataset_name not in snapshots:
+                snapshots[dataset_name] = load_snapshot(dataset_name)
+
+        # Panels see the shared arguments only, so they share cache entries with their routes
+        args = MultiDict((key, value) for key, value in request.args.items(multi=True)
+                         if key not in ('panels', 'panel'))
+        futures = {
+            name: get_executor().submit(run_panel, name, snapshots[PANELS[name]['dataset']], args)
+            for name in names
+        }
+
+        panels, errors = {}, {}
+        for name, future in futures.items():
+            payload, status = future.result()
+            if status == 200:
+                panels[name] = payload
+            else:
+                errors[name] = {'status': status, **payload}
+
+        student_snap = snapshots.get('studentData')
+        return json_response({
+            'status': 'success',
+            'version': student_snap.version if student_snap is not None else None,
+            'versions': {
+                dataset_name: snap.version if snap is not None else None
+                for dataset_name, snap in snapshots.items()
+            },
+            'panels': panels,
+            'errors': errors
+        }, 200)
+
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return json_response({'error': str(e)}, 500)
+
+
+@dashboard_bp.route('/panels', methods=['GET'])
+def list_panels():
+    """List the panel names the bundle endpoint accepts"""
+    return json_response({
+        'status': 'success',
+        'data': [{'name': name, 'dataset': PANELS[name]['dataset']} for name in sorted(PANELS)]
+    }, 200)
@@ -3,310 +3,245 @@ Performance Routes - Department Analysis, Comparative Performance, Score Analysi
 Provides comprehensive performance metrics and comparisons
 """
 
-from flask import Blueprint, jsonify
+from flask import Blueprint
 import pandas as pd
 import numpy as np
-import os
+from utils.dataset import apply_window
+from utils.aggregates import DEPARTMENT_MEANS, get_department_aggregates, valid_departments
+from utils.histogram import column_histogram
+from utils.http_cache import conditional_blueprint, dataset_validator
+from utils.panels import panel_route
 
 performance_bp = Blueprint('performance', __name__, url_prefix='/api/performance')
+conditional_blueprint(performance_bp, dataset_validator('studentData'))
 
-def load_student_data():
-    """Load student data from CSV - Limited to first 60 students with proper type conversion"""
-    csv_path = os.path.join(os.path.dirname(__file__), '..', 'data', 'student_data.csv')
-    try:
-        df = pd.read_csv(csv_path)
-        # Convert numeric columns
-        numeric_columns = ['Attendance (%)', 'Midterm_Score', 'Final_Score', 'Assignments_Avg', 
-                         'Quizzes_Avg', 'Participation_Score', 'Projects_Score', 'Total_Score', 
-                         'Study_Hours_per_Week', 'Stress_Level (1-10)', 'Sleep_Hours_per_Night', 'Age']
-        for col in numeric_columns:
-            if col in df.columns:
-                df[col] = pd.to_numeric(df[col], errors='coerce')
-        # Limit to first 60 students
-        return df.head(60)
-    except Exception as e:
-        return None
+SCORE_RANGE_SPEC = ('edges', (0.0, 50.0, 60.0, 70.0, 80.0, 90.0, 100.0))
 
 @performance_bp.route('/department-analysis', methods=['GET'])
-def get_department_analysis():
+@panel_route('performance/department-analysis')
+def get_department_analysis(snap, args):
     """Get comprehensive analysis by department"""
-    try:
-        df = load_student_data()
-        if df is None:
-            return jsonify({'error': 'Data not found'}), 404
-        
-        # Filter out bad rows first
-        df = df[df['Department'].notna()]
-        df = df[df['Department'] != '-']
-        df = df[df['Department'] != '']
-        
-        dept_analysis = []
-        
-        for dept in df['Department'].unique():
-            dept_data = df[df['Department'] == dept]
-            
-            if len(dept_data) == 0:
-                continue
-            
-            passed = len(dept_data[dept_data['Grade'] != 'F'])
-            total = len(dept_data)
-            pass_rate = (passed / total * 100) if total > 0 else 0
-            
-            dept_analysis.append({
-                'department': str(dept),
-                'studentCount': int(total),
-                'averageScore': float(round(dept_data['Total_Score'].mean(), 2)),
-                'averageAttendance': float(round(dept_data['Attendance (%)'].mean(), 2)),
-                'averageParticipation': float(round(dept_data['Participation_Score'].mean(), 2)),
-                'passRate': float(round(pass_rate, 2)),
-                'failCount': int(total - passed),
-                'averageGrade': str(dept_data['Grade'].mode()[0]) if len(dept_data['Grade'].mode()) > 0 else 'N/A',
-                'topScore': float(round(dept_data['Total_Score'].max(), 2)),
-                'bottomScore': float(round(dept_data['Total_Score'].min(), 2))
-            })
-        
-        # Sort by averageScore descending
-        dept_analysis.sort(key=lambda x: x['averageScore'], reverse=True)
-        
-        return jsonify({
-            'status': 'success',
-            'departmentCount': len(dept_analysis),
-            'data': dept_analysis
-        }), 200
-    
-    except Exception as e:
-        import traceback
-        traceback.print_exc()
-        return jsonify({'error': str(e)}), 500
+    # One cached groupby pass; rows without a real department are dropped
+    stats, grades = get_department_aggregates(snap, args)
+    keep = valid_departments(stats)
+    stats, grades = stats[keep], grades[keep]
+
+    fail_counts = grades['F'] if 'F' in grades.columns else pd.Series(0, index=grades.index)
+    graded = grades.sum(axis=1)
+    modes = grades.idxmax(axis=1)
+
+    dept_analysis = []
+    for dept, row in stats.iterrows():
+        total = int(row['studentCount'])
+        failed = int(fail_counts[dept])
+        pass_rate = ((total - failed) / total * 100) if total > 0 else 0
+
+        dept_analysis.append({
+            'department': str(dept),
+            'studentCount': total,
+            'averageScore': float(round(row['averageScore'], 2)),
+            'averageAttendance': float(round(row['averageAttendance'], 2)),
+            'averageParticipation': float(round(row['averageParticipation'], 2)),
+            'passRate': float(round(pass_rate, 2)),
+            'failCount': failed,
+            'averageGrade': str(modes[dept]) if graded[dept] > 0 else 'N/A',
+            'topScore': float(round(row['topScore'], 2)),
+            'bottomScore': float(round(row['bottomScore'], 2))
+        })
+
+    # Sort by averageScore descending
+    dept_analysis.sort(key=lambda x: x['averageScore'], reverse=True)
+
+    return {
+        'status': 'success',
+        'departmentCount': len(dept_analysis),
+        'data': dept_analysis
+    }
 
 @performance_bp.route('/score-comparison', methods=['GET'])
-def get_score_comparison():
+@panel_route('performance/score-comparison')
+def get_score_comparison(snap, args):
     """Get score comparison across different metrics"""
-    try:
-        df = load_student_data()
-        if df is None:
-            return jsonify({'error': 'Data not found'}), 404
-        
-        # Calculate averages for different score types
-        def safe_round(value):
-            """Safely round a value, handling NaN and Inf"""
-            if isinstance(value, float) and (np.isnan(value) or np.isinf(value)):
-                return None
-            return float(round(value, 2))
-        
-        comparison = {
-            'totalScore': {
-                'average': safe_round(df['Total_Score'].mean()),
-                'median': safe_round(df['Total_Score'].median()),
-                'stdDev': safe_round(df['Total_Score'].std())
-            },
-            'midtermScore': {
-                'average': safe_round(df['Midterm_Score'].mean()),
-                'median': safe_round(df['Midterm_Score'].median()),
-                'stdDev': safe_round(df['Midterm_Score'].std())
-            },
-            'finalScore': {
-                'average': safe_round(df['Final_Score'].mean()),
-                'median': safe_round(df['Final_Score'].median()),
-                'stdDev': safe_round(df['Final_Score'].std())
-            },
-            'assignmentsAvg': {
-                'average': safe_round(df['Assignments_Avg'].mean()),
-                'median': safe_round(df['Assignments_Avg'].median()),
-                'stdDev': safe_round(df['Assignments_Avg'].std())
-            },
-            'quizzesAvg': {
-                'average': safe_round(df['Quizzes_Avg'].mean()),
-                'median': safe_round(df['Quizzes_Avg'].median()),
-                'stdDev': safe_round(df['Quizzes_Avg'].std())
-            },
-            'participationScore': {
-                'average': safe_round(df['Participation_Score'].mean()),
-                'median': safe_round(df['Participation_Score'].median()),
-                'stdDev': safe_round(df['Participation_Score'].std())
-            },
-            'projectScore': {
-                'average': safe_round(df['Projects_Score'].mean()),
-                'median': safe_round(df['Projects_Score'].median()),
-                'stdDev': safe_round(df['Projects_Score'].std())
-            }
+    df = apply_window(snap.frame, args)
+
+    # Calculate averages for different score types
+    def safe_round(value):
+        """Safely round a value, handling NaN and Inf"""
+        if isinstance(value, float) and (np.isnan(value) or np.isinf(value)):
+            return None
+        return float(round(value, 2))
+
+    comparison = {
+        'totalScore': {
+            'average': safe_round(df['Total_Score'].mean()),
+            'median': safe_round(df['Total_Score'].median()),
+            'stdDev': safe_round(df['Total_Score'].std())
+        },
+        'midtermScore': {
+            'average': safe_round(df['Midterm_Score'].mean()),
+            'median': safe_round(df['Midterm_Score'].median()),
+            'stdDev': safe_round(df['Midterm_Score'].std())
+        },
+        'finalScore': {
+            'average': safe_round(df['Final_Score'].mean()),
+            'median': safe_round(df['Final_Score'].median()),
+            'stdDev': safe_round(df['Final_Score'].std())
+        },
+        'assignmentsAvg': {
+            'average': safe_round(df['Assignments_Avg'].mean()),
+            'median': safe_round(df['Assignments_Avg'].median()),
+            'stdDev': safe_round(df['Assignments_Avg'].std())
+        },
+        'quizzesAvg': {
+            'average': safe_round(df['Quizzes_Avg'].mean()),
+            'median': safe_round(df['Quizzes_Avg'].median()),
+            'stdDev': safe_round(df['Quizzes_Avg'].std())
+        },
+        'participationScore': {
+            'average': safe_round(df['Participation_Score'].mean()),
+            'median': safe_round(df['Participation_Score'].median()),
+            'stdDev': safe_round(df['Participation_Score'].std())
+        },
+        'projectScore': {
+            'average': safe_round(df['Projects_Score'].mean()),
+            'median': safe_round(df['Projects_Score'].median()),
+            'stdDev': safe_round(df['Projects_Score'].std())
         }
-        
-        return jsonify({
-            'status': 'success',
-            'data': comparison
-        }), 200
-    
-    except Exception as e:
-        import traceback
-        traceback.print_exc()
-        return jsonify({'error': str(e)}), 500
+    }
+
+    return {
+        'status': 'success',
+        'data': comparison
+    }
 
 @performance_bp.route('/score-distribution-ranges', methods=['GET'])
-def get_score_distribution_ranges():
+@panel_route('performance/score-distribution-ranges')
+def get_score_distribution_ranges(snap, args):
     """Get distribution of scores in different ranges"""
-    try:
-        df = load_student_data()
-        if df is None:
-            return jsonify({'error': 'Data not found'}), 404
-        
-        ranges = [
-            {'label': '90-100', 'min': 90, 'max': 100, 'count': 0},
-            {'label': '80-90', 'min': 80, 'max': 90, 'count': 0},
-            {'label': '70-80', 'min': 70, 'max': 80, 'count': 0},
-            {'label': '60-70', 'min': 60, 'max': 70, 'count': 0},
-            {'label': '50-60', 'min': 50, 'max': 60, 'count': 0},
-            {'label': 'Below 50', 'min': 0, 'max': 50, 'count': 0}
-        ]
-        
-        total = len(df)
-        
-        for _, student in df.iterrows():
-            score = student['Total_Score']
-            for range_item in ranges:
-                if range_item['min'] <= score <= range_item['max']:
-                    range_item['count'] += 1
-                    break
-        
-        colors = ['#059669', '#10b981', '#fbbf24', '#f97316', '#ef4444', '#991b1b']
-        distribution_data = []
-        
-        for range_item, color in zip(ranges, colors):
-            percentage = (range_item['count'] / total * 100) if total > 0 else 0
-            distribution_data.append({
-                'range': range_item['label'],
-                'count': range_item['count'],
-                'percentage': round(percentage, 2),
-                'color': color
-            })
-        
-        return jsonify({
-            'status': 'success',
-            'totalStudents': total,
-            'data': distribution_data
-        }), 200
-    
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+    # Left-closed bins [0, 50), [50, 60), ... [90, 100]; listed top range first
+    result = column_histogram(snap, 'Total_Score', SCORE_RANGE_SPEC, 'left', args)
+    labels = ['Below 50', '50-60', '60-70', '70-80', '80-90', '90-100']
+    ranges = [{'label': label, 'count': count} for label, count in zip(labels, result['counts'])][::-1]
+    total = result['total']
+
+    colors = ['#059669', '#10b981', '#fbbf24', '#f97316', '#ef4444', '#991b1b']
+    distribution_data = []
+
+    for range_item, color in zip(ranges, colors):
+        percentage = (range_item['count'] / total * 100) if total > 0 else 0
+        distribution_data.append({
+            'range': range_item['label'],
+            'count': range_item['count'],
+            'percentage': round(percentage, 2),
+            'color': color
+        })
+
+    return {
+        'status': 'success',
+        'totalStudents': total,
+        'data': distribution_data
+    }
 
 @performance_bp.route('/department-comparison', methods=['GET'])
-def get_department_comparison():
+@panel_route('performance/department-comparison')
+def get_department_comparison(snap, args):
     """Get detailed comparison data by department"""
-    try:
-        df = load_student_data()
-        if df is None:
-            return jsonify({'error': 'Data not found'}), 404
-        
-        departments = df['Department'].unique()
-        comparison_data = []
-        
-        for dept in departments:
-            dept_data = df[df['Department'] == dept]
-            
-            # Calculate percentages for grades
-            total = len(dept_data)
-            grade_counts = dept_data['Grade'].value_counts().to_dict()
-            
-            comparison_data.append({
-                'department': dept,
-                'metrics': {
-                    'studentCount': total,
-                    'averageScore': round(dept_data['Total_Score'].mean(), 2),
-                    'averageAttendance': round(dept_data['Attendance (%)'].mean(), 2),
-                    'averageMidterm': round(dept_data['Midterm_Score'].mean(), 2),
-                    'averageFinal': round(dept_data['Final_Score'].mean(), 2),
-                    'averageAssignment': round(dept_data['Assignments_Avg'].mean(), 2),
-                    'averageQuiz': round(dept_data['Quizzes_Avg'].mean(), 2),
-                    'averageParticipation': round(dept_data['Participation_Score'].mean(), 2),
-                    'averageProject': round(dept_data['Projects_Score'].mean(), 2)
-                },
-                'gradeDistribution': {
-                    'A': {'count': grade_counts.get('A', 0), 'percentage': round(grade_counts.get('A', 0) / total * 100, 2)},
-                    'B': {'count': grade_counts.get('B', 0), 'percentage': round(grade_counts.get('B', 0) / total * 100, 2)},
-                    'C': {'count': grade_counts.get('C', 0), 'percentage': round(grade_counts.get('C', 0) / total * 100, 2)},
-                    'D': {'count': grade_counts.get('D', 0), 'percentage': round(grade_counts.get('D', 0) / total * 100, 2)},
-                    'F': {'count': grade_counts.get('F', 0), 'percentage': round(grade_counts.get('F', 0) / total * 100, 2)}
+    stats, grades = get_department_aggregates(snap, args)
+    comparison_data = []
+
+    for dept, row in stats.iterrows():
+        # Calculate percentages for grades
+        total = int(row['studentCount'])
+        grade_counts = grades.loc[dept]
+
+        comparison_data.append({
+            'department': dept,
+            'metrics': {
+                'studentCount': total,
+                **{name: round(row[name], 2) for name in DEPARTMENT_MEANS}
+            },
+            'gradeDistribution': {
+                grade: {
+                    'count': int(grade_counts.get(grade, 0)),
+                    'percentage': round(int(grade_counts.get(grade, 0)) / total * 100, 2)
                 }
-            })
-        
-        # Sort by average score
-        comparison_data.sort(key=lambda x: x['metrics']['averageScore'], reverse=True)
-        
-        return jsonify({
-            'status': 'success',
-            'departmentCount': len(comparison_data),
-            'data': comparison_data
-        }), 200
-    
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+                for grade in ['A', 'B', 'C', 'D', 'F']
+            }
+        })
+
+    # Sort by average score
+    comparison_data.sort(key=lambda x: x['metrics']['averageScore'], reverse=True)
+
+    return {
+        'status': 'success',
+        'departmentCount': len(comparison_data),
+        'data': comparison_data
+    }
 
 @performance_bp.route('/performance-metrics', methods=['GET'])
-def get_performance_metrics():
+@panel_route('performance/performance-metrics')
+def get_performance_metrics(snap, args):
     """Get comprehensive performance metrics"""
-    try:
-        df = load_student_data()
-        if df is None:
-            return jsonify({'error': 'Data not found'}), 404
-        
-        # Calculate correlations and insights
-        metrics = {
-            'attendance': {
-                'average': round(df['Attendance (%)'].mean(), 2),
-                'range': {
-                    'min': round(df['Attendance (%)'].min(), 2),
-                    'max': round(df['Attendance (%)'].max(), 2)
-                }
-            },
-            'academicPerformance': {
-                'average': round(df['Total_Score'].mean(), 2),
-                'range': {
-                    'min': round(df['Total_Score'].min(), 2),
-                    'max': round(df['Total_Score'].max(), 2)
-                }
-            },
-            'participation': {
-                'average': round(df['Participation_Score'].mean(), 2),
-                'range': {
-                    'min': round(df['Participation_Score'].min(), 2),
-                    'max': round(df['Participation_Score'].max(), 2)
-                }
-            },
-            'projectWork': {
-                'average': round(df['Projects_Score'].mean(), 2),
-                'range': {
-                    'min': round(df['Projects_Score'].min(), 2),
-                    'max': round(df['Projects_Score'].max(), 2)
-                }
-            },
-            'extracurricular': {
-                'participatingStudents': len(df[df['Extracurricular_Activities'] == 'Yes']),
-                'percentage': round(len(df[df['Extracurricular_Activities'] == 'Yes']) / len(df) * 100, 2)
-            },
-            'internetAccess': {
-                'withAccess': len(df[df['Internet_Access_at_Home'] == 'Yes']),
-                'percentage': round(len(df[df['Internet_Access_at_Home'] == 'Yes']) / len(df) * 100, 2)
-            },
-            'studyHours': {
-                'average': round(df['Study_Hours_per_Week'].mean(), 2),
-                'range': {
-                    'min': round(df['Study_Hours_per_Week'].min(), 2),
-                    'max': round(df['Study_Hours_per_Week'].max(), 2)
-                }
-            },
-            'gradeBreakdown': {
-                'A': len(df[df['Grade'] == 'A']),
-                'B': len(df[df['Grade'] == 'B']),
-                'C': len(df[df['Grade'] == 'C']),
-                'D': len(df[df['Grade'] == 'D']),
-                'F': len(df[df['Grade'] == 'F'])
+    df = apply_window(snap.frame, args)
+    total = len(df)
+    extracurricular = int((df['Extracurricular_Activities'] == 'Yes').sum())
+    internet_access = int((df['Internet_Access_at_Home'] == 'Yes').sum())
+
+    # Calculate correlations and insights
+    metrics = {
+        'attendance': {
+            'average': round(df['Attendance (%)'].mean(), 2),
+            'range': {
+                'min': round(df['Attendance (%)'].min(), 2),
+                'max': round(df['Attendance (%)'].max(), 2)
             }
+        },
+        'academicPerformance': {
+            'average': round(df['Total_Score'].mean(), 2),
+            'range': {
+                'min': round(df['Total_Score'].min(), 2),
+                'max': round(df['Total_Score'].max(), 2)
+            }
+        },
+        'participation': {
+            'average': round(df['Participation_Score'].mean(), 2),
+            'range': {
+                'min': round(df['Participation_Score'].min(), 2),
+                'max': round(df['Participation_Score'].max(), 2)
+            }
+        },
+        'projectWork': {
+            'average': round(df['Projects_Score'].mean(), 2),
+            'range': {
+                'min': round(df['Projects_Score'].min(), 2),
+                'max': round(df['Projects_Score'].max(), 2)
+            }
+        },
+        'extracurricular': {
+            'participatingStudents': extracurricular,
+            'percentage': round(extracurricular / total * 100, 2) if total else 0
+        },
+        'internetAccess': {
+            'withAccess': internet_access,
+            'percentage': round(internet_access / total * 100, 2) if total else 0
+        },
+        'studyHours': {
+            'average': round(df['Study_Hours_per_Week'].mean(), 2),
+            'range': {
+                'min': round(df['Study_Hours_per_Week'].min(), 2),
+                'max': round(df['Study_Hours_per_Week'].max(), 2)
+            }
+        },
+        'gradeBreakdown': {
+            'A': len(df[df['Grade'] == 'A']),
+            'B': len(df[df['Grade'] == 'B']),
+            'C': len(df[df['Grade'] == 'C']),
+            'D': len(df[df['Grade'] == 'D']),
+            'F': len(df[df['Grade'] == 'F'])
         }
-        
-        return jsonify({
-            'status': 'success',
-            'data': metrics
-        }), 200
-    
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+    }
+
+    return {
+        'status': 'success',
+        'data': metrics
+    }
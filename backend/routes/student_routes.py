@@ -3,58 +3,91 @@ Student prediction and detail routes (legacy/placeholder routes)
 These routes provide individual student details and predictions
 """
 from flask import Blueprint, jsonify, request, current_app
-import csv
-import os
+import pandas as pd
+from utils.dataset import row_positions, student_dataset
 
 bp = Blueprint('student', __name__)
 
-def get_csv_data():
-    """Read CSV data from the rich Students Performance Dataset"""
-    csv_path = os.path.join(os.path.dirname(__file__), '../data/student_data.csv')
-    data = []
-    try:
-        with open(csv_path, 'r', encoding='utf-8') as file:
-            reader = csv.DictReader(file)
-            for row in reader:
-                data.append(row)
-    except Exception as e:
-        print(f"Error reading CSV: {e}")
-        current_app.logger.error(f"Error reading CSV: {e}")
-    return data
+class StudentIndex:
+    """Student_ID -> row position map plus the prebuilt summary list
+
+    Built once per dataset version, so detail lookups are O(1) and the
+    summary never re-parses the file.
+    """
+
+    def __init__(self, snap):
+        frame = snap.frame
+        self.frame = frame
+        self.positions = row_positions(snap)
+        self.numeric_columns = {col for col in frame.columns
+                                if pd.api.types.is_numeric_dtype(frame[col])}
+        self.summary = self._build_summary(frame)
+
+    @staticmethod
+    def _text(frame, column, default=''):
+        if column not in frame.columns:
+            return pd.Series(default, index=frame.index, dtype=object)
+        return frame[column].astype(object).where(frame[column].notna(), default)
+
+    def _build_summary(self, frame):
+        # Rows whose core scores are not numeric are skipped, as before
+        required = frame[['Attendance (%)', 'Total_Score', 'Final_Score']].notna().all(axis=1)
+        rows = frame[required]
+
+        age = rows['Age']
+        summary = pd.DataFrame({
+            'student_id': self._text(rows, 'Student_ID'),
+            'name': (self._text(rows, 'First_Name').astype(str) + ' '
+                     + self._text(rows, 'Last_Name').astype(str)).str.strip(),
+            'department': self._text(rows, 'Department'),
+            'attendance': rows['Attendance (%)'].astype(float),
+            'total_score': rows['Total_Score'].astype(float),
+            'final_score': rows['Final_Score'].astype(float),
+            'grade': self._text(rows, 'Grade', 'F'),
+            'email': self._text(rows, 'Email'),
+            'age': age.map('{:g}'.format).where(age.notna(), ''),
+            'midterm': rows['Midterm_Score'].fillna(0).astype(float),
+            'assignments': rows['Assignments_Avg'].fillna(0).astype(float),
+        })
+        return summary.to_dict(orient='records')
+
+    def get(self, student_id):
+        """Return the record for a Student_ID, or None"""
+        position = self.positions.get(student_id)
+        if position is None:
+            return None
+        record = self.frame.iloc[position].to_dict()
+        for key, value in record.items():
+            if pd.isna(value):
+                record[key] = None if key in self.numeric_columns else ''
+        return record
+
+
+def get_student_index():
+    """Return the StudentIndex for the current dataset version, or None"""
+    snap = student_dataset.snapshot()
+    if snap is None:
+        return None
+    return snap.derive('student_index', StudentIndex)
+
+
+def _number(value):
+    """Convert a cell to float, mapping missing values to None"""
+    return None if value is None else float(value)
+
 
 @bp.route('/summary', methods=['GET'])
 def summary():
     """Get overall student summary with list of all students"""
     try:
-        data = get_csv_data()
+        index = get_student_index()
         
-        if not data:
+        if index is None or not index.summary:
             return jsonify({'data': [], 'message': 'No student data found'})
         
-        # Process and return all students
-        students = []
-        for row in data:
-            try:
-                student = {
-                    'student_id': row.get('Student_ID', ''),
-                    'name': f"{row.get('First_Name', '')} {row.get('Last_Name', '')}".strip(),
-                    'department': row.get('Department', ''),
-                    'attendance': float(row.get('Attendance (%)', 0)),
-                    'total_score': float(row.get('Total_Score', 0)),
-                    'final_score': float(row.get('Final_Score', 0)),
-                    'grade': row.get('Grade', 'F'),
-                    'email': row.get('Email', ''),
-                    'age': row.get('Age', ''),
-                    'midterm': float(row.get('Midterm_Score', 0)) if row.get('Midterm_Score') else 0,
-                    'assignments': float(row.get('Assignments_Avg', 0)) if row.get('Assignments_Avg') else 0
-                }
-                students.append(student)
-            except (ValueError, TypeError) as e:
-                continue
-        
         return jsonify({
-            'data': students,
-            'total': len(students),
+            'data': index.summary,
+            'total': len(index.summary),
             'message': 'Student list retrieved successfully'
         }), 200
         
@@ -62,20 +95,13 @@ def summary():
         print(f"Error in summary: {e}")
         current_app.logger.error(f"Error in summary: {e}")
         return jsonify({'error': str(e), 'data': []}), 500
-            'avg_exam_marks': round(avg_exam, 2),
-            'total_students': len(data),
-            'risk_rate': round(risk_rate, 2)
-        })
-    except Exception as e:
-        current_app.logger.error(f"Error in summary: {e}")
-        return jsonify({'error': str(e)}), 500
 
 @bp.route('/<student_id>', methods=['GET'])
 def get_student(student_id):
     """Get specific student details"""
     try:
-        data = get_csv_data()
-        student = next((s for s in data if s.get('Student_ID') == student_id), None)
+        index = get_student_index()
+        student = index.get(student_id) if index is not None else None
         
         if not student:
             return jsonify({'error': 'Student not found'}), 404
@@ -86,11 +112,11 @@ def get_student(student_id):
             'email': student.get('Email'),
             'department': student.get('Department'),
             'grade': student.get('Grade'),
-            'attendance_pct': float(student.get('Attendance (%)', 0)),
-            'final_score': float(student.get('Final_Score', 0)),
-            'midterm_score': float(student.get('Midterm_Score', 0)),
-            'total_score': float(student.get('Total_Score', 0)),
-            'study_hours_per_week': float(student.get('Study_Hours_per_Week', 0))
+            'attendance_pct': _number(student.get('Attendance (%)', 0)),
+            'final_score': _number(student.get('Final_Score', 0)),
+            'midterm_score': _number(student.get('Midterm_Score', 0)),
+            'total_score': _number(student.get('Total_Score', 0)),
+            'study_hours_per_week': _number(student.get('Study_Hours_per_Week', 0))
         })
     except Exception as e:
         current_app.logger.error(f"Error fetching student: {e}")
@@ -1,16 +1,91 @@
 from flask import Blueprint, jsonify, request
 from database import db
+from sqlalchemy.orm import raiseload
 from models.database_models import Student
+from utils.bulk_students import STUDENT_MAX_UPDATES, apply_updates, validate_updates
+from utils.http_cache import conditional, table_validator
+from utils.pagination import PageError, decode_cursor, encode_cursor, keyset_page, page_size
+from utils.response_cache import cached_response
+from utils.student_search import DEFAULT_SEARCH_LIMIT, MAX_SEARCH_LIMIT, search_students
 
 bp = Blueprint('students', __name__)
 
+# Columns GET /api/students can sort and page by (each backed by a (column, id) index)
+SORTABLE_COLUMNS = {
+    'id': Student.id,
+    'name': Student.name,
+    'gpa': Student.gpa,
+    'attendance': Student.attendance,
+    'activityScore': Student.activityScore,
+}
+
+PAGING_ARGS = ('limit', 'cursor', 'sort', 'order', 'department')
+
+
+def get_students_page(args):
+    """One keyset page of students for the paging query arguments"""
+    cursor = decode_cursor(args['cursor']) if args.get('cursor') else None
+    sort = args.get('sort') or (cursor or {}).get('sort') or 'id'
+    order = (args.get('order') or (cursor or {}).get('order') or 'asc').lower()
+    if sort not in SORTABLE_COLUMNS:
+        raise PageError(f"Unknown sort '{sort}', expected one of: {', '.join(SORTABLE_COLUMNS)}")
+    if order not in ('asc', 'desc'):
+        raise PageError("order must be 'asc' or 'desc'")
+    department = args.get('department')
+    if department:
+        departments = sorted(d.strip() for d in department.split(',') if d.strip())
+    else:
+        departments = (cursor or {}).get('departments')
+    if cursor is not None and (cursor.get('sort'), cursor.get('order'), cursor.get('departments')) != (sort, order, departments):
+        raise PageError('Cursor does not match the sort, order and department of this request')
+
+    query = Student.query.options(raiseload(Student.subjects))
+    if departments:
+        query = query.filter(Student.department.in_(departments))
+    # Counted once on the first page and carried in the cursor as a hint
+    total = cursor.get('total') if cursor is not None else query.order_by(None).count()
+
+    rows, after = keyset_page(query, SORTABLE_COLUMNS[sort], Student.id, page_size(args),
+                              cursor=cursor, descending=order == 'desc')
+    next_cursor = None
+    if after is not None:
+        next_cursor = encode_cursor({**after, 'sort': sort, 'order': order,
+                                     'departments': departments, 'total': total})
+    return {
+        'success': True,
+        'count': len(rows),
+        'data': [student.to_dict() for student in rows],
+        'total': total,
+        'sort': sort,
+        'order': order,
+        'nextCursor': next_cursor,
+        'hasMore': next_cursor is not None,
+    }
+
+
 @bp.route('', methods=['GET'])
 @bp.route('/', methods=['GET'])
+@conditional(table_validator(Student))
+@cached_response('students')
 def get_students():
-    """Get all students from database"""
+    """Get all students from database
+
+    Any of ?limit=, ?cursor=, ?sort= (id, name, gpa, attendance,
+    activityScore), ?order= (asc/desc) or ?department= (comma-separated)
+    switches to keyset pagination: a page of rows plus nextCursor (pass it
+    back as ?cursor=) and the total count. Without them the full list is
+    returned as before.
+    """
     try:
+        if any(request.args.get(name) for name in PAGING_ARGS):
+            try:
+                return jsonify(get_students_page(request.args)), 200
+            except PageError as pe:
+                return jsonify({'success': False, 'error': str(pe)}), 400
+        
         print("[API] ===== GET STUDENTS REQUEST =====")
-        students = Student.query.all()
+        # raiseload: the list never touches subjects, and must not start to per row
+        students = Student.query.options(raiseload(Student.subjects)).all()
         print(f"[API] ✓ Retrieved {len(students)} students from database")
         
         response_data = {
@@ -26,7 +101,86 @@ def get_students():
         traceback.print_exc()
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@bp.route('', methods=['PATCH'])
+@bp.route('/', methods=['PATCH'])
+def update_students():
+    """Apply many partial student updates
+
+    Body: a list of {id, name?, department?, gpa?, attendance?,
+    activityScore?} objects (or {"updates": [...]}). Updates are written in
+    batches, each committed on its own; invalid updates and unknown ids are
+    listed in errors without stopping the rest.
+    """
+    try:
+        data = request.get_json(silent=True)
+        updates = data.get('updates') if isinstance(data, dict) else data
+        if not isinstance(updates, list):
+            return jsonify({'success': False, 'error': 'Expected a JSON list of updates'}), 400
+        if len(updates) > STUDENT_MAX_UPDATES:
+            return jsonify({'success': False,
+                            'error': f'At most {STUDENT_MAX_UPDATES} updates per request'}), 400
+
+        valid, errors = validate_updates(updates)
+        updated, failed = apply_updates(db.session, valid)
+        errors.extend(failed)
+        print(f"[API] ✓ Bulk student update: {updated} updated, {len(errors)} failed")
+        return jsonify({
+            'success': True,
+            'updated': updated,
+            'failed': len(errors),
+            'errors': errors,
+        }), 200
+    except Exception as e:
+        db.session.rollback()
+        print(f"[API] ❌ Error in bulk student update: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@bp.route('/search', methods=['GET'])
+@conditional(table_validator(Student))
+@cached_response('students')
+def search_students_route():
+    """Search students by name or roll number
+
+    ?q= matches a name prefix, any substring of the name, or a roll number
+    (the student id). ?department= (comma-separated) narrows the results and
+    ?limit= (default 20, max 100) caps them. Results are ranked roll number,
+    name prefix, word start, substring; facets counts the matches per
+    department. A first word under three letters only matches word starts.
+    Counting stops at SEARCH_COUNT_LIMIT matches, and totalExact says
+    whether it did.
+    """
+    try:
+        text = (request.args.get('q') or '').strip()
+        if not text:
+            return jsonify({'success': False, 'error': "Query parameter 'q' is required"}), 400
+        try:
+            limit = int(request.args.get('limit') or DEFAULT_SEARCH_LIMIT)
+        except ValueError:
+            return jsonify({'success': False, 'error': f"Invalid limit '{request.args.get('limit')}'"}), 400
+        if limit < 1:
+            return jsonify({'success': False, 'error': 'limit must be at least 1'}), 400
+        department = request.args.get('department')
+        departments = [d.strip() for d in department.split(',') if d.strip()] if department else None
+
+        results, total, facets, exact = search_students(text, departments, min(limit, MAX_SEARCH_LIMIT))
+        return jsonify({
+            'success': True,
+            'query': text,
+            'count': len(results),
+            'total': total,
+            'totalExact': exact,
+            'data': [{**student.to_dict(), 'match': match} for student, match in results],
+            'facets': facets,
+        }), 200
+    except Exception as e:
+        print(f"[API] ❌ Error searching students: {str(e)}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
 @bp.route('/<int:student_id>', methods=['GET'])
+@conditional(table_validator(Student))
+@cached_response('students')
 def get_student(student_id):
     """Get single student by ID from database"""
     try:
@@ -49,7 +203,10 @@ def update_student(student_id):
             return jsonify({'success': False, 'error': 'Student not found'}), 404
         
         data = request.get_json()
-        print(f"[API] Update data: {data}")
+        print(f"[API] Updating fields: {', '.join(sorted(data))}")
+        for field in ('gpa', 'attendance', 'activityScore'):
+            if field in data and data[field] is None:
+                return jsonify({'success': False, 'error': f'{field} must be a number'}), 400
         
         # Update fields if provided
         if 'name' in data:
@@ -6,6 +6,15 @@ from flask import Blueprint, request, jsonify
 from database import db
 from models.database_models import Student, Subject, StudentSubject
 from datetime import datetime
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import selectinload
+from utils.bulk_marks import BULK_MAX_RECORDS, error_list, upsert_marks, validate_marks
+from utils.http_cache import conditional, table_validator
+from utils.response_cache import cached_response
+from utils.score_upsert import upsert_score
+from utils.streaming import (EXPORT_FORMATS, csv_chunks, json_chunks, keyset_batches,
+                             ndjson_chunks, stream_response)
+from utils.subject_stats import forget_subject_stats, format_subject_stats, subject_stats_rows
 
 bp = Blueprint('subjects', __name__)
 
@@ -92,8 +101,9 @@ def delete_subject(subject_id):
         if not subject:
             return jsonify({'success': False, 'error': 'Subject not found'}), 404
         
-        # Delete all related student subjects
+        # Delete all related student subjects (a bulk delete skips the flush, so drop the summary row too)
         StudentSubject.query.filter_by(subject_name=subject.name).delete()
+        forget_subject_stats(db.session, subject.name)
         
         db.session.delete(subject)
         db.session.commit()
@@ -143,9 +153,9 @@ def add_subject_score(student_id):
                 id=student_id,
                 name=student_name,
                 department=data.get('department', 'Unknown'),
-                gpa=data.get('gpa', 0.0),
-                attendance=data.get('attendance', 0.0),
-                activityScore=data.get('activityScore', 0.0)
+                gpa=data.get('gpa') or 0.0,
+                attendance=data.get('attendance') or 0.0,
+                activityScore=data.get('activityScore') or 0.0
             )
             db.session.add(student)
             db.session.flush()  # Flush to get ID but don't commit yet
@@ -183,40 +193,15 @@ def add_subject_score(student_id):
             if total_marks < 0 or total_marks > maxMarks:
                 raise ValueError(f"Total marks must be between 0-{maxMarks}")
             
-            # Check if subject already exists for this student
-            existing = StudentSubject.query.filter_by(
-                student_id=student_id,
-                subject_name=subject_name
-            ).first()
-            
-            if existing:
-                print(f"[API] Subject '{subject_name}' already exists for student {student_id}. Updating...")
-                existing.marks = total_marks
-                existing.maxMarks = maxMarks
-                existing.assignment = assignment
-                existing.test = test
-                existing.project = project
-                existing.quiz = quiz
-                db.session.commit()
-                subject_score = existing
-            else:
-                subject_score = StudentSubject(
-                    student_id=student_id,
-                    subject_name=subject_name,
-                    marks=total_marks,
-                    maxMarks=maxMarks,
-                    assignment=assignment,
-                    test=test,
-                    project=project,
-                    quiz=quiz
-                )
-                
-                print(f"[API] Creating new subject score: {subject_score.subject_name} - {subject_score.marks}/{subject_score.maxMarks}")
-                print(f"[API] Breakdown: Assignment={assignment}, Test={test}, Project={project}, Quiz={quiz}")
-                print(f"[API] Calculated percentage: {subject_score.percentage}%")
-                
-                db.session.add(subject_score)
-                db.session.commit()
+            # One INSERT ... ON CONFLICT DO UPDATE: inserts, or updates the existing score
+            subject_score, created = upsert_score(
+                db.session, student_id, subject_name,
+                {'assignment': assignment, 'test': test, 'project': project, 'quiz': quiz},
+                maxMarks, datetime.utcnow())
+            db.session.commit()
+            print(f"[API] {'Created' if created else 'Updated'} subject score: "
+                  f"{subject_score.subject_name} - {subject_score.marks}/{subject_score.maxMarks} "
+                  f"({subject_score.percentage}%)")
             
             response_data = subject_score.to_dict()
             print(f"[API] ✓ Subject saved successfully: {response_data}")
@@ -242,6 +227,43 @@ def add_subject_score(student_id):
         return jsonify({'success': False, 'error': f'Server error: {str(e)}'}), 500
 
 
+@bp.route('/bulk', methods=['POST'])
+def bulk_upsert_subject_scores():
+    """Add or update many subject scores in one transaction
+
+    Body: a list of {student_id, subject_name, assignment, test, project,
+    quiz} records (or {"records": [...]}). Valid records are upserted;
+    invalid ones, and those for unknown students, are listed in errors by
+    index without stopping the rest.
+    """
+    try:
+        data = request.get_json(silent=True)
+        records = data.get('records') if isinstance(data, dict) else data
+        if not isinstance(records, list):
+            return jsonify({'success': False, 'error': 'Expected a JSON list of records'}), 400
+        if len(records) > BULK_MAX_RECORDS:
+            return jsonify({'success': False,
+                            'error': f'At most {BULK_MAX_RECORDS} records per request'}), 400
+
+        rows, errors = validate_marks(records)
+        inserted, updated = upsert_marks(db.session, rows, errors)
+        db.session.commit()
+        print(f"[API] ✓ Bulk marks: {inserted} inserted, {updated} updated, {len(errors)} rejected")
+        return jsonify({
+            'success': True,
+            'inserted': inserted,
+            'updated': updated,
+            'failed': len(errors),
+            'errors': error_list(records, errors),
+        }), 200
+    except Exception as e:
+        print(f"[API] ❌ Error in bulk marks upsert: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        db.session.rollback()
+        return jsonify({'success': False, 'error': f'Server error: {str(e)}'}), 500
+
+
 @bp.route('/subject/<int:subject_id>', methods=['PUT'])
 def update_subject_score(subject_id):
     """Update a subject score"""
@@ -271,6 +293,12 @@ def update_subject_score(subject_id):
             'data': subject.to_dict(),
             'message': 'Subject score updated successfully'
         }), 200
+    except IntegrityError:
+        # Renamed onto a subject the student already has a score for
+        # (uq_student_subjects_student_subject)
+        db.session.rollback()
+        return jsonify({'success': False,
+                        'error': f"Student already has a score for subject '{data.get('name')}'"}), 409
     except Exception as e:
         db.session.rollback()
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -362,35 +390,23 @@ def delete_subject_score(subject_id):
 
 
 @bp.route('/students/subjects-stats', methods=['GET'])
+@conditional(table_validator(StudentSubject, Student))
+@cached_response('student_subjects', 'students')
 def get_all_subjects_stats():
-    """Get statistics for all subjects across all students"""
+    """Get statistics for all subjects across all students
+
+    Read from the subject_stats summary table. ?department=
+    (comma-separated) keeps scores of students in those departments and
+    ?from=/?to= (ISO dates) bound the scores' created_at; filtered
+    requests are grouped and averaged in SQL.
+    """
     try:
-        # Get all subject scores grouped by subject name
-        all_subjects = StudentSubject.query.all()
-        
-        # Group by subject name
-        subjects_dict = {}
-        for subject in all_subjects:
-            if subject.subject_name not in subjects_dict:
-                subjects_dict[subject.subject_name] = []
-            subjects_dict[subject.subject_name].append(subject)
-        
-        # Calculate average for each subject
-        result = []
-        colors = ['#3b82f6', '#10b981', '#8b5cf6', '#f59e0b', '#ef4444', '#ec4899', '#06b6d4', '#f97316']
-        
-        for idx, (name, scores) in enumerate(subjects_dict.items()):
-            percentages = [s.percentage for s in scores if s.percentage is not None]
-            avg_percentage = sum(percentages) / len(percentages) if percentages else 0
-            
-            result.append({
-                'name': name,
-                'avgScore': round(avg_percentage, 2),
-                'color': colors[idx % len(colors)],
-                'students': len(scores),
-                'totalMarks': sum(s.marks for s in scores),
-            })
+        try:
+            rows = subject_stats_rows(request.args)
+        except ValueError as ve:
+            return jsonify({'success': False, 'error': str(ve)}), 400
         
+        result = format_subject_stats(rows)
         return jsonify({
             'success': True,
             'data': result,
@@ -400,25 +416,79 @@ def get_all_subjects_stats():
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
+# Columns of the flat CSV export: one row per subject score, student fields repeated
+EXPORT_CSV_FIELDS = [
+    'student_id', 'student_name', 'department', 'gpa', 'attendance', 'activityScore',
+    'subject_id', 'subject', 'marks', 'maxMarks', 'percentage',
+    'assignment', 'test', 'project', 'quiz', 'created_at', 'updated_at',
+]
+
+
+def export_student_batches():
+    """Yield lists of student dicts with their subjects, one keyset batch at a time"""
+    # selectinload: one IN query for the whole batch's scores instead of one per student
+    query = Student.query.options(selectinload(Student.subjects))
+    for students in keyset_batches(query, Student.id):
+        batch = []
+        for student in students:
+            student_dict = student.to_dict()
+            student_dict['subjects'] = [subject.to_dict() for subject in student.subjects]
+            batch.append(student_dict)
+        yield batch
+
+
+def export_csv_rows(batches):
+    """Flatten student batches into CSV rows (students without scores keep one row)"""
+    for students in batches:
+        rows = []
+        for student in students:
+            base = {
+                'student_id': student['id'],
+                'student_name': student['name'],
+                'department': student['department'],
+                'gpa': student['gpa'],
+                'attendance': student['attendance'],
+                'activityScore': student['activityScore'],
+            }
+            for subject in student['subjects'] or [{}]:
+                row = dict(base, subject_id=subject.get('id'), subject=subject.get('name'))
+                for field in ('marks', 'maxMarks', 'percentage', 'assignment', 'test',
+                              'project', 'quiz', 'created_at', 'updated_at'):
+                    row[field] = subject.get(field)
+                rows.append(row)
+        yield rows
+
+
 @bp.route('/students/subjects-export', methods=['GET'])
 def export_all_subject_scores():
-    """Export all subject scores for all students"""
+    """Export all subject scores for all students
+
+    Streams in keyset batches so memory stays flat with the table size.
+    ?format=json (default, same document as before), ndjson (one student
+    per line) or csv (one row per subject score); ?gzip=1 compresses the
+    stream on the fly.
+    """
     try:
-        students_data = []
-        students = Student.query.all()
-        
-        for student in students:
-            student_dict = student.to_dict()
-            student_dict['subjects'] = [
-                subject.to_dict() for subject in StudentSubject.query.filter_by(student_id=student.id).all()
-            ]
-            students_data.append(student_dict)
-        
-        return jsonify({
-            'success': True,
-            'data': students_data,
-            'total': len(students_data)
-        }), 200
+        format_name = request.args.get('format', 'json').lower()
+        if format_name not in EXPORT_FORMATS:
+            return jsonify({
+                'success': False,
+                'error': f"Unknown format '{format_name}', expected one of: {', '.join(EXPORT_FORMATS)}"
+            }), 400
+        compress = request.args.get('gzip', '').lower() in ('1', 'true', 'yes')
+        print(f"[API] Streaming subject export as {format_name}{' (gzip)' if compress else ''}")
+
+        batches = export_student_batches()
+        if format_name == 'csv':
+            chunks = csv_chunks(export_csv_rows(batches), EXPORT_CSV_FIELDS)
+            filename = 'subject_scores.csv'
+        elif format_name == 'ndjson':
+            chunks = ndjson_chunks(batches)
+            filename = 'subject_scores.ndjson'
+        else:
+            chunks = json_chunks(batches, {'success': True})
+            filename = None
+        return stream_response(chunks, format_name, compress=compress, filename=filename)
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -0,0 +1,97 @@
+"""
+Shared fixtures: one app on a throwaway SQLite database and CSV dataset
+
+The environment is set here, before the app modules are imported, because
+utils/dataset.py and utils/cache_backends.py read DATA_DIR and
+CACHE_BACKEND at import time.
+"""
+
+import csv
+import os
+import tempfile
+
+import pytest
+
+DATA_DIR = tempfile.mkdtemp(prefix='dashboard-tests-')
+os.environ['DATA_DIR'] = DATA_DIR
+os.environ['SNAPSHOT_DIR'] = ''
+os.environ['CACHE_BACKEND'] = 'memory'
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(DATA_DIR, 'tests.db')}"
+os.environ.pop('INTERNAL_STATS_TOKEN', None)
+
+STUDENT_COLUMNS = [
+    'Student_ID', 'First_Name', 'Last_Name', 'Email', 'Gender', 'Age', 'Department',
+    'Attendance (%)', 'Midterm_Score', 'Final_Score', 'Assignments_Avg', 'Quizzes_Avg',
+    'Participation_Score', 'Projects_Score', 'Total_Score', 'Grade', 'Study_Hours_per_Week',
+    'Extracurricular_Activities', 'Internet_Access_at_Home', 'Parent_Education_Level',
+    'Family_Income_Level', 'Stress_Level (1-10)', 'Sleep_Hours_per_Night',
+]
+DEPARTMENTS = ['Engineering', 'Business', 'Mathematics', 'CS']
+
+# Database students: ids 1..STUDENT_COUNT, each with a score in every SUBJECTS entry
+STUDENT_COUNT = 30
+SUBJECTS = ['Mathematics', 'Physics', 'Chemistry']
+NAMES = ['Alice Johnson', 'Bob Smith', 'Carol Martinez', 'David Lee', 'Eve Anderson']
+
+
+def write_datasets(directory, rows=40):
+    with open(os.path.join(directory, 'student_data.csv'), 'w', newline='') as handle:
+        writer = csv.writer(handle)
+        writer.writerow(STUDENT_COLUMNS)
+        for i in range(rows):
+            total = 35 + (i * 7) % 65
+            grade = 'A' if total >= 90 else 'B' if total >= 80 else 'C' if total >= 70 else 'D' if total >= 60 else 'F'
+            writer.writerow([
+                f'S{1000 + i}', NAMES[i % 5].split()[0], NAMES[i % 5].split()[1], f's{i}@u.edu',
+                'Female' if i % 2 else 'Male', 18 + i % 6, DEPARTMENTS[i % 4],
+                40 + (i * 3) % 60, 30 + (i * 5) % 70, 30 + (i * 11) % 70, 30 + (i * 13) % 70,
+                30 + (i * 17) % 70, (i * 19) % 100, 30 + (i * 23) % 70, total, grade,
+                5 + i % 25, 'Yes' if i % 3 else 'No', 'Yes' if i % 4 else 'No', 'Bachelor',
+                'Low' if i % 2 else 'High', 1 + i % 10, 4 + i % 5,
+            ])
+    with open(os.path.join(directory, 'department_data.csv'), 'w', newline='') as handle:
+        writer = csv.writer(handle)
+        writer.writerow(['student_id', 'exam_marks', 'attendance_pct'])
+        for i in range(rows):
+            writer.writerow([i, 30 + (i * 7) % 70, 40 + (i * 3) % 60])
+
+
+def seed(db, models):
+    Student, Subject, StudentSubject = models
+    db.session.add_all(Subject(name=name) for name in SUBJECTS)
+    db.session.add_all(
+        Student(id=i, name=f'{NAMES[i % 5]} {i}', department=DEPARTMENTS[i % 4],
+                gpa=2.0 + (i % 20) / 10, attendance=60 + i, activityScore=i % 10)
+        for i in range(1, STUDENT_COUNT + 1))
+    db.session.add_all(
+        StudentSubject(student_id=i, subject_name=name, marks=40 + (i + j) % 60, maxMarks=100,
+                       percentage=40 + (i + j) % 60)
+        for i in range(1, STUDENT_COUNT + 1) for j, name in enumerate(SUBJECTS))
+    db.session.commit()
+
+
+@pytest.fixture(scope='session')
+def app():
+    write_datasets(DATA_DIR)
+
+    from app import create_app
+    from database import db, migrate_database
+    from models.database_models import Student, Subject, StudentSubject
+
+    migrate_database()
+    app = create_app('testing')
+    with app.app_context():
+        seed(db, (Student, Subject, StudentSubject))
+    return app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def db_session(app):
+    from database import db
+    with app.app_context():
+        yield db.session
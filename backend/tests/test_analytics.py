@@ -0,0 +1,29 @@
+"""CSV-backed analytics endpoints"""
+
+import pytest
+
+
+@pytest.mark.parametrize('url', [
+    '/api/performance/performance-metrics',
+    '/api/distribution/risk-students',
+])
+@pytest.mark.parametrize('window', ['?department=Nope', '?offset=100000'])
+def test_empty_window_is_not_an_error(client, url, window):
+    response = client.get(url + window)
+    assert response.status_code == 200
+
+
+def test_empty_window_percentages_are_zero(client):
+    metrics = client.get('/api/performance/performance-metrics?department=Nope').get_json()['data']
+    risk = client.get('/api/distribution/risk-students?department=Nope').get_json()
+    assert metrics['extracurricular'] == {'participatingStudents': 0, 'percentage': 0}
+    assert metrics['internetAccess'] == {'withAccess': 0, 'percentage': 0}
+    assert risk['data'] == []
+    assert risk['statistics']['riskPercentage'] == 0
+
+
+def test_full_window_percentages(client):
+    metrics = client.get('/api/performance/performance-metrics').get_json()['data']
+    risk = client.get('/api/distribution/risk-students').get_json()
+    assert 0 < metrics['extracurricular']['percentage'] < 100
+    assert 0 < risk['statistics']['riskPercentage'] <= 100
@@ -0,0 +1,36 @@
+"""App-level behaviour: internal diagnostics and error responses"""
+
+import pytest
+
+REMOTE = {'REMOTE_ADDR': '203.0.113.9'}
+
+
+@pytest.mark.parametrize('url', ['/api/internal/cache-stats', '/api/internal/pool-stats'])
+def test_internal_endpoints_answer_localhost(client, url):
+    response = client.get(url)
+    assert response.status_code == 200
+    assert 'Access-Control-Allow-Origin' not in response.headers
+
+
+@pytest.mark.parametrize('url', ['/api/internal/cache-stats', '/api/internal/pool-stats'])
+def test_internal_endpoints_are_hidden_from_remote_and_forwarded_requests(client, url):
+    assert client.get(url, environ_base=REMOTE).status_code == 404
+    forwarded = client.get(url, headers={'X-Forwarded-For': '203.0.113.9'})
+    assert forwarded.status_code == 404
+    assert forwarded.get_json() == {'error': 'Not found'}
+
+
+def test_internal_token_is_required_when_configured(app, client):
+    app.config['INTERNAL_STATS_TOKEN'] = 'secret'
+    try:
+        assert client.get('/api/internal/pool-stats').status_code == 404
+        response = client.get('/api/internal/pool-stats', environ_base=REMOTE,
+                              headers={'X-Internal-Token': 'secret'})
+        assert response.status_code == 200
+    finally:
+        app.config['INTERNAL_STATS_TOKEN'] = ''
+
+
+def test_api_allows_any_origin_by_default(client):
+    response = client.get('/api/health', headers={'Origin': 'http://example.com'})
+    assert response.headers['Access-Control-Allow-Origin'] in ('*', 'http://example.com')
@@ -0,0 +1,119 @@
+"""/api/students: keyset pages, bulk PATCH, search and conditional GET"""
+
+from conftest import STUDENT_COUNT
+
+
+def get_pages(client, query):
+    pages, url = [], f'/api/students?{query}'
+    while url:
+        body = client.get(url).get_json()
+        pages.append(body)
+        # The cursor carries sort, order and department; the page size is passed again
+        url = f"/api/students?{query}&cursor={body['nextCursor']}" if body['hasMore'] else None
+    return pages
+
+
+def test_keyset_pages_cover_every_student_once(client):
+    pages = get_pages(client, 'limit=7')
+    ids = [student['id'] for page in pages for student in page['data']]
+    assert ids == sorted(ids)
+    assert len(ids) == len(set(ids)) == STUDENT_COUNT
+    assert [page['count'] for page in pages] == [7, 7, 7, 7, 2]
+    assert all(page['total'] == STUDENT_COUNT for page in pages)
+    assert pages[-1]['nextCursor'] is None
+
+
+def test_keyset_pages_follow_sort_and_department(client):
+    pages = get_pages(client, 'limit=3&sort=gpa&order=desc&department=CS,Business')
+    rows = [student for page in pages for student in page['data']]
+    assert {student['department'] for student in rows} == {'CS', 'Business'}
+    keys = [(student['gpa'], student['id']) for student in rows]
+    assert [gpa for gpa, _ in keys] == sorted((gpa for gpa, _ in keys), reverse=True)
+    assert len(rows) == len({student_id for _, student_id in keys}) == pages[0]['total']
+
+
+def test_invalid_cursor_is_a_400(client):
+    response = client.get('/api/students?cursor=not-a-cursor')
+    assert response.status_code == 400
+    assert response.get_json() == {'success': False, 'error': 'Invalid cursor'}
+
+
+def test_cursor_for_another_sort_is_a_400(client):
+    cursor = client.get('/api/students?limit=2&sort=name').get_json()['nextCursor']
+    response = client.get(f'/api/students?cursor={cursor}&sort=gpa')
+    assert response.status_code == 400
+    assert response.get_json()['success'] is False
+
+
+def test_unknown_sort_is_a_400(client):
+    response = client.get('/api/students?sort=password')
+    assert response.status_code == 400
+
+
+def test_patch_reports_errors_per_update(client):
+    response = client.patch('/api/students', json=[
+        {'id': 2, 'gpa': 3.5},
+        {'id': 999999, 'gpa': 3.0},
+        {'id': 3, 'gpa': 'high'},
+        {'gpa': 2.0},
+    ])
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['success'] is True
+    assert body['updated'] == 1
+    assert body['failed'] == 3
+    assert sorted(error['index'] for error in body['errors']) == [1, 2, 3]
+    for error in body['errors']:
+        assert set(error) == {'id', 'index', 'error'}
+        assert error['error']
+    assert client.get('/api/students/2').get_json()['data']['gpa'] == 3.5
+
+
+def test_patch_rejects_a_non_list_body(client):
+    response = client.patch('/api/students', json={'id': 2})
+    assert response.status_code == 400
+    assert response.get_json() == {'success': False, 'error': 'Expected a JSON list of updates'}
+
+
+def test_search_ranks_prefix_before_substring(client):
+    body = client.get('/api/students/search?q=carol').get_json()
+    assert body['success'] is True
+    assert body['count'] == body['total'] == 6
+    assert all(student['name'].startswith('Carol Martinez') for student in body['data'])
+    assert {student['match'] for student in body['data']} == {'prefix'}
+
+    body = client.get('/api/students/search?q=arti').get_json()
+    assert body['total'] == 6
+    assert {student['match'] for student in body['data']} == {'substring'}
+
+
+def test_search_by_roll_number_and_department(client):
+    body = client.get('/api/students/search?q=12').get_json()
+    assert body['data'][0]['id'] == 12
+    assert body['data'][0]['match'] == 'roll_number'
+
+    body = client.get('/api/students/search?q=johnson&department=Business').get_json()
+    assert body['data']
+    assert {student['department'] for student in body['data']} == {'Business'}
+    assert body['facets']['Business'] == body['total']
+
+
+def test_search_requires_a_query(client):
+    response = client.get('/api/students/search?q=')
+    assert response.status_code == 400
+
+
+def test_conditional_get_and_invalidation(client):
+    first = client.get('/api/students/5')
+    etag = first.headers['ETag']
+    assert first.status_code == 200
+
+    cached = client.get('/api/students/5', headers={'If-None-Match': etag})
+    assert cached.status_code == 304
+    assert cached.data == b''
+
+    assert client.patch('/api/students', json=[{'id': 5, 'attendance': 99}]).get_json()['updated'] == 1
+    changed = client.get('/api/students/5', headers={'If-None-Match': etag})
+    assert changed.status_code == 200
+    assert changed.headers['ETag'] != etag
+    assert changed.get_json()['data']['attendance'] == 99
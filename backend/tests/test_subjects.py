@@ -0,0 +1,134 @@
+"""/api/subjects: bulk marks, score updates, streaming export and subject_stats"""
+
+import csv
+import gzip
+import io
+import json
+
+import pytest
+
+from conftest import STUDENT_COUNT, SUBJECTS
+
+
+def scores_of(client, student_id):
+    return {score['name']: score for score in
+            client.get(f'/api/subjects/student/{student_id}/subjects').get_json()['data']}
+
+
+def test_bulk_upserts_valid_records_and_lists_errors(client):
+    before = scores_of(client, 7)
+    response = client.post('/api/subjects/bulk', json=[
+        {'student_id': 7, 'subject_name': 'Mathematics', 'assignment': 20, 'test': 25, 'project': 25, 'quiz': 15},
+        {'student_id': 7, 'subject_name': 'Biology', 'assignment': 10, 'test': 10, 'project': 10, 'quiz': 10},
+        {'student_id': 7, 'subject_name': 'Chemistry', 'assignment': 21},
+        {'student_id': 999999, 'subject_name': 'Mathematics', 'quiz': 5},
+        {'student_id': 7, 'subject_name': ''},
+        'not a record',
+    ])
+    assert response.status_code == 200
+    body = response.get_json()
+    assert (body['inserted'], body['updated'], body['failed']) == (1, 1, 4)
+    assert [error['index'] for error in body['errors']] == [2, 3, 4, 5]
+    assert 'Assignment must be between 0-20' in body['errors'][0]['error']
+
+    after = scores_of(client, 7)
+    assert after['Mathematics']['marks'] == 85
+    assert after['Mathematics']['id'] == before['Mathematics']['id']
+    assert after['Biology']['marks'] == 40
+    assert after['Chemistry'] == before['Chemistry']
+
+
+def test_bulk_rejects_a_non_list_body(client):
+    response = client.post('/api/subjects/bulk', json={'student_id': 7})
+    assert response.status_code == 400
+    assert response.get_json()['success'] is False
+
+
+def test_rename_onto_an_existing_subject_is_a_409(client):
+    scores = scores_of(client, 8)
+    response = client.put(f"/api/subjects/subject/{scores['Physics']['id']}", json={'name': 'Mathematics'})
+    assert response.status_code == 409
+    assert response.get_json() == {'success': False,
+                                   'error': "Student already has a score for subject 'Mathematics'"}
+    assert scores_of(client, 8) == scores
+
+
+def test_score_update_recomputes_percentage(client):
+    score = scores_of(client, 9)['Chemistry']
+    response = client.put(f"/api/subjects/subject/{score['id']}", json={'marks': 30, 'maxMarks': 60})
+    assert response.status_code == 200
+    assert response.get_json()['data']['percentage'] == 50
+
+
+def read_export(client, query=''):
+    response = client.get(f'/api/subjects/students/subjects-export{query}')
+    try:
+        return response, response.get_data()
+    finally:
+        response.close()
+
+
+def test_export_json_lists_every_student(client):
+    response, data = read_export(client)
+    assert response.status_code == 200
+    body = json.loads(data)
+    assert body['success'] is True
+    assert [student['id'] for student in body['data']] == list(range(1, STUDENT_COUNT + 1))
+    assert {subject['name'] for subject in body['data'][0]['subjects']} >= set(SUBJECTS)
+
+
+def test_export_ndjson_and_gzip(client):
+    response, data = read_export(client, '?format=ndjson&gzip=1')
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert response.headers['Content-Disposition'] == 'attachment; filename=subject_scores.ndjson'
+    lines = gzip.decompress(data).decode('utf-8').splitlines()
+    assert [json.loads(line)['id'] for line in lines] == list(range(1, STUDENT_COUNT + 1))
+
+
+def test_export_csv_has_one_row_per_score(client):
+    response, data = read_export(client, '?format=csv')
+    assert response.mimetype == 'text/csv'
+    rows = list(csv.DictReader(io.StringIO(data.decode('utf-8'))))
+    scores = sum(len(scores_of(client, i)) for i in range(1, STUDENT_COUNT + 1))
+    assert len(rows) == scores
+    assert {row['subject'] for row in rows} >= set(SUBJECTS)
+
+
+def test_export_unknown_format_is_a_400(client):
+    response, _ = read_export(client, '?format=xml')
+    assert response.status_code == 400
+
+
+@pytest.fixture
+def drift(db_session):
+    from utils.subject_stats import subject_stats_drift
+    return lambda: subject_stats_drift(db_session.connection())
+
+
+def test_subject_stats_follow_every_kind_of_write(client, drift):
+    client.post('/api/subjects/student/10/subjects',
+                json={'name': 'Geography', 'marks': 20, 'assignment': 5, 'test': 5, 'project': 5, 'quiz': 5})
+    client.post('/api/subjects/bulk', json=[
+        {'student_id': 11, 'subject_name': 'Geography', 'quiz': 12},
+        {'student_id': 10, 'subject_name': 'Physics', 'test': 3},
+    ])
+    score = scores_of(client, 12)['Chemistry']
+    client.put(f"/api/subjects/subject/{score['id']}", json={'name': 'Geography', 'marks': 70})
+    client.delete(f"/api/subjects/subject/{scores_of(client, 13)['Physics']['id']}")
+    assert drift() == []
+
+    stats = {row['name']: row for row in client.get('/api/subjects/students/subjects-stats').get_json()['data']}
+    assert stats['Geography']['students'] == 3
+    assert stats['Geography']['totalMarks'] == 20 + 12 + 70
+
+
+def test_subject_stats_drift_reports_a_stale_row(db_session, drift):
+    from sqlalchemy import text
+    assert drift() == []
+    db_session.connection().execute(text(
+        "UPDATE subject_stats SET score_count = score_count + 1 WHERE subject_name = 'Mathematics'"))
+    try:
+        assert [(row['subject'], row['field']) for row in drift()] == [('Mathematics', 'score_count')]
+    finally:
+        db_session.rollback()
+    assert drift() == []
@@ -0,0 +1,58 @@
+"""
+Single-pass department aggregates shared by department-analysis and
+department-comparison
+One groupby(...).agg(...) computes every per-department metric and one
+crosstab computes the grade distribution; the result is memoized per dataset
+version so the cost no longer grows with departments x rows.
+"""
+
+import pandas as pd
+
+from utils.dataset import apply_window, has_window
+
+# Output name -> source column for every per-department mean
+DEPARTMENT_MEANS = {
+    'averageScore': 'Total_Score',
+    'averageAttendance': 'Attendance (%)',
+    'averageMidterm': 'Midterm_Score',
+    'averageFinal': 'Final_Score',
+    'averageAssignment': 'Assignments_Avg',
+    'averageQuiz': 'Quizzes_Avg',
+    'averageParticipation': 'Participation_Score',
+    'averageProject': 'Projects_Score',
+}
+
+INVALID_DEPARTMENTS = ('-', '')
+
+
+def department_aggregates(df):
+    """Return (stats, grades) frames indexed by department, in first-seen order
+
+    stats holds studentCount, every DEPARTMENT_MEANS metric, topScore and
+    bottomScore; grades holds per-grade counts with columns sorted by grade.
+    """
+    departments = df['Department'].astype(object)
+    grouped = df.groupby(departments, sort=False)
+
+    aggregations = {'studentCount': ('Total_Score', 'size')}
+    for name, column in DEPARTMENT_MEANS.items():
+        aggregations[name] = (column, 'mean')
+    aggregations['topScore'] = ('Total_Score', 'max')
+    aggregations['bottomScore'] = ('Total_Score', 'min')
+    stats = grouped.agg(**aggregations)
+
+    grades = pd.crosstab(departments, df['Grade'].astype(object))
+    grades = grades.reindex(index=stats.index, columns=sorted(grades.columns), fill_value=0)
+    return stats, grades
+
+
+def get_department_aggregates(snap, window=None):
+    """Department aggregates for a snapshot, memoized per version unless windowed"""
+    if has_window(window):
+        return department_aggregates(apply_window(snap.frame, window))
+    return snap.derive('department_aggregates', lambda s: department_aggregates(s.frame))
+
+
+def valid_departments(stats):
+    """Index mask of departments that are real (not '-' or empty)"""
+    return ~stats.index.isin(INVALID_DEPARTMENTS)
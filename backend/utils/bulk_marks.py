@@ -0,0 +1,152 @@
+"""
+Bulk marks upsert behind POST /api/subjects/bulk
+A request's records are validated in one vectorized pass (component ranges,
+subject names, duplicates), then written in batches inside one transaction:
+per batch one query finds the students, one locks and reads the scores about
+to be replaced (for the counts and the subject_stats summary) and a single
+multi-row INSERT ... ON CONFLICT DO UPDATE writes them all. Invalid records
+are reported by index and skipped; they never abort the batch.
+"""
+
+import os
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import select
+
+from models.database_models import Student, StudentSubject
+from utils.score_upsert import lock_scores, score_upsert
+from utils.subject_stats import apply_score_changes, refresh_subject_stats
+
+# Same ranges as the single-record POST /student/<id>/subjects
+COMPONENT_LIMITS = {'assignment': 20, 'test': 25, 'project': 25, 'quiz': 15}
+MAX_MARKS = 100.0
+
+BULK_BATCH_SIZE = int(os.getenv('BULK_BATCH_SIZE', '2000'))
+BULK_MAX_RECORDS = int(os.getenv('BULK_MAX_RECORDS', '50000'))
+
+scores_table = StudentSubject.__table__
+
+# Column limits: a value past them fails the whole multi-row statement on PostgreSQL
+MAX_STUDENT_ID = 2 ** 31 - 1  # INTEGER
+SUBJECT_NAME_LENGTH = scores_table.c.subject_name.type.length
+
+
+def validate_marks(records):
+    """Split bulk records into (valid rows DataFrame, {index: [error, ...]})
+
+    Missing components count as 0, like the single-record endpoint; the
+    subject may be given as subject_name or name. The rows frame keeps the
+    record index in an 'index' column.
+    """
+    errors = {}
+
+    def flag(mask, message):
+        for index in np.flatnonzero(mask):
+            errors.setdefault(int(index), []).append(message)
+
+    columns = ['student_id', 'subject_name', 'name', *COMPONENT_LIMITS]
+    df = pd.DataFrame([record if isinstance(record, dict) else {} for record in records],
+                      columns=columns, index=pd.RangeIndex(len(records)), dtype=object)
+
+    student_ids = pd.to_numeric(df['student_id'], errors='coerce')
+    flag((student_ids.isna() | (student_ids != student_ids.round()) | (student_ids < 1)).to_numpy(),
+         'student_id must be a positive integer')
+    flag((student_ids > MAX_STUDENT_ID).to_numpy(), f'student_id must be at most {MAX_STUDENT_ID}')
+
+    names = df['subject_name'].where(df['subject_name'].notna(), df['name'])
+    names = names.fillna('').astype(str).str.strip()
+    flag((names == '').to_numpy(), 'Subject name cannot be empty')
+    flag((names.str.len() > SUBJECT_NAME_LENGTH).to_numpy(),
+         f'Subject name must be at most {SUBJECT_NAME_LENGTH} characters')
+
+    rows = pd.DataFrame({'index': df.index, 'student_id': student_ids, 'subject_name': names})
+    marks = np.zeros(len(df))
+    for field, upper in COMPONENT_LIMITS.items():
+        values = pd.to_numeric(df[field], errors='coerce')
+        flag((values.isna() & df[field].notna()).to_numpy(), f'{field.capitalize()} must be a number')
+        values = values.fillna(0.0).astype(float)
+        flag(((values < 0) | (values > upper)).to_numpy(), f'{field.capitalize()} must be between 0-{upper}')
+        rows[field] = values
+        marks += values.to_numpy()
+    rows['marks'] = marks
+    rows['percentage'] = marks / MAX_MARKS * 100
+
+    valid = ~rows['index'].isin(list(errors))
+    duplicate = valid & rows[valid].duplicated(['student_id', 'subject_name']).reindex(rows.index, fill_value=False)
+    flag(duplicate.to_numpy(), 'Duplicate student_id and subject_name in this request')
+
+    for index, record in enumerate(records):
+        if not isinstance(record, dict):
+            errors[index] = ['Record must be an object']
+
+    rows = rows[~rows['index'].isin(list(errors))].copy()
+    rows['student_id'] = rows['student_id'].astype(int)
+    return rows, errors
+
+
+def _write_batch(session, batch, now, errors):
+    """Upsert one batch of valid rows; returns (inserted, updated)"""
+    connection = session.connection()
+    student_ids = sorted(set(batch['student_id'].tolist()))
+    known = set(session.execute(select(Student.id).where(Student.id.in_(student_ids))).scalars())
+    missing = ~batch['student_id'].isin(known)
+    for index, student_id in zip(batch.loc[missing, 'index'].tolist(), batch.loc[missing, 'student_id'].tolist()):
+        errors.setdefault(index, []).append(f'Student {student_id} not found')
+    batch = batch[~missing]
+    if batch.empty:
+        return 0, 0
+
+    existing = lock_scores(session, list(zip(batch['student_id'].tolist(), batch['subject_name'].tolist())), now)
+
+    # Plain Python values: DB drivers do not all accept numpy scalars
+    fields = ['student_id', 'subject_name', 'marks', 'percentage', *COMPONENT_LIMITS]
+    values = [dict(zip(fields, row), maxMarks=MAX_MARKS, created_at=now, updated_at=now)
+              for row in zip(*(batch[field].tolist() for field in fields))]
+    statement = score_upsert(session, scores_table).returning(
+        scores_table.c.id, scores_table.c.created_at, sort_by_parameter_order=True)
+    written = session.execute(statement, values).all()
+
+    # An update keeps the row's created_at; where that disagrees with the read
+    # above a concurrent insert slipped in, and those subjects are recomputed
+    raced = {row['subject_name'] for row, (_, created_at) in zip(values, written)
+             if (created_at == now) == ((row['student_id'], row['subject_name']) in existing)}
+    removed = [(score_id, subject_name, marks, percentage)
+               for (_, subject_name), (score_id, marks, percentage) in existing.items()
+               if subject_name not in raced]
+    added = [(score_id, row['subject_name'], row['marks'], row['percentage'])
+             for row, (score_id, _) in zip(values, written) if row['subject_name'] not in raced]
+    apply_score_changes(connection, removed, added)
+    refresh_subject_stats(connection, raced)
+    inserted = sum(created_at == now for _, created_at in written)
+    return inserted, len(written) - inserted
+
+
+def upsert_marks(session, rows, errors, batch_size=BULK_BATCH_SIZE):
+    """Write validated rows batch by batch in the session's transaction
+
+    Unknown students are added to errors. Returns (inserted, updated); the
+    caller commits.
+    """
+    now = datetime.utcnow()
+    inserted = updated = 0
+    for start in range(0, len(rows), batch_size):
+        batch_inserted, batch_updated = _write_batch(session, rows.iloc[start:start + batch_size], now, errors)
+        inserted += batch_inserted
+        updated += batch_updated
+    return inserted, updated
+
+
+def error_list(records, errors):
+    """Per-record errors for the response, in record order"""
+    result = []
+    for index in sorted(errors):
+        record = records[index] if isinstance(records[index], dict) else {}
+        result.append({
+            'index': index,
+            'student_id': record.get('student_id'),
+            'subject_name': record.get('subject_name', record.get('name')),
+            'error': '; '.join(errors[index]),
+        })
+    return result
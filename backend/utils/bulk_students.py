@@ -0,0 +1,132 @@
+"""
+Bulk student updates behind PATCH /api/students
+A request carries many partial updates ({id, and any of name, department,
+gpa, attendance, activityScore}). They are validated up front, then applied
+in batches, each its own transaction: one query finds which ids exist and
+one executemany UPDATE per distinct set of fields writes them. Bad updates
+and unknown ids are reported as {id, index, error}, index being the
+update's position in the request; a batch that fails to commit is reported
+without undoing the batches before it.
+"""
+
+import math
+import os
+from datetime import datetime
+
+from sqlalchemy import bindparam, select, update
+
+from models.database_models import Student
+from utils.student_search import reindex_students, search_state
+
+UPDATABLE_FIELDS = {
+    'name': str,
+    'department': str,
+    'gpa': float,
+    'attendance': float,
+    'activityScore': float,
+}
+
+STUDENT_BATCH_SIZE = int(os.getenv('STUDENT_BATCH_SIZE', '1000'))
+STUDENT_MAX_UPDATES = int(os.getenv('STUDENT_MAX_UPDATES', '100000'))
+
+students_table = Student.__table__
+
+
+def _check_value(field, value):
+    """Return the stored value for one field, or raise ValueError"""
+    if UPDATABLE_FIELDS[field] is str:
+        if not isinstance(value, str) or not value.strip():
+            raise ValueError(f'{field} must be a non-empty string')
+        # Past the column length one value would fail its whole batch on PostgreSQL
+        length = students_table.c[field].type.length
+        if len(value.strip()) > length:
+            raise ValueError(f'{field} must be at most {length} characters')
+        return value.strip()
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+        raise ValueError(f'{field} must be a number')
+    return float(value)
+
+
+def validate_updates(updates):
+    """Split updates into ([(index, id, {field: value})], [{'id', 'index', 'error'}])"""
+    valid, errors, seen = [], [], set()
+
+    def reject(student_id, position, message):
+        errors.append({'id': student_id, 'index': position, 'error': message})
+
+    for position, item in enumerate(updates):
+        if not isinstance(item, dict):
+            reject(None, position, 'Update must be an object')
+            continue
+        student_id = item.get('id')
+        if isinstance(student_id, bool) or not isinstance(student_id, int):
+            reject(student_id, position, 'id must be an integer')
+            continue
+        if student_id in seen:
+            reject(student_id, position, 'Duplicate id in this request')
+            continue
+        seen.add(student_id)
+        unknown = sorted(set(item) - set(UPDATABLE_FIELDS) - {'id'})
+        if unknown:
+            reject(student_id, position, f"Unknown fields: {', '.join(unknown)}")
+            continue
+        try:
+            values = {field: _check_value(field, item[field]) for field in UPDATABLE_FIELDS if field in item}
+        except ValueError as ve:
+            reject(student_id, position, str(ve))
+            continue
+        if not values:
+            reject(student_id, position, 'Nothing to update')
+            continue
+        valid.append((position, student_id, values))
+    return valid, errors
+
+
+def _apply_batch(session, batch, now):
+    """Write one batch; returns the (index, id) of the updates whose student was not found"""
+    ids = [student_id for _, student_id, _ in batch]
+    known = set(session.execute(select(Student.id).where(Student.id.in_(ids))).scalars())
+
+    # executemany needs one statement shape, so updates are grouped by their fields
+    groups = {}
+    for _, student_id, values in batch:
+        if student_id in known:
+            groups.setdefault(tuple(sorted(values)), []).append(
+                {'student_id': student_id, 'now': now, **{f'new_{field}': value for field, value in values.items()}})
+    for fields, params in groups.items():
+        statement = (update(students_table)
+                     .where(students_table.c.id == bindparam('student_id'))
+                     .values({**{field: bindparam(f'new_{field}') for field in fields},
+                              'updated_at': bindparam('now')}))
+        session.execute(statement, params)
+
+    # Core UPDATEs skip the flush events that keep the search trigrams in step
+    renamed = [(student_id, values['name']) for _, student_id, values in batch
+               if student_id in known and 'name' in values]
+    if renamed and search_state['installed']:
+        reindex_students(session.connection(), renamed)
+    return [(position, student_id) for position, student_id, _ in batch if student_id not in known]
+
+
+def apply_updates(session, updates, batch_size=STUDENT_BATCH_SIZE):
+    """Apply validated updates batch by batch, committing each batch
+
+    Returns (updated count, [{'id', 'index', 'error'}] for unknown ids and failed batches).
+    """
+    now = datetime.utcnow()
+    updated, errors = 0, []
+    for start in range(0, len(updates), batch_size):
+        batch = updates[start:start + batch_size]
+        try:
+            missing = _apply_batch(session, batch, now)
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            print(f"[API] ❌ Student update batch {start // batch_size + 1} failed: {str(e)}")
+            errors.extend({'id': student_id, 'index': position, 'error': 'Batch failed; nothing in it was updated'}
+                          for position, student_id, _ in batch)
+            continue
+        errors.extend({'id': student_id, 'index': position, 'error': 'Student not found'}
+                      for position, student_id in missing)
+        updated += len(batch) - len(missing)
+    return updated, errors
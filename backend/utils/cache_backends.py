@@ -0,0 +1,459 @@
+"""
+Pluggable cache backends for computed analytics and serialized responses
+Values are stored as compact binary blobs (JSON, zlib-compressed when
+large) together with a version string; a lookup only hits when the stored
+version matches the caller's current data version, so stale entries are
+never served and simply age out. JSON rather than pickle: whoever can write
+to a shared cache must not be able to run code in the workers reading it.
+
+Backends (CACHE_BACKEND):
+    memory  per-process LRU dict (default)
+    sqlite  a local SQLite file shared by every worker on the host and
+            kept across restarts (CACHE_URL is the file path)
+    redis   any Redis-protocol server for multi-node setups
+            (CACHE_URL=redis://[:password@]host:port/db)
+"""
+
+import json
+import os
+import socket
+import sqlite3
+import struct
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from urllib.parse import urlparse
+
+from utils.dataset import DATA_DIR
+from utils.serialization import json_bytes, orjson
+
+CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'memory')
+CACHE_URL = os.getenv('CACHE_URL', '')
+CACHE_MAX_ENTRIES = int(os.getenv('CACHE_MAX_ENTRIES', '1024'))
+CACHE_TTL = float(os.getenv('CACHE_TTL', '3600'))
+CACHE_PREFIX = os.getenv('CACHE_PREFIX', 'spd:')
+CACHE_SOCKET_TIMEOUT = float(os.getenv('CACHE_SOCKET_TIMEOUT', '0.5'))
+# Seconds a remote backend is skipped after a connection failure
+CACHE_RETRY_SECONDS = float(os.getenv('CACHE_RETRY_SECONDS', '5'))
+
+DEFAULT_SQLITE_PATH = os.path.join(DATA_DIR, '.cache.sqlite3')
+
+# Blobs at least this large are zlib-compressed
+COMPRESS_MIN_BYTES = 1024
+# Format bytes; the pickle-era \x00/\x01 blobs read as corrupt (a miss)
+_RAW, _ZLIB = b'\x02', b'\x03'
+
+
+class CacheUnavailable(ConnectionError):
+    """A remote backend is skipped until its retry time"""
+
+
+def _split_bytes(value):
+    """(JSON part, [(key, bytes)]) of a value
+
+    Raw bytes stay out of the JSON: a bytes value itself (key None) or the
+    bytes values of a dict, such as a cached response body.
+    """
+    if isinstance(value, (bytes, bytearray)):
+        return None, [(None, bytes(value))]
+    if isinstance(value, dict) and any(isinstance(item, (bytes, bytearray)) for item in value.values()):
+        raw = [(key, bytes(item)) for key, item in value.items() if isinstance(item, (bytes, bytearray))]
+        return {key: item for key, item in value.items() if not isinstance(item, (bytes, bytearray))}, raw
+    return value, []
+
+
+def encode(value):
+    """Serialize a value to a compact binary blob
+
+    Layout: 4-byte header length, the JSON header {"value", "raw": [[key,
+    length], ...]}, then the raw byte strings back to back.
+    """
+    value, raw = _split_bytes(value)
+    header = json_bytes({'value': value, 'raw': [[key, len(data)] for key, data in raw]})
+    payload = struct.pack('>I', len(header)) + header + b''.join(data for _, data in raw)
+    if len(payload) >= COMPRESS_MIN_BYTES:
+        return _ZLIB + zlib.compress(payload, 1)
+    return _RAW + payload
+
+
+def decode(blob):
+    """Inverse of encode(); raises ValueError on a blob it did not write"""
+    blob = bytes(blob)
+    if blob[:1] not in (_RAW, _ZLIB):
+        raise ValueError(f'unknown cache blob format {blob[:1]!r}')
+    payload = zlib.decompress(blob[1:]) if blob[:1] == _ZLIB else blob[1:]
+    (length,) = struct.unpack('>I', payload[:4])
+    header = orjson.loads(payload[4:4 + length]) if orjson is not None else json.loads(payload[4:4 + length])
+    value, offset = header['value'], 4 + length
+    for key, size in header['raw']:
+        data = payload[offset:offset + size]
+        offset += size
+        if key is None:
+            return data
+        value[key] = data
+    return value
+
+
+class CacheBackend:
+    """Versioned key/value cache; subclasses store (version, blob) pairs"""
+
+    name = 'base'
+    shared = False  # True if other processes see the same entries
+
+    def __init__(self, ttl=CACHE_TTL):
+        self.ttl = ttl
+        self._stats_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.sets = 0
+        self.errors = 0
+
+    def _count(self, counter):
+        with self._stats_lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def get(self, key, version):
+        """Cached value for key if it was stored for this version, else None"""
+        try:
+            record = self._get(key)
+            if record is None:
+                self._count('misses')
+                return None
+            stored_version, blob = record
+            if stored_version != str(version):
+                self._count('stale')
+                return None
+            value = decode(blob)
+        except Exception as e:
+            # Unreachable backend or a corrupt entry: either way a miss
+            self._fail('get', e)
+            return None
+        self._count('hits')
+        return value
+
+    def set(self, key, version, value, ttl=None):
+        """Store value for key at version; failures are logged, never raised"""
+        try:
+            self._set(key, str(version), encode(value), self.ttl if ttl is None else ttl)
+            self._count('sets')
+        except Exception as e:
+            self._fail('set', e)
+
+    def delete(self, key):
+        try:
+            self._delete(key)
+        except Exception as e:
+            self._fail('delete', e)
+
+    def _fail(self, operation, error):
+        self._count('errors')
+        if not isinstance(error, CacheUnavailable):  # logged once, when the backend went down
+            print(f"[CACHE] {self.name} {operation} failed: {error}")
+
+    def clear(self):
+        self._clear()
+
+    def stats(self):
+        """Counters for diagnostics"""
+        lookups = self.hits + self.misses + self.stale
+        return {
+            'backend': self.name,
+            'shared': self.shared,
+            'hits': self.hits,
+            'misses': self.misses,
+            'stale': self.stale,
+            'hitRatio': round(self.hits / lookups, 4) if lookups else 0.0,
+            'sets': self.sets,
+            'errors': self.errors,
+            **self._describe(),
+        }
+
+    def _get(self, key):
+        raise NotImplementedError
+
+    def _set(self, key, version, blob, ttl):
+        raise NotImplementedError
+
+    def _delete(self, key):
+        raise NotImplementedError
+
+    def _clear(self):
+        raise NotImplementedError
+
+    def _describe(self):
+        return {}
+
+
+class MemoryBackend(CacheBackend):
+    """Per-process LRU dict"""
+
+    name = 'memory'
+
+    def __init__(self, max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL):
+        super().__init__(ttl)
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+
+    def _get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            version, blob, expires = entry
+            if expires <= time.monotonic():
+                self._pop(key)
+                return None
+            self._entries.move_to_end(key)
+            return version, blob
+
+    def _pop(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.bytes -= len(entry[1])
+
+    def _set(self, key, version, blob, ttl):
+        with self._lock:
+            self._pop(key)
+            self._entries[key] = (version, blob, time.monotonic() + ttl)
+            self.bytes += len(blob)
+            while len(self._entries) > self.max_entries:
+                self._pop(next(iter(self._entries)))
+
+    def _delete(self, key):
+        with self._lock:
+            self._pop(key)
+
+    def _clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def _describe(self):
+        return {'entries': len(self._entries), 'maxEntries': self.max_entries, 'bytes': self.bytes}
+
+
+class SQLiteBackend(CacheBackend):
+    """Cache table in a local SQLite file, shared by all workers on a host"""
+
+    name = 'sqlite'
+    shared = True
+
+    # Expired and overflow rows are pruned every this many writes
+    PRUNE_EVERY = 64
+
+    def __init__(self, path=DEFAULT_SQLITE_PATH, max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL):
+        super().__init__(ttl)
+        self.path = path
+        self.max_entries = max_entries
+        self._local = threading.local()
+        self._writes = 0
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS cache_entries ('
+                ' key TEXT PRIMARY KEY, version TEXT NOT NULL, value BLOB NOT NULL,'
+                ' stored_at REAL NOT NULL, expires_at REAL NOT NULL)'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS ix_cache_entries_stored_at ON cache_entries (stored_at)')
+
+    def _connect(self):
+        # One connection per thread and process (never reuse one across a fork)
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def _get(self, key):
+        row = self._connect().execute(
+            'SELECT version, value FROM cache_entries WHERE key = ? AND expires_at > ?',
+            (key, time.time()),
+        ).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def _set(self, key, version, blob, ttl):
+        now = time.time()
+        conn = self._connect()
+        conn.execute(
+            'INSERT OR REPLACE INTO cache_entries (key, version, value, stored_at, expires_at)'
+            ' VALUES (?, ?, ?, ?, ?)',
+            (key, version, sqlite3.Binary(blob), now, now + ttl),
+        )
+        self._writes += 1
+        if self._writes % self.PRUNE_EVERY == 0:
+            self._prune(conn, now)
+
+    def _prune(self, conn, now):
+        conn.execute('DELETE FROM cache_entries WHERE expires_at <= ?', (now,))
+        conn.execute(
+            'DELETE FROM cache_entries WHERE key IN (SELECT key FROM cache_entries'
+            ' ORDER BY stored_at DESC LIMIT -1 OFFSET ?)',
+            (self.max_entries,),
+        )
+
+    def _delete(self, key):
+        self._connect().execute('DELETE FROM cache_entries WHERE key = ?', (key,))
+
+    def _clear(self):
+        self._connect().execute('DELETE FROM cache_entries')
+
+    def _describe(self):
+        row = self._connect().execute(
+            'SELECT COUNT(*), COALESCE(SUM(LENGTH(value)), 0) FROM cache_entries'
+        ).fetchone()
+        return {'path': os.path.abspath(self.path), 'entries': row[0],
+                'maxEntries': self.max_entries, 'bytes': row[1]}
+
+
+class RespError(Exception):
+    """Error reply from a Redis-protocol server"""
+
+
+class RedisBackend(CacheBackend):
+    """Minimal Redis-protocol (RESP) client: GET/SET PX/DEL/SCAN over a socket
+
+    Each record is stored as one string: a 2-byte version length, the
+    version and the blob, so a lookup is a single GET.
+    """
+
+    name = 'redis'
+    shared = True
+
+    def __init__(self, url='redis://127.0.0.1:6379/0', prefix=CACHE_PREFIX,
+                 timeout=CACHE_SOCKET_TIMEOUT, ttl=CACHE_TTL, retry_seconds=CACHE_RETRY_SECONDS):
+        super().__init__(ttl)
+        parsed = urlparse(url)
+        self.host = parsed.hostname or '127.0.0.1'
+        self.port = parsed.port or 6379
+        self.password = parsed.password
+        self.db = int(parsed.path.lstrip('/') or 0)
+        self.prefix = prefix
+        self.timeout = timeout
+        self.retry_seconds = retry_seconds
+        self._local = threading.local()
+        # Circuit breaker: after a connection failure, calls fail fast until then
+        self._down_until = 0.0
+
+    # ---------- protocol ----------
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            if time.monotonic() < self._down_until:
+                raise CacheUnavailable(f'{self.host}:{self.port} unavailable, retrying later')
+            try:
+                sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+            except OSError:
+                self._down_until = time.monotonic() + self.retry_seconds
+                raise
+            conn = (sock, sock.makefile('rb'))
+            self._local.conn, self._local.pid = conn, os.getpid()
+            if self.password:
+                self._command('AUTH', self.password)
+            if self.db:
+                self._command('SELECT', self.db)
+        return conn
+
+    def _close(self):
+        conn = getattr(self._local, 'conn', None)
+        self._local.conn = None
+        if conn is not None:
+            try:
+                conn[1].close()
+                conn[0].close()
+            except OSError:
+                pass
+
+    @staticmethod
+    def _pack(args):
+        parts = [b'*%d\r\n' % len(args)]
+        for arg in args:
+            if not isinstance(arg, bytes):
+                arg = str(arg).encode('utf-8')
+            parts.append(b'$%d\r\n%s\r\n' % (len(arg), arg))
+        return b''.join(parts)
+
+    def _read_reply(self, reader):
+        line = reader.readline()
+        if not line:
+            raise ConnectionError('connection closed by server')
+        kind, rest = line[:1], line[1:-2]
+        if kind == b'+':
+            return rest.decode('utf-8')
+        if kind == b'-':
+            raise RespError(rest.decode('utf-8'))
+        if kind == b':':
+            return int(rest)
+        if kind == b'$':
+            length = int(rest)
+            if length < 0:
+                return None
+            data = reader.read(length + 2)
+            return data[:-2]
+        if kind == b'*':
+            count = int(rest)
+            return None if count < 0 else [self._read_reply(reader) for _ in range(count)]
+        raise ConnectionError(f'unexpected reply: {line!r}')
+
+    def _command(self, *args):
+        sock, reader = self._connection()
+        try:
+            sock.sendall(self._pack(args))
+            return self._read_reply(reader)
+        except (OSError, ConnectionError):
+            self._close()
+            self._down_until = time.monotonic() + self.retry_seconds
+            raise
+
+    # ---------- backend ----------
+
+    def _get(self, key):
+        record = self._command('GET', self.prefix + key)
+        if record is None:
+            return None
+        (length,) = struct.unpack('>H', record[:2])
+        return record[2:2 + length].decode('utf-8'), record[2 + length:]
+
+    def _set(self, key, version, blob, ttl):
+        version = version.encode('utf-8')
+        record = struct.pack('>H', len(version)) + version + blob
+        self._command('SET', self.prefix + key, record, 'PX', int(ttl * 1000))
+
+    def _delete(self, key):
+        self._command('DEL', self.prefix + key)
+
+    def _clear(self):
+        cursor = b'0'
+        while True:
+            cursor, keys = self._command('SCAN', cursor, 'MATCH', self.prefix + '*', 'COUNT', 500)
+            if keys:
+                self._command('DEL', *keys)
+            if cursor in (b'0', '0'):
+                break
+
+    def _describe(self):
+        return {'server': f'{self.host}:{self.port}/{self.db}', 'prefix': self.prefix}
+
+
+def create_backend(name=CACHE_BACKEND, url=CACHE_URL):
+    """Build the configured backend, falling back to memory if it is unusable"""
+    try:
+        if name == 'sqlite':
+            return SQLiteBackend(url or DEFAULT_SQLITE_PATH)
+        if name == 'redis':
+            return RedisBackend(url or 'redis://127.0.0.1:6379/0')
+        if name != 'memory':
+            print(f"[CACHE] Unknown CACHE_BACKEND '{name}', using memory")
+    except Exception as e:
+        print(f"[CACHE] Could not open {name} cache ({e}), using memory")
+    return MemoryBackend()
+
+
+shared_cache = create_backend()
@@ -0,0 +1,328 @@
+"""
+Shared dataset provider for the CSV-backed analytics blueprints
+Loads and cleans each data file once per process and only reloads it when
+the file on disk actually changes (mtime/size first, then content hash).
+Cleaned frames are persisted as memory-mapped columnar snapshots so workers
+skip CSV parsing and share the page cache.
+"""
+
+import copy
+import hashlib
+import io
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from utils.snapshot import (prune_snapshots, read_pointer, read_snapshot,
+                            snapshot_path, write_pointer, write_snapshot)
+
+# Frames are handed out as copies so a route adding or overwriting columns
+# never writes through to the cache. pandas 3 copies on write, so a shallow
+# copy is enough there; older versions get a deep copy.
+DEEP_COPY_FRAMES = int(pd.__version__.split('.')[0]) < 3
+
+# Upper bound on memoized indexes/aggregates per snapshot (keys can depend on
+# query parameters such as custom histogram edges)
+DERIVED_CACHE_SIZE = 256
+
+DATA_DIR = os.getenv('DATA_DIR', os.path.join(os.path.dirname(__file__), '..', 'data'))
+# Set SNAPSHOT_DIR to an empty string to disable columnar snapshots
+SNAPSHOT_DIR = os.getenv('SNAPSHOT_DIR', os.path.join(DATA_DIR, '.snapshots'))
+
+STUDENT_NUMERIC_COLUMNS = ['Attendance (%)', 'Midterm_Score', 'Final_Score', 'Assignments_Avg',
+                           'Quizzes_Avg', 'Participation_Score', 'Projects_Score', 'Total_Score',
+                           'Study_Hours_per_Week', 'Stress_Level (1-10)', 'Sleep_Hours_per_Night', 'Age']
+
+
+class DatasetSnapshot:
+    """One immutable, versioned load of a dataset file"""
+
+    def __init__(self, frame, version, stamp):
+        self._frame = frame
+        self.version = version
+        self.stamp = stamp
+        self.loaded_at = time.time()
+        self._derived = OrderedDict()
+        self._derived_lock = threading.Lock()
+        self._derive_locks = {}
+
+        # Rows with a usable department, used by the per-department analytics
+        if 'Department' in frame.columns:
+            departments = frame['Department']
+            mask = departments.notna() & (departments != '-') & (departments != '')
+            self._department_frame = frame[mask]
+        else:
+            self._department_frame = frame
+
+    @property
+    def frame(self):
+        """Copy of the cleaned frame that callers may modify"""
+        return self._frame.copy(deep=DEEP_COPY_FRAMES)
+
+    @property
+    def department_frame(self):
+        """Copy of the rows that belong to a real department"""
+        return self._department_frame.copy(deep=DEEP_COPY_FRAMES)
+
+    def restamped(self, stamp):
+        """The same data under a new file stamp; memoized indexes carry over"""
+        snap = copy.copy(self)
+        snap.stamp = stamp
+        return snap
+
+    def __len__(self):
+        return len(self._frame)
+
+    def derive(self, key, builder):
+        """Compute builder(snapshot) once for this version and memoize it under key
+
+        Indexes and aggregates built this way are dropped together with the
+        snapshot when the source file changes. The least recently used entries
+        are evicted beyond DERIVED_CACHE_SIZE.
+        """
+        with self._derived_lock:
+            if key in self._derived:
+                self._derived.move_to_end(key)
+                return self._derived[key]
+
+        with self._derive_locks.setdefault(key, threading.Lock()):
+            with self._derived_lock:
+                if key in self._derived:
+                    return self._derived[key]
+            value = builder(self)
+            with self._derived_lock:
+                self._derived[key] = value
+                while len(self._derived) > DERIVED_CACHE_SIZE:
+                    evicted, _ = self._derived.popitem(last=False)
+                    self._derive_locks.pop(evicted, None)
+            return value
+
+
+class DatasetProvider:
+    """Loads a CSV file once per process and hands out versioned snapshots"""
+
+    def __init__(self, path, numeric_columns=(), snapshot_dir=None):
+        self.path = path
+        self.numeric_columns = list(numeric_columns)
+        self.snapshot_dir = snapshot_dir or None
+        self._snapshot = None
+        self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+        self.builds = 0
+        self.source = None
+
+    def _count(self, counter):
+        with self._stats_lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def _read_source(self):
+        with open(self.path, 'rb') as file:
+            raw = file.read()
+        return raw, hashlib.blake2b(raw, digest_size=16).hexdigest()
+
+    def _parse(self, raw):
+        """Parse and clean the raw file contents"""
+        df = pd.read_csv(io.BytesIO(raw))
+        for col in self.numeric_columns:
+            if col in df.columns:
+                df[col] = pd.to_numeric(df[col], errors='coerce')
+        return df
+
+    def _load_frame(self, stamp, version, raw):
+        """Return (frame, version), preferring the memory-mapped snapshot"""
+        if self.snapshot_dir and version is not None:
+            frame = read_snapshot(snapshot_path(self.snapshot_dir, self.path, version))
+            if frame is not None:
+                self.source = 'snapshot'
+                return frame, version
+
+        if raw is None:
+            raw, version = self._read_source()
+        frame = self._parse(raw)
+        self.source = 'csv'
+
+        if self.snapshot_dir:
+            directory = snapshot_path(self.snapshot_dir, self.path, version)
+            try:
+                write_snapshot(frame, directory)
+                write_pointer(self.snapshot_dir, self.path, stamp, version)
+                prune_snapshots(self.snapshot_dir, self.path, version)
+                self._count('builds')
+            except OSError:
+                # Read-only deployments keep serving the parsed frame
+                return frame, version
+            mapped = read_snapshot(directory)
+            if mapped is not None:
+                self.source = 'snapshot'
+                frame = mapped
+        return frame, version
+
+    def snapshot(self):
+        """Return the current snapshot, reloading only if the file changed"""
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        stamp = (st.st_mtime_ns, st.st_size)
+
+        snap = self._snapshot
+        if snap is not None and snap.stamp == stamp:
+            self._count('hits')
+            return snap
+
+        with self._lock:
+            snap = self._snapshot
+            if snap is not None and snap.stamp == stamp:
+                self._count('hits')
+                return snap
+
+            # A matching pointer lets a cold worker skip hashing the source
+            version = raw = None
+            if self.snapshot_dir:
+                pointer = read_pointer(self.snapshot_dir, self.path)
+                if pointer and tuple(pointer['stamp']) == stamp:
+                    version = pointer['version']
+            if version is None:
+                raw, version = self._read_source()
+
+            # Touched but not modified: keep the loaded frame
+            if snap is not None and snap.version == version:
+                self._snapshot = snap.restamped(stamp)
+                self._count('hits')
+                return self._snapshot
+
+            frame, version = self._load_frame(stamp, version, raw)
+
+            new_snap = DatasetSnapshot(frame, version, stamp)
+            self._count('misses' if snap is None else 'reloads')
+            self._snapshot = new_snap
+            return new_snap
+
+    def stats(self):
+        """Cache counters for diagnostics"""
+        snap = self._snapshot
+        return {
+            'path': os.path.abspath(self.path),
+            'version': snap.version if snap else None,
+            'rows': len(snap) if snap else 0,
+            'loadedAt': snap.loaded_at if snap else None,
+            'hits': self.hits,
+            'misses': self.misses,
+            'reloads': self.reloads,
+            'snapshotBuilds': self.builds,
+            'source': self.source,
+        }
+
+
+student_dataset = DatasetProvider(
+    os.path.join(DATA_DIR, 'student_data.csv'),
+    numeric_columns=STUDENT_NUMERIC_COLUMNS,
+    snapshot_dir=SNAPSHOT_DIR,
+)
+
+department_dataset = DatasetProvider(
+    os.path.join(DATA_DIR, 'department_data.csv'),
+    snapshot_dir=SNAPSHOT_DIR,
+)
+
+DATASETS = {
+    'studentData': student_dataset,
+    'departmentData': department_dataset,
+}
+
+
+WINDOW_ARGS = ('department', 'offset', 'limit')
+
+
+def int_arg(args, name):
+    try:
+        value = int(args.get(name))
+    except (TypeError, ValueError):
+        return None
+    return max(value, 0)
+
+
+def has_window(args):
+    """True if the request narrows the dataset with department/offset/limit"""
+    return bool(args) and any(args.get(name) not in (None, '') for name in WINDOW_ARGS)
+
+
+def apply_window(df, args):
+    """Apply the optional ?department=&offset=&limit= window with vectorized filters"""
+    if not args:
+        return df
+
+    department = args.get('department')
+    if department and 'Department' in df.columns:
+        departments = [d.strip() for d in department.split(',') if d.strip()]
+        df = df[df['Department'].isin(departments)]
+
+    offset = int_arg(args, 'offset')
+    limit = int_arg(args, 'limit')
+    if offset is not None or limit is not None:
+        start = offset or 0
+        stop = None if limit is None else start + limit
+        df = df.iloc[start:stop]
+    return df
+
+
+def row_positions(snap, column='Student_ID'):
+    """Map each key in column to its first row position, memoized per version"""
+    def build(s):
+        frame = s.frame
+        keys = frame[column].astype(object)
+        first = ~keys.duplicated(keep='first')
+        return dict(zip(keys[first], np.flatnonzero(first.to_numpy())))
+    return snap.derive(('positions', column), build)
+
+
+def load_student_snapshot():
+    """Current student dataset snapshot, or None if unavailable"""
+    try:
+        return student_dataset.snapshot()
+    except Exception:
+        return None
+
+
+def load_snapshot(name='studentData'):
+    """Current snapshot of a shared dataset by name, or None if unavailable"""
+    if name == 'studentData':
+        return load_student_snapshot()
+    try:
+        return DATASETS[name].snapshot()
+    except Exception:
+        return None
+
+
+def load_student_data(valid_departments=False, window=None):
+    """Load cleaned student data from the shared cache, or None if unavailable
+
+    `window` is an optional mapping (usually request.args) with department,
+    offset and limit keys, see apply_window.
+    """
+    snap = load_student_snapshot()
+    if snap is None:
+        return None
+    df = snap.department_frame if valid_departments else snap.frame
+    return apply_window(df, window)
+
+
+def warm_datasets():
+    """Load every dataset, building any missing snapshots"""
+    for provider in DATASETS.values():
+        try:
+            provider.snapshot()
+        except Exception as e:
+            print(f"[DATA] Could not load {provider.path}: {e}")
+
+
+def dataset_stats():
+    """Counters for every shared dataset"""
+    return {name: provider.stats() for name, provider in DATASETS.items()}
@@ -0,0 +1,154 @@
+"""
+Database connection pool sized from the gunicorn worker/thread config
+Every gunicorn worker process has its own pool, and a gthread worker runs
+`threads` requests at once, each holding at most one connection, so the
+pool gets one connection per thread plus a little overflow for streamed
+exports that outlive their request. A checkout that still finds nothing
+free gives up after DB_POOL_TIMEOUT instead of parking the thread for
+SQLAlchemy's default 30 s.
+
+On PostgreSQL, connections are pre-pinged and recycled before the proxy
+in front of the database drops them idle, and every statement gets a
+server-side statement_timeout below the gunicorn worker timeout.
+
+MeteredQueuePool counts checkouts, waits for a free connection, wait time,
+timeouts and connection churn; pool_stats() reports them with the live
+checked-out count at /api/internal/pool-stats. Each worker reports its
+own pool.
+
+Every setting can be overridden: DB_POOL_SIZE, DB_MAX_OVERFLOW,
+DB_POOL_TIMEOUT (s), DB_POOL_RECYCLE (s), DB_POOL_PRE_PING (0/1),
+DB_STATEMENT_TIMEOUT_MS.
+"""
+
+import os
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool
+
+import gunicorn_config
+
+
+def _env_int(name, default):
+    value = os.getenv(name)
+    return int(value) if value not in (None, '') else default
+
+
+def pool_settings(url):
+    """Pool settings for a database URL, derived from gunicorn_config"""
+    url = make_url(url)
+    threads = gunicorn_config.threads if gunicorn_config.worker_class == 'gthread' else 1
+    settings = {
+        'pool_size': _env_int('DB_POOL_SIZE', threads),
+        'max_overflow': _env_int('DB_MAX_OVERFLOW', max(2, threads // 2)),
+        'pool_timeout': _env_int('DB_POOL_TIMEOUT', 10),
+    }
+    if url.get_backend_name() != 'sqlite':
+        settings['pool_recycle'] = _env_int('DB_POOL_RECYCLE', 300)
+        settings['pool_pre_ping'] = bool(_env_int('DB_POOL_PRE_PING', 1))
+    if url.get_backend_name() == 'postgresql':
+        # Well under the worker timeout, so a runaway query fails its request
+        # instead of getting the whole worker killed
+        settings['statement_timeout_ms'] = _env_int(
+            'DB_STATEMENT_TIMEOUT_MS', max(1, gunicorn_config.timeout // 4) * 1000)
+    return settings
+
+
+def engine_options(url):
+    """SQLALCHEMY_ENGINE_OPTIONS for pool_settings(url)"""
+    settings = pool_settings(url)
+    options = {key: value for key, value in settings.items() if key != 'statement_timeout_ms'}
+    if make_url(url).database in (None, '', ':memory:'):
+        # In-memory SQLite lives in one connection; keep SQLAlchemy's own pool
+        return {}
+    options['poolclass'] = MeteredQueuePool
+    if 'statement_timeout_ms' in settings:
+        options['connect_args'] = {'options': f"-c statement_timeout={settings['statement_timeout_ms']}"}
+    return options
+
+
+class MeteredQueuePool(QueuePool):
+    """QueuePool that counts how often and how long checkouts wait"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self.checkouts = 0
+        self.waits = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.timeouts = 0
+        self.connects = 0
+        self.closes = 0
+        self.invalidations = 0
+        event.listen(self, 'connect', lambda *args: self._count('connects'))
+        event.listen(self, 'close', lambda *args: self._count('closes'))
+        event.listen(self, 'invalidate', lambda *args: self._count('invalidations'))
+
+    def _count(self, counter):
+        with self._stats_lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def recreate(self):
+        # Engine.dispose() builds a fresh pool; carry the counters over
+        pool = super().recreate()
+        with self._stats_lock:
+            for counter in ('checkouts', 'waits', 'wait_seconds', 'max_wait_seconds',
+                            'timeouts', 'connects', 'closes', 'invalidations'):
+                setattr(pool, counter, getattr(self, counter))
+        return pool
+
+    def _do_get(self):
+        # Nothing idle and no overflow left: this checkout has to wait
+        waiting = self.checkedin() == 0 and self.overflow() >= self._max_overflow > -1
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except Exception:
+            if waiting:
+                self._count('timeouts')
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._stats_lock:
+                self.checkouts += 1
+                if waiting:
+                    self.waits += 1
+                    self.wait_seconds += elapsed
+                    self.max_wait_seconds = max(self.max_wait_seconds, elapsed)
+
+    def stats(self):
+        """Counters for diagnostics"""
+        with self._stats_lock:
+            return {
+                'size': self.size(),
+                'maxOverflow': self._max_overflow,
+                'timeout': self._timeout,
+                'checkedOut': self.checkedout(),
+                'checkedIn': self.checkedin(),
+                'overflow': max(self.overflow(), 0),
+                'checkouts': self.checkouts,
+                'waits': self.waits,
+                'waitRate': round(self.waits / self.checkouts, 4) if self.checkouts else 0.0,
+                'waitMsTotal': round(self.wait_seconds * 1000, 2),
+                'waitMsAvg': round(self.wait_seconds * 1000 / self.waits, 2) if self.waits else 0.0,
+                'waitMsMax': round(self.max_wait_seconds * 1000, 2),
+                'timeouts': self.timeouts,
+                'connects': self.connects,
+                'closes': self.closes,
+                'invalidations': self.invalidations,
+            }
+
+
+def pool_stats(engine):
+    """Live pool counters of this worker process"""
+    pool = engine.pool
+    stats = {'pid': os.getpid(), 'pool': type(pool).__name__, 'settings': pool_settings(engine.url)}
+    if isinstance(pool, MeteredQueuePool):
+        stats.update(pool.stats())
+    else:
+        stats['status'] = pool.status()
+    return stats
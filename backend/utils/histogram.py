@@ -0,0 +1,104 @@
+"""
+Vectorized histogram service for the distribution endpoints
+Counts every bin in a single np.searchsorted/np.bincount pass with explicit
+bin closure, and memoizes results per dataset version, column and bin spec.
+"""
+
+import numpy as np
+import pandas as pd
+
+from utils.dataset import apply_window, has_window
+
+MAX_BINS = 200
+
+
+def parse_bin_spec(args, default_edges=None, default_bins=10):
+    """Read ?bins=, ?edges= and ?closed= from a mapping
+
+    Returns (spec, closed) where spec is ('edges', (e0, e1, ...)) or
+    ('bins', n). Raises ValueError for malformed input.
+    """
+    closed = args.get('closed', 'left') if args else 'left'
+    if closed not in ('left', 'right'):
+        raise ValueError("closed must be 'left' or 'right'")
+
+    edges = args.get('edges') if args else None
+    if edges:
+        values = tuple(float(edge) for edge in edges.split(','))
+        if len(values) < 2 or any(b <= a for a, b in zip(values, values[1:])):
+            raise ValueError('edges must be at least two strictly increasing numbers')
+        return ('edges', values), closed
+
+    bins = args.get('bins') if args else None
+    if bins:
+        count = int(bins)
+        if not 1 <= count <= MAX_BINS:
+            raise ValueError(f'bins must be between 1 and {MAX_BINS}')
+        return ('bins', count), closed
+
+    if default_edges is not None:
+        return ('edges', tuple(float(edge) for edge in default_edges)), closed
+    return ('bins', default_bins), closed
+
+
+def histogram(values, spec, closed='left'):
+    """Count values per bin
+
+    closed='left' gives [a, b) bins with the last bin also including its right
+    edge (np.histogram semantics); closed='right' gives (a, b] bins with the
+    first bin also including its left edge. NaN and out-of-range values are
+    not counted.
+    """
+    values = pd.to_numeric(pd.Series(values), errors='coerce').to_numpy(dtype=float)
+    present = values[~np.isnan(values)]
+
+    kind, param = spec
+    if kind == 'edges':
+        edges = np.asarray(param, dtype=float)
+    else:
+        low, high = (present.min(), present.max()) if len(present) else (0.0, 1.0)
+        if low == high:
+            low, high = low - 0.5, high + 0.5
+        edges = np.linspace(low, high, param + 1)
+
+    nbins = len(edges) - 1
+    if closed == 'left':
+        index = np.searchsorted(edges, present, side='right') - 1
+        index[present == edges[-1]] = nbins - 1
+    else:
+        index = np.searchsorted(edges, present, side='left') - 1
+        index[present == edges[0]] = 0
+    index = index[(index >= 0) & (index < nbins)]
+
+    return {
+        'edges': edges.tolist(),
+        'counts': np.bincount(index, minlength=nbins).tolist(),
+        'total': int(len(values)),
+    }
+
+
+def column_histogram(snap, column, spec, closed='left', window=None):
+    """Histogram of one dataset column, memoized per version unless windowed"""
+    if has_window(window):
+        return histogram(apply_window(snap.frame, window)[column], spec, closed)
+    key = ('histogram', column, spec, closed)
+    return snap.derive(key, lambda s: histogram(s.frame[column], spec, closed))
+
+
+def _format_edge(edge):
+    return f'{edge:g}'
+
+
+def histogram_bins(result):
+    """Flatten a histogram result into labelled bins for JSON responses"""
+    edges, counts, total = result['edges'], result['counts'], result['total']
+    bins = []
+    for i, count in enumerate(counts):
+        bins.append({
+            'range': f'{_format_edge(edges[i])}-{_format_edge(edges[i + 1])}',
+            'min': round(edges[i], 6),
+            'max': round(edges[i + 1], 6),
+            'count': count,
+            'percentage': round(count / total * 100, 2) if total > 0 else 0
+        })
+    return bins
@@ -0,0 +1,143 @@
+"""
+Conditional GET support (ETag / Last-Modified) for read endpoints
+A validator returns a cheap data-version token for the current request: the
+content hash of a CSV dataset, or the cache_versions counters of the tables
+behind a DB route. The strong ETag is derived from that token, the
+path and the normalized query string, and a matching If-None-Match is
+answered with 304 before the view runs any computation or ORM hydration.
+"""
+
+import functools
+import hashlib
+from datetime import datetime, timezone
+
+from flask import g, make_response, request
+from sqlalchemy import select
+
+from database import db
+from models.database_models import CacheVersion
+from utils.dataset import load_snapshot
+
+
+def normalized_query(args):
+    """Query string with keys and repeated values in a stable order"""
+    return '&'.join(f'{key}={value}' for key in sorted(args)
+                    for value in sorted(args.getlist(key)))
+
+
+def dataset_validator(*names):
+    """Validator for CSV-backed routes: the content hash of each dataset"""
+    def validator():
+        versions, modified = [], None
+        for name in names:
+            snap = load_snapshot(name)
+            if snap is None:
+                versions.append('-')
+                continue
+            versions.append(snap.version)
+            mtime = datetime.fromtimestamp(snap.stamp[0] / 1e9, tz=timezone.utc)
+            modified = mtime if modified is None else max(modified, mtime)
+        return ':'.join(versions), modified
+    return validator
+
+
+def table_validator(*models):
+    """Validator for DB-backed routes: the cache_versions counter of each table
+
+    Every commit that writes a table bumps its counter (utils/invalidation.py),
+    so the token moves with any committed change, deletes and writes that
+    reuse a timestamp included. No Last-Modified is derived. Without the
+    invalidation bus installed the counters never move, so no validator is
+    sent at all.
+    """
+    tables = sorted(model.__tablename__ for model in models)
+    versions_table = CacheVersion.__table__
+
+    def validator():
+        from utils.invalidation import version_bus
+        if not version_bus.installed:
+            return None
+        rows = db.session.execute(select(versions_table.c.name, versions_table.c.version)
+                                  .where(versions_table.c.name.in_(tables)))
+        versions = dict(rows.all())
+        return '|'.join(f'{table}:{versions.get(table, 0)}' for table in tables), None
+    return validator
+
+
+def make_etag(token):
+    key = f'{request.path}?{normalized_query(request.args)}|{token}'
+    return hashlib.blake2b(key.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def _validators():
+    """Return (etag, last_modified) for the current request, or None"""
+    if request.method not in ('GET', 'HEAD'):
+        return None
+    try:
+        result = g._conditional_validator()
+    except Exception as e:
+        print(f"[CACHE] Validator failed for {request.path}: {e}")
+        return None
+    if result is None:
+        return None
+    token, modified = result
+    return make_etag(token), modified
+
+
+def _not_modified(etag, modified):
+    """True if the request's validators still match the current version"""
+    if request.if_none_match:
+        return request.if_none_match.contains(etag)
+    since = request.if_modified_since
+    return modified is not None and since is not None and modified.replace(microsecond=0) <= since
+
+
+def _stamp(response, etag, modified):
+    response.set_etag(etag)
+    if modified is not None:
+        response.last_modified = modified
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
+def _check():
+    validators = _validators()
+    if validators is None:
+        return None
+    g._conditional_validators = validators
+    if _not_modified(*validators):
+        return _stamp(make_response('', 304), *validators)
+    return None
+
+
+def _finish(response):
+    validators = g.pop('_conditional_validators', None)
+    if validators is not None and response.status_code == 200:
+        _stamp(response, *validators)
+    return response
+
+
+def conditional(validator):
+    """Decorate a GET view so it sends validators and answers 304 early"""
+    def decorate(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            g._conditional_validator = validator
+            not_modified = _check()
+            if not_modified is not None:
+                return not_modified
+            return _finish(make_response(view(*args, **kwargs)))
+        return wrapper
+    return decorate
+
+
+def conditional_blueprint(blueprint, validator):
+    """Apply conditional GET to every view of a blueprint"""
+    @blueprint.before_request
+    def check_not_modified():
+        g._conditional_validator = validator
+        return _check()
+
+    @blueprint.after_request
+    def add_validators(response):
+        return _finish(response)
@@ -0,0 +1,150 @@
+"""
+Cross-worker cache invalidation through a version row per table
+Every commit that writes a table bumps that table's row in cache_versions in
+the same transaction. Each worker reads the (tiny) table at the start of a
+request and evicts only the cached responses whose tables moved since it
+last looked, so a write handled by one gunicorn worker invalidates all of
+them. CSV datasets need no broadcast: every worker already notices a changed
+file through its mtime/size stamp and content hash.
+"""
+
+import os
+import threading
+import time
+from datetime import datetime
+
+from flask import request
+from sqlalchemy import event, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from database import db
+from models.database_models import CacheVersion
+from utils.response_cache import response_cache
+
+# Seconds between version checks per worker; 0 checks on every API request
+CACHE_VERSION_INTERVAL = float(os.getenv('CACHE_VERSION_INTERVAL', '0'))
+
+versions_table = CacheVersion.__table__
+
+
+class VersionBus:
+    """This worker's view of the shared table versions"""
+
+    def __init__(self, interval=CACHE_VERSION_INTERVAL):
+        self.interval = interval
+        self.installed = False
+        self.known = {}
+        self._lock = threading.Lock()
+        self._checked_at = 0.0
+        self.checks = 0
+        self.remote_invalidations = 0
+
+    def observe(self, versions):
+        """Record versions; return the tables that moved since the last observation"""
+        with self._lock:
+            moved = [name for name, version in versions.items()
+                     if version > self.known.get(name, 0)]
+            for name in moved:
+                self.known[name] = versions[name]
+            return moved
+
+    def version_token(self, tables):
+        """Stable token for the current versions of the given tables"""
+        with self._lock:
+            return '|'.join(f'{name}:{self.known.get(name, 0)}' for name in sorted(tables))
+
+    def due(self):
+        now = time.monotonic()
+        if now - self._checked_at < self.interval:
+            return False
+        self._checked_at = now
+        return True
+
+    def check(self):
+        """Read the shared versions and evict responses for tables other workers wrote
+
+        Returns (evicted entry count, tables that moved).
+        """
+        rows = db.session.execute(select(versions_table.c.name, versions_table.c.version))
+        moved = self.observe(dict(rows.all()))
+        self.checks += 1
+        evicted = response_cache.invalidate(moved) if moved else 0
+        self.remote_invalidations += evicted
+        return evicted, moved
+
+    def stats(self):
+        with self._lock:
+            return {
+                'installed': self.installed,
+                'intervalSeconds': self.interval,
+                'checks': self.checks,
+                'remoteInvalidations': self.remote_invalidations,
+                'versions': dict(self.known),
+            }
+
+
+version_bus = VersionBus()
+
+
+def bump_versions(connection, tables):
+    """Increment the version row of each table inside the current transaction"""
+    now = datetime.utcnow()
+    # Sorted so concurrent writers lock rows in the same order
+    for name in sorted(tables):
+        bump = (versions_table.update()
+                .where(versions_table.c.name == name)
+                .values(version=versions_table.c.version + 1, updated_at=now))
+        if connection.execute(bump).rowcount:
+            continue
+        try:
+            with connection.begin_nested():
+                connection.execute(versions_table.insert().values(name=name, version=1, updated_at=now))
+        except IntegrityError:
+            # Another worker created the row first
+            connection.execute(bump)
+
+    rows = connection.execute(select(versions_table.c.name, versions_table.c.version)
+                              .where(versions_table.c.name.in_(tables)))
+    return dict(rows.all())
+
+
+@event.listens_for(Session, 'before_commit')
+def _bump_committed_tables(session):
+    if not version_bus.installed:
+        return
+    # Flush first so tables written by still-pending objects are recorded too
+    session.flush()
+    tables = session.info.get('changed_tables')
+    if tables:
+        session.info['committed_versions'] = bump_versions(session.connection(), tables)
+
+
+@event.listens_for(Session, 'after_commit')
+def _observe_committed_versions(session):
+    versions = session.info.pop('committed_versions', None)
+    if versions:
+        # This worker already evicted these tables when the commit landed
+        version_bus.observe(versions)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_committed_versions(session):
+    session.info.pop('committed_versions', None)
+
+
+def install_invalidation(app):
+    """Check the version table (migration a3c91e5d7f02) at the start of every API request"""
+    version_bus.installed = True
+
+    @app.before_request
+    def check_cache_versions():
+        if not request.path.startswith('/api') or not version_bus.due():
+            return None
+        try:
+            evicted, moved = version_bus.check()
+            if evicted:
+                print(f"[CACHE] Tables changed in another worker: {', '.join(sorted(moved))}")
+        except Exception as e:
+            print(f"[CACHE] Version check failed: {e}")
+        return None
@@ -0,0 +1,87 @@
+"""
+Keyset (cursor) pagination for the DB-backed list endpoints
+A page is "the next N rows after (sort value, id)" in (sort column, id)
+order, so every page is an index range scan of N rows however deep it is,
+unlike OFFSET which reads and discards everything before it. The cursor is
+an opaque token carrying the sort, the last row's key and the total counted
+on the first page.
+"""
+
+import base64
+import json
+
+from sqlalchemy import tuple_
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+class PageError(ValueError):
+    """Bad paging arguments; reported to the client as a 400"""
+
+
+def encode_cursor(payload):
+    raw = json.dumps(payload, separators=(',', ':'), sort_keys=True).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token):
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        payload = json.loads(raw)
+    except (ValueError, TypeError):
+        raise PageError('Invalid cursor')
+    if not isinstance(payload, dict) or 'id' not in payload:
+        raise PageError('Invalid cursor')
+    return payload
+
+
+def page_size(args):
+    """Read ?limit= (default DEFAULT_PAGE_SIZE, capped at MAX_PAGE_SIZE)"""
+    value = args.get('limit')
+    if value in (None, ''):
+        return DEFAULT_PAGE_SIZE
+    try:
+        size = int(value)
+    except ValueError:
+        raise PageError(f"Invalid limit '{value}'")
+    if size < 1:
+        raise PageError('limit must be at least 1')
+    return min(size, MAX_PAGE_SIZE)
+
+
+def after_condition(column, id_column, value, last_id, descending):
+    """Rows strictly after (value, last_id) in the page order
+
+    One row-value comparison, (column, id) > (value, last_id), which the
+    planner turns into a seek into the (column, id) index; the sortable
+    columns are NOT NULL, so no NULL branch is needed.
+    """
+    if column is id_column:
+        return id_column < last_id if descending else id_column > last_id
+    if value is None:
+        raise PageError('Invalid cursor')
+    key = tuple_(column, id_column)
+    return key < (value, last_id) if descending else key > (value, last_id)
+
+
+def page_order(column, id_column, descending):
+    columns = [id_column] if column is id_column else [column, id_column]
+    return [c.desc() if descending else c.asc() for c in columns]
+
+
+def keyset_page(query, column, id_column, size, cursor=None, descending=False):
+    """Return (rows, next cursor values or None) for one page of query
+
+    cursor is a decoded cursor dict ({'value', 'id'}) or None for the first
+    page. One extra row is fetched to know whether another page follows.
+    """
+    if cursor is not None:
+        query = query.filter(after_condition(column, id_column, cursor.get('value'),
+                                             cursor['id'], descending))
+    rows = query.order_by(*page_order(column, id_column, descending)).limit(size + 1).all()
+    if len(rows) <= size:
+        return rows, None
+    rows = rows[:size]
+    last = rows[-1]
+    return rows, {'value': getattr(last, column.key), 'id': getattr(last, id_column.key)}
@@ -0,0 +1,64 @@
+"""
+Dashboard panel registry
+Every analytics payload is built by a plain function of (snapshot, args), so a
+standalone route and the /api/dashboard bundle compute it the same way: the
+route wraps it with panel_route(), the bundle runs many of them against one
+pinned snapshot.
+"""
+
+import functools
+import traceback
+
+from flask import request
+
+from utils.cache_backends import shared_cache
+from utils.dataset import load_snapshot
+from utils.http_cache import normalized_query
+from utils.serialization import json_response
+
+# Panel name ('overview/top-scorers', ...) -> {'builder': func, 'dataset': name}
+PANELS = {}
+
+
+class PanelError(Exception):
+    """A panel failure that should reach the client with an HTTP status"""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def run_panel(name, snap, args):
+    """Build one panel, returning (payload, status)
+
+    Payloads are read through the shared cache under the dataset version,
+    so any worker (or a freshly restarted one) reuses a built panel.
+    """
+    if snap is None:
+        return {'error': 'Data not found'}, 404
+    key = f'panel:{name}?{normalized_query(args)}'
+    payload = shared_cache.get(key, snap.version)
+    if payload is not None:
+        return payload, 200
+    try:
+        payload = PANELS[name]['builder'](snap, args)
+        shared_cache.set(key, snap.version, payload)
+        return payload, 200
+    except PanelError as e:
+        return {'error': str(e)}, e.status
+    except Exception as e:
+        traceback.print_exc()
+        return {'error': str(e)}, 500
+
+
+def panel_route(name, dataset_name='studentData'):
+    """Register a (snap, args) builder as a panel and turn it into a GET view"""
+    def register(builder):
+        PANELS[name] = {'builder': builder, 'dataset': dataset_name}
+
+        @functools.wraps(builder)
+        def view():
+            payload, status = run_panel(name, load_snapshot(dataset_name), request.args)
+            return json_response(payload, status)
+        return view
+    return register
@@ -0,0 +1,121 @@
+"""
+SQL statement counting per request, with per-endpoint budgets
+An engine event counts every statement a request executes (including the
+ones a streamed response runs after the view returns). When a request ends
+the count is checked against the endpoint's budget; check_query_budgets.py
+drives every read endpoint at two table sizes and fails on an over-budget
+request or on a count that grows with the table, which is how an N+1
+pattern shows up.
+
+Enabled with QUERY_COUNT=1 or app.testing; it costs one counter increment
+per statement.
+"""
+
+import os
+import threading
+
+from flask import g, has_app_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Statements a read endpoint may run unless listed below. Every API request
+# also runs the cache version check (utils/invalidation.py), and the
+# conditional-GET validators add one aggregate query.
+DEFAULT_QUERY_BUDGET = int(os.getenv('DEFAULT_QUERY_BUDGET', '4'))
+
+# Endpoint name -> statement budget
+QUERY_BUDGETS = {
+    'students.get_students': 4,  # first keyset page also counts the total
+    'students.get_student': 3,
+    # Version check, validator, roll number, three ranked tiers, facets, ?department= total
+    'students.search_students_route': 8,
+    'subjects.get_all_subjects': 2,
+    'subjects.get_student_subjects': 2,
+    'subjects.get_student_detailed_marks': 2,
+    'subjects.get_all_subjects_stats': 4,
+    # Version check, then a students query and a selectin query per keyset batch;
+    # the budget covers one batch (the check script stays below EXPORT_BATCH_SIZE)
+    'subjects.export_all_subject_scores': 3,
+}
+
+
+class QueryCounter:
+    """Per-endpoint statement counts and budget violations"""
+
+    def __init__(self, budgets=None, default_budget=DEFAULT_QUERY_BUDGET):
+        self.budgets = dict(QUERY_BUDGETS if budgets is None else budgets)
+        self.default_budget = default_budget
+        self.installed = False
+        self.last = {}
+        self.peak = {}
+        self.violations = []
+        self._lock = threading.Lock()
+
+    def budget(self, endpoint):
+        return self.budgets.get(endpoint, self.default_budget)
+
+    def record(self, endpoint, method, count):
+        """Store one request's count; returns True when it is over budget"""
+        budget = self.budget(endpoint)
+        with self._lock:
+            self.last[endpoint] = count
+            self.peak[endpoint] = max(count, self.peak.get(endpoint, 0))
+            over = method == 'GET' and count > budget
+            if over:
+                self.violations.append({'endpoint': endpoint, 'queries': count, 'budget': budget})
+        return over
+
+    def reset(self):
+        with self._lock:
+            self.last.clear()
+            self.peak.clear()
+            self.violations.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'installed': self.installed,
+                'defaultBudget': self.default_budget,
+                'last': dict(self.last),
+                'peak': dict(self.peak),
+                'violations': list(self.violations),
+            }
+
+
+query_counter = QueryCounter()
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _count_statement(conn, cursor, statement, parameters, context, executemany):
+    tally = g.get('query_tally') if has_app_context() else None
+    if tally is not None:
+        tally[0] += 1
+
+
+def install_query_counter(app, counter=query_counter):
+    """Count statements per request and check them against the endpoint budgets"""
+    if not (app.testing or os.getenv('QUERY_COUNT', '').lower() in ('1', 'true', 'yes')):
+        return
+    counter.installed = True
+
+    @app.before_request
+    def start_query_count():
+        # A list so a streamed body, which runs after the view returned, adds to it
+        g.query_tally = [0]
+
+    @app.after_request
+    def check_query_budget(response):
+        tally = g.get('query_tally')
+        if tally is None:
+            return response
+        if not response.is_streamed:
+            response.headers['X-Query-Count'] = str(tally[0])
+        endpoint, method, path = request.endpoint, request.method, request.path
+
+        def report():
+            # Runs once the body has been sent, so streamed statements are included
+            if endpoint and counter.record(endpoint, method, tally[0]):
+                print(f"[DB] ⚠️ {method} {path} ran {tally[0]} queries "
+                      f"(budget {counter.budget(endpoint)} for {endpoint})")
+        response.call_on_close(report)
+        return response
@@ -0,0 +1,114 @@
+"""
+Top-K ranking index for the overview leaderboards
+Each ranking metric is argsorted once per dataset version (overall and per
+department), so a top-K request is a slice and a single student's rank or
+percentile is a binary search.
+"""
+
+import numpy as np
+import pandas as pd
+
+from utils.dataset import apply_window, int_arg
+
+DEFAULT_K = 10
+MAX_K = 100
+
+
+def metric_columns(frame):
+    """Return {metric: (values, eligible)} for every ranking metric"""
+    total = frame['Total_Score'].to_numpy(dtype=float)
+    attendance = frame['Attendance (%)'].to_numpy(dtype=float)
+    participation = frame['Participation_Score'].to_numpy(dtype=float)
+    projects = frame['Projects_Score'].to_numpy(dtype=float)
+    everyone = np.ones(len(frame), dtype=bool)
+
+    return {
+        'score': (total, everyone),
+        'attendance': (attendance, everyone),
+        # Activity ranking only considers students doing extracurriculars
+        'activity': (participation + projects,
+                     (frame['Extracurricular_Activities'] == 'Yes').to_numpy()),
+        # 40% Total_Score, 30% Attendance, 20% Participation, 10% Projects
+        'overall': ((total / 100 * 40) + (attendance / 100 * 30)
+                    + (participation / 100 * 20) + (projects / 100 * 10), everyone),
+    }
+
+
+class RankingIndex:
+    """Pre-sorted row positions for every ranking metric"""
+
+    def __init__(self, frame):
+        self.frame = frame
+        codes, departments = pd.factorize(frame['Department'].astype(object))
+        self.department_codes = {dept: code for code, dept in enumerate(departments)}
+
+        self.metrics = {}
+        for name, (values, eligible) in metric_columns(frame).items():
+            eligible = eligible & ~np.isnan(values)
+            positions = np.flatnonzero(eligible)
+
+            # Highest first; the stable sort keeps file order for ties (like nlargest)
+            order = positions[np.argsort(-values[positions], kind='stable')]
+            by_department = order[np.argsort(codes[order], kind='stable')]
+            bounds = np.searchsorted(codes[by_department], np.arange(len(departments) + 1))
+
+            self.metrics[name] = {
+                'values': values,
+                'eligible': eligible,
+                'order': order,
+                'by_department': by_department,
+                'bounds': bounds,
+                'ascending': np.sort(values[positions]),
+            }
+
+    def top(self, metric, k=DEFAULT_K, departments=None):
+        """Row positions of the top k rows, optionally within departments"""
+        m = self.metrics[metric]
+        if not departments:
+            return m['order'][:k]
+
+        parts = []
+        for dept in departments:
+            code = self.department_codes.get(dept)
+            if code is not None:
+                parts.append(m['by_department'][m['bounds'][code]:m['bounds'][code + 1]][:k])
+        if not parts:
+            return np.array([], dtype=np.intp)
+        if len(parts) == 1:
+            return parts[0]
+
+        merged = np.concatenate(parts)
+        merged = merged[np.lexsort((merged, -m['values'][merged]))]
+        return merged[:k]
+
+    def standing(self, metric, position):
+        """Rank (1 = best) and percentile of one row, or None if it is not ranked"""
+        m = self.metrics[metric]
+        if not m['eligible'][position]:
+            return None
+        value = m['values'][position]
+        ranked = len(m['ascending'])
+        at_or_below = int(np.searchsorted(m['ascending'], value, side='right'))
+        return {
+            'value': round(float(value), 2),
+            'rank': ranked - at_or_below + 1,
+            'outOf': ranked,
+            'percentile': round(at_or_below / ranked * 100, 2),
+        }
+
+
+def get_ranking_index(snap, window=None):
+    """Ranking index for a snapshot; offset/limit windows get their own index"""
+    if window and (int_arg(window, 'offset') is not None or int_arg(window, 'limit') is not None):
+        return RankingIndex(apply_window(snap.frame, {'offset': window.get('offset'),
+                                                      'limit': window.get('limit')}))
+    return snap.derive('ranking_index', lambda s: RankingIndex(s.frame))
+
+
+def top_k_args(args):
+    """Read ?k= (default 10, max 100) and ?department= (comma-separated)"""
+    k = int_arg(args, 'k') if args else None
+    k = DEFAULT_K if not k else min(k, MAX_K)
+    department = args.get('department') if args else None
+    departments = [d.strip() for d in department.split(',') if d.strip()] if department else None
+    return k, departments
@@ -0,0 +1,237 @@
+"""
+In-process response cache for the DB-backed read routes
+Entries are keyed by path and normalized query string, bounded by an LRU
+limit and a TTL, and tagged with the tables they were built from. SQLAlchemy
+session events record which tables a transaction touched and evict the
+dependent entries once it commits. With a shared cache backend (sqlite or
+redis) responses are also stored there under the tables' versions, so other
+workers and freshly started ones skip the query.
+"""
+
+import functools
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from flask import make_response, request
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from utils.cache_backends import shared_cache
+from utils.http_cache import normalized_query
+
+RESPONSE_CACHE_SIZE = int(os.getenv('RESPONSE_CACHE_SIZE', '256'))
+RESPONSE_CACHE_TTL = float(os.getenv('RESPONSE_CACHE_TTL', '300'))
+
+
+class ResponseCache:
+    """LRU + TTL cache of serialized responses with tag-based invalidation"""
+
+    def __init__(self, max_entries=RESPONSE_CACHE_SIZE, ttl=RESPONSE_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._tags = {}
+        # Per-table counter bumped by every invalidation, so a response built
+        # while a write committed is not stored after the eviction ran
+        self._generations = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self.stale_skips = 0
+        self.bytes = 0
+
+    def _drop(self, key):
+        entry = self._entries.pop(key)
+        self.bytes -= entry['size']
+        for tag in entry['tags']:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    def get(self, key):
+        """Return the cached entry for key, or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry['expires'] <= time.monotonic():
+                self._drop(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def generations(self, tags):
+        """Invalidation generations of tables; pass to set() to detect a write in between"""
+        with self._lock:
+            return tuple(self._generations.get(tag, 0) for tag in sorted(tags))
+
+    def set(self, key, body, status, mimetype, tags, generations=None):
+        """Store a response body under key, tagged with the tables it depends on
+
+        With generations (from generations(tags) taken before the body was
+        built), nothing is stored if any of the tables was invalidated since;
+        returns whether the entry was stored.
+        """
+        with self._lock:
+            if generations is not None and generations != tuple(
+                    self._generations.get(tag, 0) for tag in sorted(tags)):
+                self.stale_skips += 1
+                return False
+            if key in self._entries:
+                self._drop(key)
+            entry = {
+                'body': body,
+                'status': status,
+                'mimetype': mimetype,
+                'tags': frozenset(tags),
+                'expires': time.monotonic() + self.ttl,
+                'size': len(body),
+            }
+            self._entries[key] = entry
+            self.bytes += entry['size']
+            for tag in entry['tags']:
+                self._tags.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+            return True
+
+    def invalidate(self, tags):
+        """Evict every entry built from any of the given tables"""
+        with self._lock:
+            keys = set()
+            for tag in tags:
+                self._generations[tag] = self._generations.get(tag, 0) + 1
+                keys |= self._tags.get(tag, set())
+            for key in keys:
+                self._drop(key)
+            self.invalidations += len(keys)
+            return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+            self.bytes = 0
+
+    def stats(self):
+        """Counters for diagnostics"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'maxEntries': self.max_entries,
+                'ttlSeconds': self.ttl,
+                'bytes': self.bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hitRatio': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations,
+                'staleSkips': self.stale_skips,
+            }
+
+
+response_cache = ResponseCache()
+
+
+def _shared_version(tables):
+    """Version of the given tables as seen by this worker, or None without the bus"""
+    from utils.invalidation import version_bus
+    if not shared_cache.shared or not version_bus.installed:
+        return None
+    return version_bus.version_token(tables)
+
+
+def _shared_get(key, version):
+    return shared_cache.get(f'response:{key}', version) if version is not None else None
+
+
+def _shared_set(key, version, entry):
+    if version is not None:
+        shared_cache.set(f'response:{key}', version, entry)
+
+
+def cached_response(*tables):
+    """Serve a GET view from the response cache, invalidated by writes to tables"""
+    def decorate(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            key = f'{request.path}?{normalized_query(request.args)}'
+            # Taken before the view runs: a write committed while it runs moves
+            # them, and the body it built (possibly from before the write) is
+            # then served but not stored
+            generations = response_cache.generations(tables)
+            version = _shared_version(tables)
+            entry = response_cache.get(key)
+            if entry is None:
+                entry = _shared_get(key, version)
+                if entry is not None:
+                    response_cache.set(key, entry['body'], entry['status'], entry['mimetype'], tables,
+                                       generations)
+            if entry is not None:
+                response = make_response(entry['body'], entry['status'])
+                response.mimetype = entry['mimetype']
+                return response
+
+            response = make_response(view(*args, **kwargs))
+            if response.status_code == 200 and not response.is_streamed:
+                entry = {'body': response.get_data(), 'status': response.status_code,
+                         'mimetype': response.mimetype}
+                if response_cache.set(key, entry['body'], entry['status'], entry['mimetype'], tables,
+                                      generations):
+                    _shared_set(key, version, entry)
+            return response
+        return wrapper
+    return decorate
+
+
+# ==================== Write-driven invalidation ====================
+
+def changed_tables(session):
+    """Tables written in the current transaction of a session"""
+    return session.info.setdefault('changed_tables', set())
+
+
+@event.listens_for(Session, 'after_flush')
+def _record_flushed_tables(session, flush_context):
+    changed = changed_tables(session)
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        table = getattr(obj, '__tablename__', None)
+        if table:
+            changed.add(table)
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _record_bulk_tables(orm_execute_state):
+    # Query.update()/delete() and insert()/update()/delete() statements skip the flush
+    statement = orm_execute_state.statement
+    if orm_execute_state.is_select or not hasattr(statement, 'table'):
+        return
+    table = getattr(statement.table, 'name', None)
+    if table:
+        changed_tables(orm_execute_state.session).add(table)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_committed_tables(session):
+    changed = session.info.pop('changed_tables', None)
+    if changed:
+        response_cache.invalidate(changed)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_rolled_back_tables(session):
+    session.info.pop('changed_tables', None)
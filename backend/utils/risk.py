@@ -0,0 +1,71 @@
+"""
+Vectorized risk classification shared by /risk-students and /statistics
+Every row is classified in one pass with boolean masks; the annotated frame
+is memoized per dataset version (and per tier configuration).
+"""
+
+import json
+import os
+
+import numpy as np
+
+# Tiers are checked in order and the first match wins. A tier matches when
+# any of its `when` clauses matches; every key inside a clause must hold.
+# Supported clause keys: grades, attendanceBelow, scoreBelow.
+DEFAULT_RISK_TIERS = [
+    {'level': 'Critical', 'riskScore': 100, 'when': [
+        {'grades': ['F']},
+        {'grades': ['D'], 'attendanceBelow': 70},
+    ]},
+    {'level': 'High', 'riskScore': 75, 'when': [
+        {'grades': ['D']},
+        {'grades': ['C'], 'attendanceBelow': 60},
+    ]},
+    {'level': 'Medium', 'riskScore': 50, 'when': [
+        {'grades': ['C']},
+        {'attendanceBelow': 70, 'scoreBelow': 50},
+    ]},
+]
+
+# Override with a JSON list in the same shape, e.g. RISK_TIERS='[{"level": ...}]'
+RISK_TIERS = json.loads(os.getenv('RISK_TIERS')) if os.getenv('RISK_TIERS') else DEFAULT_RISK_TIERS
+
+
+def _clause_mask(df, clause):
+    mask = np.ones(len(df), dtype=bool)
+    if 'grades' in clause:
+        mask &= df['Grade'].isin(clause['grades']).to_numpy()
+    if 'attendanceBelow' in clause:
+        mask &= (df['Attendance (%)'] < clause['attendanceBelow']).to_numpy()
+    if 'scoreBelow' in clause:
+        mask &= (df['Total_Score'] < clause['scoreBelow']).to_numpy()
+    return mask
+
+
+def _tier_mask(df, tier):
+    mask = np.zeros(len(df), dtype=bool)
+    for clause in tier['when']:
+        mask |= _clause_mask(df, clause)
+    return mask
+
+
+def annotate_risk(df, tiers=None):
+    """Return df with riskLevel (None when not at risk) and riskScore (0) columns"""
+    tiers = tiers or RISK_TIERS
+    conditions = [_tier_mask(df, tier) for tier in tiers]
+    tier_index = np.select(conditions, np.arange(len(tiers)), default=-1)
+
+    levels = np.array([tier['level'] for tier in tiers] + [None], dtype=object)
+    scores = np.array([tier['riskScore'] for tier in tiers] + [0])
+
+    df = df.copy(deep=False)
+    df['riskLevel'] = levels[tier_index]
+    df['riskScore'] = scores[tier_index]
+    return df
+
+
+def risk_frame(snap, tiers=None):
+    """Risk-annotated frame for a dataset snapshot, computed once per version"""
+    tiers = tiers or RISK_TIERS
+    key = ('risk', json.dumps(tiers, sort_keys=True))
+    return snap.derive(key, lambda s: annotate_risk(s.frame, tiers)).copy(deep=False)
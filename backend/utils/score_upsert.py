@@ -0,0 +1,110 @@
+"""
+Subject score upserts: INSERT ... ON CONFLICT (student_id, subject_name) DO UPDATE
+One statement writes a score whether or not the student already has one for
+that subject, and the unique index on the pair means concurrent submissions
+cannot create duplicates. percentage is computed in the statement. SQLite and
+PostgreSQL share the syntax; the dialect picks the insert construct.
+"""
+
+from sqlalchemy import case, literal, tuple_, update
+from sqlalchemy.engine import make_url
+from sqlalchemy.dialects import postgresql, sqlite
+
+from models.database_models import StudentSubject
+from utils.subject_stats import apply_score_changes, refresh_subject_stats, summary_state
+
+DIALECT_INSERTS = {
+    'sqlite': sqlite.insert,
+    'postgresql': postgresql.insert,
+}
+
+# Columns an upsert overwrites on conflict; created_at keeps the first write
+UPSERT_COLUMNS = ['marks', 'maxMarks', 'assignment', 'test', 'project', 'quiz', 'updated_at']
+
+
+def check_upsert_dialect(database_uri):
+    """Refuse, at startup, a database the score upserts cannot write to"""
+    name = make_url(database_uri).get_backend_name()
+    if name not in DIALECT_INSERTS:
+        raise RuntimeError(
+            f"Unsupported database '{name}': score writes need INSERT ... ON CONFLICT, "
+            f"available on {', '.join(sorted(DIALECT_INSERTS))}")
+
+
+def dialect_insert(session):
+    # check_upsert_dialect (init_db) has already rejected any other dialect
+    return DIALECT_INSERTS[session.get_bind().dialect.name]
+
+
+def percentage_of(marks, max_marks):
+    return case((max_marks > 0, marks * 100.0 / max_marks), else_=None)
+
+
+def score_upsert(session, target=StudentSubject, values=None):
+    """INSERT ... ON CONFLICT DO UPDATE into student_subjects
+
+    target is the mapped class (for ORM RETURNING) or its table (for
+    executemany); values may be omitted and passed as execute() parameters.
+    """
+    statement = dialect_insert(session)(target)
+    if values is not None:
+        statement = statement.values(values)
+    excluded = statement.excluded
+    updates = {name: excluded[name] for name in UPSERT_COLUMNS}
+    updates['percentage'] = percentage_of(excluded.marks, excluded.maxMarks)
+    return statement.on_conflict_do_update(index_elements=['student_id', 'subject_name'], set_=updates)
+
+
+def lock_scores(session, keys, now):
+    """Lock and read the existing scores for (student_id, subject_name) keys
+
+    A no-op UPDATE ... RETURNING rather than a SELECT: it takes the row locks
+    (the write lock on SQLite) before reading, so a concurrent writer of the
+    same scores waits and its values cannot be read stale. Returns
+    {key: (id, marks, percentage)}.
+    """
+    table = StudentSubject.__table__
+    rows = session.execute(
+        update(table)
+        .where(tuple_(table.c.student_id, table.c.subject_name).in_(keys))
+        .values(updated_at=now)
+        .returning(table.c.id, table.c.student_id, table.c.subject_name, table.c.marks, table.c.percentage))
+    return {(student_id, subject_name): (score_id, marks, percentage)
+            for score_id, student_id, subject_name, marks, percentage in rows}
+
+
+def upsert_score(session, student_id, subject_name, components, max_marks, now):
+    """Write one score in one statement; returns (StudentSubject, created)
+
+    When the subject_stats summary is maintained, the previous marks are
+    locked and read first so its running sums can be adjusted; if a
+    concurrent insert slipped in between, the subject's summary row is
+    recomputed instead.
+    """
+    previous = None
+    if summary_state['installed']:
+        previous = lock_scores(session, [(student_id, subject_name)], now).get((student_id, subject_name))
+
+    marks = sum(components.values())
+    values = {
+        'student_id': student_id,
+        'subject_name': subject_name,
+        'marks': marks,
+        'maxMarks': max_marks,
+        'percentage': percentage_of(literal(float(marks)), literal(float(max_marks))),
+        'created_at': now,
+        'updated_at': now,
+        **components,
+    }
+    statement = score_upsert(session, values=values).returning(StudentSubject)
+    score = session.scalars(statement, execution_options={'populate_existing': True}).one()
+    # An update keeps the row's created_at, so this tells what the statement did
+    created = score.created_at == now
+
+    if created != (previous is None):
+        # Another request inserted the score between the read and the upsert
+        refresh_subject_stats(session.connection(), [subject_name])
+    else:
+        removed = [(previous[0], subject_name, *previous[1:])] if previous else []
+        apply_score_changes(session.connection(), removed, [(score.id, subject_name, score.marks, score.percentage)])
+    return score, created
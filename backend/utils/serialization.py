@@ -0,0 +1,87 @@
+"""
+NaN-safe JSON serialization for the analytics responses
+Frames become records in one vectorized pass per column (NaN/Inf -> None,
+numpy scalars -> Python natives); whole payloads are encoded with orjson
+when it is installed and with the standard library otherwise. Either way
+the output is strict JSON with sorted keys, matching Flask's jsonify.
+"""
+
+import datetime
+import json
+import math
+
+import numpy as np
+import pandas as pd
+from flask import Response
+
+try:
+    import orjson
+except ImportError:  # optional fast encoder
+    orjson = None
+
+
+class Records(list):
+    """Records already cleaned by frame_records(), skipped by sanitize()"""
+
+
+def _column_values(series):
+    """Python-native values of one column with missing/non-finite values as None"""
+    # copy=True: the frame usually belongs to a shared dataset snapshot
+    values = series.to_numpy(dtype=object, copy=True)
+    missing = series.isna().to_numpy()
+    if pd.api.types.is_float_dtype(series.dtype):
+        missing = missing | ~np.isfinite(series.to_numpy(dtype=float, na_value=np.nan))
+    if missing.any():
+        values[missing] = None
+    return values.tolist()
+
+
+def frame_records(df):
+    """DataFrame -> list of JSON-safe dicts (like to_dict(orient='records'))"""
+    columns = [str(column) for column in df.columns]
+    values = [_column_values(df.iloc[:, i]) for i in range(df.shape[1])]
+    return Records(dict(zip(columns, row)) for row in zip(*values))
+
+
+def sanitize(value):
+    """Recursively replace NaN/Inf with None and numpy scalars with natives"""
+    if isinstance(value, Records):
+        return value
+    if isinstance(value, dict):
+        return {key: sanitize(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [sanitize(item) for item in value]
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, np.generic):
+        return sanitize(value.item())
+    if isinstance(value, pd.DataFrame):
+        return frame_records(value)
+    return value
+
+
+def _default(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, pd.DataFrame):
+        return frame_records(value)
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+def json_bytes(payload):
+    """Encode a payload as strict JSON bytes"""
+    if orjson is not None:
+        # orjson writes NaN/Inf as null and handles numpy natively
+        return orjson.dumps(payload, default=_default,
+                            option=orjson.OPT_SORT_KEYS | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(sanitize(payload), default=_default, sort_keys=True, allow_nan=False,
+                      ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def json_response(payload, status=200):
+    """Flask response with a json_bytes() body"""
+    return Response(json_bytes(payload), status=status, mimetype='application/json')
@@ -0,0 +1,133 @@
+"""
+Columnar snapshots of the CSV datasets
+Each cleaned frame is written once as one .npy file per column and loaded back
+with numpy memory-mapping, so every gunicorn worker shares the same OS page
+cache instead of parsing the CSV text into a private copy.
+
+Layout inside the snapshot directory:
+    <stem>.json                 pointer: source (mtime_ns, size) -> version
+    <stem>-<version>/           one snapshot per source content hash
+        manifest.json
+        <n>.npy                 numeric/bool column n
+        <n>.codes.npy           categorical codes of text column n
+        <n>.categories.npy      categories of text column n
+"""
+
+import json
+import os
+import shutil
+import threading
+
+import numpy as np
+import pandas as pd
+
+SNAPSHOT_FORMAT = 1
+
+
+def _stem(source_path):
+    return os.path.splitext(os.path.basename(source_path))[0]
+
+
+def snapshot_path(snapshot_dir, source_path, version):
+    """Directory holding the snapshot of one source version"""
+    return os.path.join(snapshot_dir, f'{_stem(source_path)}-{version}')
+
+
+def _write_json(path, data):
+    tmp_path = f'{path}.tmp-{os.getpid()}-{threading.get_ident()}'
+    with open(tmp_path, 'w') as file:
+        json.dump(data, file)
+    os.replace(tmp_path, path)
+
+
+def read_pointer(snapshot_dir, source_path):
+    """Return the last recorded {'stamp': [...], 'version': ...} for a source"""
+    try:
+        with open(os.path.join(snapshot_dir, f'{_stem(source_path)}.json')) as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+
+def write_pointer(snapshot_dir, source_path, stamp, version):
+    """Record which snapshot version matches the source file's stamp"""
+    _write_json(os.path.join(snapshot_dir, f'{_stem(source_path)}.json'),
+                {'stamp': list(stamp), 'version': version})
+
+
+def write_snapshot(frame, directory):
+    """Write a cleaned frame as a columnar snapshot, atomically"""
+    parent = os.path.dirname(directory)
+    os.makedirs(parent, exist_ok=True)
+    tmp_dir = f'{directory}.tmp-{os.getpid()}-{threading.get_ident()}'
+    os.makedirs(tmp_dir)
+
+    try:
+        columns = []
+        for i, name in enumerate(frame.columns):
+            col = frame[name]
+            if pd.api.types.is_numeric_dtype(col) or pd.api.types.is_bool_dtype(col):
+                np.save(os.path.join(tmp_dir, f'{i}.npy'), col.to_numpy())
+                columns.append({'name': name, 'kind': 'numeric'})
+            else:
+                # Text columns become categoricals: fixed-width codes map cleanly
+                text = col.astype(object).where(col.isna(), col.astype(str))
+                cat = pd.Categorical(text)
+                np.save(os.path.join(tmp_dir, f'{i}.codes.npy'), cat.codes)
+                np.save(os.path.join(tmp_dir, f'{i}.categories.npy'),
+                        np.asarray(cat.categories, dtype=str))
+                columns.append({'name': name, 'kind': 'categorical'})
+
+        _write_json(os.path.join(tmp_dir, 'manifest.json'), {
+            'format': SNAPSHOT_FORMAT,
+            'rows': len(frame),
+            'columns': columns,
+        })
+
+        try:
+            os.rename(tmp_dir, directory)
+        except OSError:
+            # Another worker finished the same snapshot first
+            if not os.path.exists(os.path.join(directory, 'manifest.json')):
+                raise
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def read_snapshot(directory):
+    """Load a snapshot with memory-mapped columns, or None if it is missing"""
+    try:
+        with open(os.path.join(directory, 'manifest.json')) as file:
+            manifest = json.load(file)
+    except (OSError, ValueError):
+        return None
+    if manifest.get('format') != SNAPSHOT_FORMAT:
+        return None
+
+    data = {}
+    for i, column in enumerate(manifest['columns']):
+        if column['kind'] == 'numeric':
+            data[column['name']] = np.load(os.path.join(directory, f'{i}.npy'), mmap_mode='r')
+        else:
+            codes = np.load(os.path.join(directory, f'{i}.codes.npy'), mmap_mode='r')
+            categories = np.load(os.path.join(directory, f'{i}.categories.npy')).tolist()
+            data[column['name']] = pd.Categorical.from_codes(
+                codes, dtype=pd.CategoricalDtype(categories), validate=False
+            )
+
+    # copy=False keeps the columns backed by the mapped files
+    return pd.DataFrame(data, copy=False)
+
+
+def prune_snapshots(snapshot_dir, source_path, keep_version):
+    """Remove snapshots of older source versions"""
+    prefix = f'{_stem(source_path)}-'
+    keep = os.path.basename(snapshot_path(snapshot_dir, source_path, keep_version))
+    try:
+        entries = os.listdir(snapshot_dir)
+    except OSError:
+        return
+    for entry in entries:
+        if entry.startswith(prefix) and entry != keep and '.tmp-' not in entry:
+            # Workers still mapping the old files keep their pages until unmapped
+            shutil.rmtree(os.path.join(snapshot_dir, entry), ignore_errors=True)
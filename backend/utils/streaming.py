@@ -0,0 +1,104 @@
+"""
+Streaming helpers for large exports
+Rows are read in keyset-paginated batches and encoded one batch at a time
+(JSON array, NDJSON or CSV, optionally gzipped on the fly), so a response
+holds a single batch in memory however large the table is.
+"""
+
+import csv
+import io
+import os
+import zlib
+
+from flask import Response, stream_with_context
+
+from utils.serialization import json_bytes
+
+EXPORT_BATCH_SIZE = int(os.getenv('EXPORT_BATCH_SIZE', '1000'))
+
+# Format name -> mimetype
+EXPORT_FORMATS = {
+    'json': 'application/json',
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+
+def keyset_batches(query, key, batch_size=EXPORT_BATCH_SIZE):
+    """Yield lists of rows ordered by key, fetching each batch with WHERE key > last
+
+    Unlike OFFSET paging every batch is an index range scan, so the last
+    batch costs the same as the first.
+    """
+    last = None
+    while True:
+        page = query if last is None else query.filter(key > last)
+        batch = page.order_by(key).limit(batch_size).all()
+        if not batch:
+            return
+        yield batch
+        if len(batch) < batch_size:
+            return
+        last = getattr(batch[-1], key.key)
+
+
+def json_chunks(batches, envelope=None):
+    """Encode batches of records as one streamed JSON object
+
+    The records go under "data"; the envelope keys and the final "total"
+    count follow once the last batch has been written.
+    """
+    yield b'{"data":['
+    count = 0
+    for records in batches:
+        if not records:
+            continue
+        body = b','.join(json_bytes(record) for record in records)
+        yield (b',' if count else b'') + body
+        count += len(records)
+    trailer = json_bytes({**(envelope or {}), 'total': count})
+    yield b'],' + trailer[1:]
+
+
+def ndjson_chunks(batches):
+    """Encode batches of records as newline-delimited JSON"""
+    for records in batches:
+        if records:
+            yield b''.join(json_bytes(record) + b'\n' for record in records)
+
+
+def csv_chunks(batches, fieldnames):
+    """Encode batches of flat records as CSV with a header row"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fieldnames, extrasaction='ignore')
+    writer.writeheader()
+    for records in batches:
+        writer.writerows(records)
+        yield buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+
+def gzip_chunks(chunks, level=6):
+    """Compress a chunk stream into one gzip member on the fly"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def stream_response(chunks, format_name, compress=False, filename=None):
+    """Chunked response for an export stream, run inside the request context"""
+    if compress:
+        chunks = gzip_chunks(chunks)
+    response = Response(stream_with_context(chunks), mimetype=EXPORT_FORMATS[format_name])
+    if compress:
+        response.headers['Content-Encoding'] = 'gzip'
+        response.headers['Vary'] = 'Accept-Encoding'
+    if filename:
+        response.headers['Content-Disposition'] = f'attachment; filename={filename}'
+    return response
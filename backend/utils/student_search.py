@@ -0,0 +1,234 @@
+"""
+Indexed student search behind GET /api/students/search
+Names are matched through two indexes instead of a table scan:
+lower(name) prefixes through an expression index, and substrings through
+the student_search_terms trigram table. A match query walks the posting list
+of one of the query's trigrams in student id order, probes the others by
+primary key and confirms each candidate with a LIKE, so it can stop as soon
+as it has enough rows. Results are ranked (roll number, name prefix, word
+start, substring) and cut to the top N; totals and department facets count
+matches up to SEARCH_COUNT_LIMIT. The trigram table is kept in step with
+students by flush events.
+"""
+
+import os
+import re
+
+from sqlalchemy import delete, event, exists, func, insert, inspect, select
+from sqlalchemy.orm import Session
+
+from database import db
+from models.database_models import Student, StudentSearchTerm
+
+DEFAULT_SEARCH_LIMIT = 20
+MAX_SEARCH_LIMIT = 100
+# Matches counted for total and facets; past it they are lower bounds
+SEARCH_COUNT_LIMIT = int(os.getenv('SEARCH_COUNT_LIMIT', '1000'))
+
+terms_table = StudentSearchTerm.__table__
+
+# Set by install_student_search(); until then writes leave the trigram table alone
+search_state = {'installed': False}
+
+
+def name_grams(name):
+    """Trigrams of every word of a name, padded like pg_trgm"""
+    grams = set()
+    for word in re.findall(r'\w+', (name or '').lower()):
+        padded = f'  {word} '
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def query_grams(text, word_start=False):
+    """Trigrams every name containing text must have
+
+    Words after the first start a word in the name, so their padded leading
+    grams apply; with word_start so does the first one.
+    """
+    grams = []
+    for position, word in enumerate(re.findall(r'\w+', text)):
+        if position == 0 and not word_start:
+            padded = word
+        else:
+            padded = f'  {word}'
+        for i in range(len(padded) - 2):
+            if padded[i:i + 3] not in grams:
+                grams.append(padded[i:i + 3])
+    return grams
+
+
+def driver_gram(grams):
+    """The gram whose posting list a match query walks
+
+    Padded grams ('  a', ' an') are shared by every name with a word
+    starting that way, so interior grams are preferred, the later the better.
+    """
+    return max(reversed(grams), key=lambda gram: -gram.count(' '))
+
+
+def like_escape(text):
+    return text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def short_query(text):
+    """A first word under three letters only matches at a word start"""
+    return len(text.split(' ')[0]) < 3
+
+
+def word_start_condition(text):
+    lowered = func.lower(Student.name)
+    pattern = like_escape(text)
+    return lowered.like(f'{pattern}%', escape='\\') | lowered.like(f'% {pattern}%', escape='\\')
+
+
+def matches(text, word_start, departments=None):
+    """Students whose name contains text (at a word start if word_start), in id order"""
+    if word_start:
+        contains = word_start_condition(text)
+    else:
+        contains = func.lower(Student.name).like(f'%{like_escape(text)}%', escape='\\')
+    query = Student.query.filter(contains)
+    if departments:
+        query = query.filter(Student.department.in_(departments))
+    grams = query_grams(text, word_start)
+    if not grams:
+        return query.order_by(Student.id)
+
+    driver = driver_gram(grams)
+    walked = terms_table.alias('walked')
+    query = query.join(walked, walked.c.student_id == Student.id).filter(walked.c.gram == driver)
+    for gram in grams:
+        if gram != driver:
+            probe = terms_table.alias()
+            query = query.filter(exists().where(probe.c.gram == gram,
+                                                probe.c.student_id == walked.c.student_id))
+    return query.order_by(walked.c.student_id)
+
+
+def count_matches(query, limit=SEARCH_COUNT_LIMIT):
+    """{department: count} over at most limit rows of a matches() query"""
+    rows = query.with_entities(Student.department).limit(limit).subquery()
+    return dict(db.session.query(rows.c.department, func.count()).group_by(rows.c.department).all())
+
+
+def search_students(text, departments=None, limit=DEFAULT_SEARCH_LIMIT):
+    """Return (ranked [(student, match)], total, {department: count}, exact)
+
+    exact is False when total or a facet stopped at SEARCH_COUNT_LIMIT.
+    """
+    text = ' '.join(text.lower().split())
+    short = short_query(text)
+    results, seen = [], set()
+
+    def take(rows, label):
+        for student in rows:
+            if student.id not in seen and len(results) < limit:
+                seen.add(student.id)
+                results.append((student, label))
+
+    def scoped(query):
+        return query.filter(Student.department.in_(departments)) if departments else query
+
+    def remaining(query):
+        if seen:
+            query = query.filter(Student.id.notin_(seen))
+        return query.limit(limit - len(results)).all()
+
+    roll_number = None
+    if text.isdigit():
+        roll_number = Student.query.get(int(text))
+        if roll_number is not None and (not departments or roll_number.department in departments):
+            take([roll_number], 'roll_number')
+
+    # Name prefix: a range scan of ix_students_(department_)name_lower_id, already in order
+    lowered = func.lower(Student.name)
+    prefix = scoped(Student.query.filter(lowered >= text, lowered < text + '\uffff'))
+    take(prefix.order_by(lowered, Student.id).limit(limit).all(), 'prefix')
+    if len(results) < limit:
+        take(remaining(matches(text, True, departments)), 'word')
+    if len(results) < limit and not short:
+        take(remaining(matches(text, False, departments).filter(~word_start_condition(text))), 'substring')
+
+    facets = count_matches(matches(text, short))
+    exact = sum(facets.values()) < SEARCH_COUNT_LIMIT
+    if departments:
+        scoped_counts = count_matches(matches(text, short, departments))
+        total = sum(scoped_counts.values())
+        exact = exact and total < SEARCH_COUNT_LIMIT
+    else:
+        total = sum(facets.values())
+    if roll_number is not None and text not in roll_number.name.lower():
+        facets[roll_number.department] = facets.get(roll_number.department, 0) + 1
+        if not departments or roll_number.department in departments:
+            total += 1
+    return results, total, facets, exact
+
+
+# ==================== Trigram table maintenance ====================
+
+def index_rows(students):
+    return [{'gram': gram, 'student_id': student_id}
+            for student_id, name in students for gram in name_grams(name)]
+
+
+def reindex_students(connection, students):
+    """Replace the trigram rows of the given (id, name) pairs"""
+    ids = [student_id for student_id, _ in students]
+    if not ids:
+        return
+    connection.execute(delete(terms_table).where(terms_table.c.student_id.in_(ids)))
+    rows = index_rows((student_id, name) for student_id, name in students if name is not None)
+    if rows:
+        connection.execute(insert(terms_table), rows)
+
+
+def rebuild_search_index(connection, batch_size=5000):
+    """Recompute the whole trigram table from students; returns the students indexed"""
+    connection.execute(delete(terms_table))
+    indexed = 0
+    last = None
+    while True:
+        query = select(Student.id, Student.name).order_by(Student.id).limit(batch_size)
+        if last is not None:
+            query = query.where(Student.id > last)
+        batch = connection.execute(query).all()
+        if not batch:
+            return indexed
+        rows = index_rows(batch)
+        if rows:
+            connection.execute(insert(terms_table), rows)
+        indexed += len(batch)
+        last = batch[-1][0]
+
+
+@event.listens_for(Session, 'after_flush')
+def _reindex_flushed_students(session, flush_context):
+    if not search_state['installed']:
+        return
+    changed = {}
+    for obj in list(session.new) + list(session.dirty):
+        if not isinstance(obj, Student):
+            continue
+        if obj in session.new or inspect(obj).attrs.name.history.has_changes():
+            changed[obj.id] = obj.name
+    for obj in session.deleted:
+        if isinstance(obj, Student):
+            changed[obj.id] = None
+    if changed:
+        reindex_students(session.connection(), sorted(changed.items()))
+
+
+def install_student_search(app, fill=True):
+    """Fill the trigram table when it starts out empty and keep it in step
+
+    The table itself comes from migration d6f24b8a0c35; fill=False
+    skips the fill while they are still pending.
+    """
+    if fill:
+        with app.app_context(), db.engine.begin() as connection:
+            empty = connection.execute(select(terms_table.c.student_id).limit(1)).first() is None
+            if empty and connection.execute(select(Student.id).limit(1)).first() is not None:
+                indexed = rebuild_search_index(connection)
+                print(f"[DB] Built student search index for {indexed} students")
+    search_state['installed'] = True
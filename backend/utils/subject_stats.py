@@ -0,0 +1,310 @@
+"""
+Subject statistics behind /api/subjects/students/subjects-stats
+Unfiltered requests read the subject_stats summary table: one row per
+subject with its score count and running sums, kept in step with
+student_subjects by applying deltas inside the flush that writes the scores,
+so the read is O(#subjects). Filtered requests (?department= joins students,
+?from=/?to= bound created_at) run one GROUP BY subject_name query instead.
+"""
+
+from datetime import datetime, timedelta
+
+from sqlalchemy import case, event, func, inspect, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from database import db
+from models.database_models import Student, StudentSubject, SubjectStat
+
+stats_table = SubjectStat.__table__
+scores_table = StudentSubject.__table__
+
+# Set by install_subject_stats(); until then writes leave the summary alone
+summary_state = {'installed': False}
+
+SUBJECT_COLORS = ['#3b82f6', '#10b981', '#8b5cf6', '#f59e0b', '#ef4444', '#ec4899', '#06b6d4', '#f97316']
+
+
+def parse_date_arg(args, name):
+    """Read an ISO date/datetime query argument; returns (value, date_only) or None"""
+    value = (args.get(name) or '').strip()
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value), len(value) == 10
+    except ValueError:
+        raise ValueError(f"Invalid '{name}' date '{value}', expected YYYY-MM-DD or an ISO datetime")
+
+
+def stats_filters(args):
+    """Return (departments or None, created_at conditions) for the stats query
+
+    ?to=YYYY-MM-DD includes the whole day. Raises ValueError on a bad date.
+    """
+    department = args.get('department') if args else None
+    departments = [d.strip() for d in department.split(',') if d.strip()] if department else None
+
+    conditions = []
+    start = parse_date_arg(args, 'from') if args else None
+    if start is not None:
+        conditions.append(StudentSubject.created_at >= start[0])
+    end = parse_date_arg(args, 'to') if args else None
+    if end is not None:
+        value, date_only = end
+        conditions.append(StudentSubject.created_at < value + timedelta(days=1) if date_only
+                          else StudentSubject.created_at <= value)
+    return departments, conditions
+
+
+def subject_stats_rows(args=None):
+    """(subject_name, count, avg percentage, sum marks) per subject, in first-seen order
+
+    Served from the summary table when no filter is given.
+    """
+    departments, conditions = stats_filters(args)
+    if summary_state['installed'] and not departments and not conditions:
+        return summary_stats_rows()
+    query = db.session.query(
+        StudentSubject.subject_name,
+        func.count(StudentSubject.id),
+        func.avg(StudentSubject.percentage),
+        func.sum(StudentSubject.marks),
+    )
+    if departments:
+        query = (query.join(Student, Student.id == StudentSubject.student_id)
+                 .filter(Student.department.in_(departments)))
+    if conditions:
+        query = query.filter(*conditions)
+    # min(id) keeps the order (and so the colors) the Python grouping produced
+    return (query.group_by(StudentSubject.subject_name)
+            .order_by(func.min(StudentSubject.id))
+            .all())
+
+
+def format_subject_stats(rows):
+    """Rows from subject_stats_rows() -> the endpoint's data list"""
+    result = []
+    for idx, (name, count, avg_percentage, total_marks) in enumerate(rows):
+        result.append({
+            'name': name,
+            'avgScore': round(avg_percentage or 0, 2),
+            'color': SUBJECT_COLORS[idx % len(SUBJECT_COLORS)],
+            'students': count,
+            'totalMarks': total_marks or 0,
+        })
+    return result
+
+
+# ==================== Summary table ====================
+
+def summary_stats_rows():
+    """subject_stats_rows() from the summary table"""
+    average = case((stats_table.c.percentage_count > 0,
+                    stats_table.c.percentage_sum / stats_table.c.percentage_count), else_=None)
+    rows = db.session.execute(
+        select(stats_table.c.subject_name, stats_table.c.score_count, average, stats_table.c.marks_sum)
+        .where(stats_table.c.score_count > 0)
+        .order_by(stats_table.c.first_score_id, stats_table.c.subject_name)
+    )
+    return rows.all()
+
+
+def grouped_stats_select():
+    """Fresh summary rows straight from student_subjects"""
+    return (select(scores_table.c.subject_name,
+                   func.count(scores_table.c.id),
+                   func.coalesce(func.sum(scores_table.c.marks), 0.0),
+                   func.coalesce(func.sum(scores_table.c.percentage), 0.0),
+                   func.count(scores_table.c.percentage),
+                   func.min(scores_table.c.id))
+            .group_by(scores_table.c.subject_name))
+
+
+def rebuild_subject_stats(connection):
+    """Recompute the whole summary table from student_subjects; returns the row count"""
+    connection.execute(stats_table.delete())
+    columns = ['subject_name', 'score_count', 'marks_sum', 'percentage_sum',
+               'percentage_count', 'first_score_id']
+    connection.execute(stats_table.insert().from_select(columns, grouped_stats_select()))
+    return connection.execute(select(func.count()).select_from(stats_table)).scalar()
+
+
+def refresh_subject_stats(connection, names):
+    """Recompute the summary rows of some subjects from student_subjects"""
+    if not summary_state['installed'] or not names:
+        return
+    names = sorted(names)
+    connection.execute(stats_table.delete().where(stats_table.c.subject_name.in_(names)))
+    columns = ['subject_name', 'score_count', 'marks_sum', 'percentage_sum',
+               'percentage_count', 'first_score_id']
+    connection.execute(stats_table.insert().from_select(
+        columns, grouped_stats_select().where(scores_table.c.subject_name.in_(names))))
+
+
+def subject_stats_drift(connection, tolerance=1e-6):
+    """Compare the summary table with a fresh aggregate; returns one dict per mismatch"""
+    fresh = {row[0]: row[1:] for row in connection.execute(grouped_stats_select())}
+    stored = {row[0]: row[1:] for row in connection.execute(
+        select(stats_table.c.subject_name, stats_table.c.score_count, stats_table.c.marks_sum,
+               stats_table.c.percentage_sum, stats_table.c.percentage_count,
+               stats_table.c.first_score_id)
+        .where(stats_table.c.score_count != 0))}
+
+    fields = ('score_count', 'marks_sum', 'percentage_sum', 'percentage_count', 'first_score_id')
+    drift = []
+    for name in sorted(set(fresh) | set(stored)):
+        expected, actual = fresh.get(name), stored.get(name)
+        if expected is None or actual is None:
+            drift.append({'subject': name, 'field': 'row',
+                          'expected': 'present' if expected else 'absent',
+                          'actual': 'present' if actual else 'absent'})
+            continue
+        for field, want, got in zip(fields, expected, actual):
+            if isinstance(want, float) or isinstance(got, float):
+                mismatch = abs((want or 0.0) - (got or 0.0)) > tolerance * max(1.0, abs(want or 0.0))
+            else:
+                mismatch = want != got
+            if mismatch:
+                drift.append({'subject': name, 'field': field, 'expected': want, 'actual': got})
+    return drift
+
+
+def forget_subject_stats(session, subject_name):
+    """Drop a subject's summary row after its scores were bulk-deleted"""
+    if summary_state['installed']:
+        session.execute(stats_table.delete().where(stats_table.c.subject_name == subject_name))
+
+
+def _score_state(score):
+    return score.subject_name, score.marks, score.percentage
+
+
+def _add_delta(deltas, name, sign, marks, percentage, score_id):
+    delta = deltas.setdefault(name, {'count': 0, 'marks': 0.0, 'percentage': 0.0,
+                                     'percentage_count': 0, 'first': None, 'removed': set()})
+    delta['count'] += sign
+    delta['marks'] += sign * (marks or 0.0)
+    if percentage is not None:
+        delta['percentage'] += sign * percentage
+        delta['percentage_count'] += sign
+    if sign > 0:
+        delta['first'] = score_id if delta['first'] is None else min(delta['first'], score_id)
+    else:
+        delta['removed'].add(score_id)
+
+
+def apply_stats_deltas(connection, deltas):
+    """Apply per-subject deltas to the summary table in the current transaction"""
+    now = datetime.utcnow()
+    c = stats_table.c
+    # Sorted so concurrent writers lock summary rows in the same order
+    for name in sorted(deltas):
+        delta = deltas[name]
+        values = {
+            'score_count': c.score_count + delta['count'],
+            'marks_sum': c.marks_sum + delta['marks'],
+            'percentage_sum': c.percentage_sum + delta['percentage'],
+            'percentage_count': c.percentage_count + delta['percentage_count'],
+            'updated_at': now,
+        }
+        if delta['first'] is not None:
+            values['first_score_id'] = case(
+                (c.first_score_id.is_(None) | (c.first_score_id > delta['first']), delta['first']),
+                else_=c.first_score_id)
+        update = stats_table.update().where(c.subject_name == name).values(**values)
+
+        if not connection.execute(update).rowcount:
+            if delta['count'] <= 0:
+                print(f"[DB] ⚠️ subject_stats has no row for '{name}'; run rebuild_subject_stats.py")
+                continue
+            try:
+                with connection.begin_nested():
+                    connection.execute(stats_table.insert().values(
+                        subject_name=name, score_count=delta['count'], marks_sum=delta['marks'],
+                        percentage_sum=delta['percentage'], percentage_count=delta['percentage_count'],
+                        first_score_id=delta['first'], updated_at=now))
+            except IntegrityError:
+                # Another writer created the row first
+                connection.execute(update)
+
+        if delta['removed']:
+            # The first score left: look the new one up (an index range on subject_name)
+            first = (select(func.min(scores_table.c.id))
+                     .where(scores_table.c.subject_name == name)
+                     .scalar_subquery())
+            connection.execute(stats_table.update()
+                               .where(c.subject_name == name, c.first_score_id.in_(delta['removed']))
+                               .values(first_score_id=first))
+        if delta['count'] < 0:
+            connection.execute(stats_table.delete().where(c.subject_name == name, c.score_count <= 0))
+
+
+@event.listens_for(Session, 'before_flush')
+def _collect_score_changes(session, flush_context, instances):
+    if not summary_state['installed']:
+        return
+    added = [obj for obj in session.new if isinstance(obj, StudentSubject)]
+    changed = [obj for obj in session.dirty
+               if isinstance(obj, StudentSubject) and session.is_modified(obj)]
+    deleted = [obj for obj in session.deleted if isinstance(obj, StudentSubject)]
+    if not (added or changed or deleted):
+        return
+
+    # Old values come from the rows themselves, which the flush has not touched yet
+    old_ids = [inspect(obj).identity[0] for obj in changed + deleted]
+    old = {}
+    if old_ids:
+        rows = session.connection().execute(
+            select(scores_table.c.id, scores_table.c.subject_name, scores_table.c.marks,
+                   scores_table.c.percentage).where(scores_table.c.id.in_(old_ids)))
+        old = {row[0]: row[1:] for row in rows}
+    session.info.setdefault('subject_stat_changes', []).append((old, added + changed))
+
+
+def apply_score_changes(connection, removed, added):
+    """Update the summary for scores written outside the ORM flush
+
+    removed and added are (id, subject_name, marks, percentage) tuples: the
+    old state of updated or deleted rows, and the new state of inserted or
+    updated ones.
+    """
+    if not summary_state['installed']:
+        return
+    deltas = {}
+    for score_id, name, marks, percentage in removed:
+        _add_delta(deltas, name, -1, marks, percentage, score_id)
+    for score_id, name, marks, percentage in added:
+        _add_delta(deltas, name, 1, marks, percentage, score_id)
+    apply_stats_deltas(connection, deltas)
+
+
+@event.listens_for(Session, 'after_flush')
+def _apply_score_changes(session, flush_context):
+    pending = session.info.pop('subject_stat_changes', None)
+    if not pending:
+        return
+    removed, added = [], []
+    for old, current in pending:
+        removed.extend((score_id, *state) for score_id, state in old.items())
+        added.extend((score.id, *_score_state(score)) for score in current)
+    apply_score_changes(session.connection(), removed, added)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_score_changes(session):
+    session.info.pop('subject_stat_changes', None)
+
+
+def install_subject_stats(app, fill=True):
+    """Fill the summary table when it starts out empty and start maintaining it
+
+    The table itself comes from migration b4d02f6e8a13; fill=False
+    skips the fill while they are still pending.
+    """
+    if fill:
+        with app.app_context(), db.engine.begin() as connection:
+            empty = connection.execute(select(stats_table.c.subject_name).limit(1)).first() is None
+            if empty and connection.execute(select(scores_table.c.id).limit(1)).first() is not None:
+                rows = rebuild_subject_stats(connection)
+                print(f"[DB] Built subject_stats for {rows} subjects")
+    summary_state['installed'] = True
@@ -48,6 +48,14 @@ source venv/bin/activate > /dev/null 2>&1
 echo "[*] Installing Python packages..."
 pip install -q -r requirements.txt > /dev/null 2>&1
 
+# Apply pending schema migrations
+echo "[*] Upgrading the database schema..."
+flask --app app:create_app db upgrade > /dev/null 2>&1
+if [ $? -ne 0 ]; then
+    echo "[ERROR] Database upgrade failed; run 'flask --app app:create_app db upgrade' in backend/ for details"
+    exit 1
+fi
+
 echo "[OK] Backend setup complete"
 echo ""
 